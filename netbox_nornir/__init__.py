@@ -17,5 +17,29 @@ class NetboxNornirConfig(PluginConfig):
     description = ""
     base_url = "nornir"
 
+    def ready(self):
+        """Connect the inventory cache signal handlers, register the nornir runner, and check the dispatcher settings."""
+        super().ready()
+        # pylint: disable=import-outside-toplevel
+        from nornir.core.plugins.runners import RunnersPluginRegister
+
+        from netbox_nornir.constraints import PLUGIN_CFG
+        from netbox_nornir.plugins.runners.adaptive import AdaptiveRunner
+        from netbox_nornir.plugins.tasks.dispatcher import get_registry
+        from netbox_nornir.plugins.tasks.dispatcher.markers import is_conditional
+        from netbox_nornir.signals import connect_signals
+
+        # Every save of a device, or of an object host specs are derived from, costs a query and cache writes.
+        if PLUGIN_CFG.get("inventory_cache", False):
+            connect_signals()
+
+        # Also registered through the `nornir.plugins.runners` entry point, for installs without the plugin loaded.
+        RunnersPluginRegister.register("netbox_nornir_adaptive", AdaptiveRunner)
+
+        # Import every configured driver now, so a typo in `dispatcher_mapping` fails at startup.
+        get_registry()
+        # Conditional config without the config store fails at startup, rather than on every `get_config`.
+        is_conditional()
+
 
 config = NetboxNornirConfig  # pylint: disable=invalid-name
@@ -0,0 +1,45 @@
+"""Measure the overhead of resolving the driver task of a host in the dispatcher."""
+import importlib
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from netbox_nornir.plugins.tasks.dispatcher import get_registry
+
+
+def resolve_with_import(mapping, platform: str, method: str):
+    """Resolve a driver task by importing its class, as the dispatcher did on every call before the registry."""
+    driver = mapping.get(platform, mapping.get("default"))
+    module_name, class_name = driver.rsplit(".", 1)
+    return getattr(getattr(importlib.import_module(module_name), class_name), method)
+
+
+class Command(BaseCommand):
+    """Measure the overhead of resolving the driver task of a host in the dispatcher."""
+
+    help = "Compare the per call cost of the dispatch registry to importing the driver on every call."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument("--iterations", type=int, default=100000, help="Number of calls per platform.")
+        parser.add_argument("--method", default="get_config", help="Driver method to resolve.")
+
+    def handle(self, *args, **options):
+        """Run the benchmark."""
+        registry = get_registry()
+        iterations = options["iterations"]
+        method = options["method"]
+        platforms = [*registry.mapping, "unknown_platform"]
+
+        results = {}
+        for name, resolve in [
+            ("import", lambda platform: resolve_with_import(registry.mapping, platform, method)),
+            ("registry", lambda platform: registry.get_task(platform, method)),
+        ]:
+            seconds = timeit.timeit(
+                lambda: [resolve(platform) for platform in platforms],  # pylint: disable=cell-var-from-loop
+                number=iterations,
+            )
+            results[name] = seconds / (iterations * len(platforms)) * 1e9
+            self.stdout.write(f"{name:>10}: {results[name]:8.0f} ns per call")
+        self.stdout.write(f"{'speedup':>10}: {results['import'] / results['registry']:8.1f}x")
@@ -1,11 +1,20 @@
 """Nornir plugin to retrieve credentials from AWS SSM Parameter Store."""
 
-import boto3
+import asyncio
 import os
-from botocore.client import Config
+from concurrent.futures import ThreadPoolExecutor
 from dcim.models import Device
 
-from .base import BaseCredentials
+from .base import DEFAULT_CONCURRENCY, BaseCredentials
+from .cache import CREDENTIALS_CACHE, MISSING, NOT_FOUND
+from .clients import get_client
+from .throttle import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BUDGET, RetryBudget, call_with_retries, get_rate_limiter
+
+CREDENTIAL_FIELDS = ["username", "password", "secret", "key"]
+# Maximum number of names accepted by a single SSM GetParameters call.
+GET_PARAMETERS_BATCH_SIZE = 10
+DEFAULT_MAX_WORKERS = 10
+PARAMETER_PATH = "/netbox"
 
 
 class CredentialsAwsSsm(BaseCredentials):
@@ -13,17 +22,55 @@ class CredentialsAwsSsm(BaseCredentials):
 
     def __init__(self, params={}):  # pylint: disable=dangerous-default-value
         """Init."""
-        config = Config(connect_timeout=15, retries={"max_attempts": 0})
-        self.client = boto3.client("ssm", config=config, region_name=os.environ.get("AWS_REGION", "eu-west-2"))
+        self.max_workers = params.get("max_workers", DEFAULT_MAX_WORKERS)
+        self.region = os.environ.get("AWS_REGION", "eu-west-2")
+        # Time to live of the parameters in the process wide credentials cache, defaults to the cache TTL.
+        self.cache_ttl = params.get("cache_ttl")
+        # Read the whole parameter tree once instead of looking up the parameters of each device.
+        self.use_index = params.get("index", False)
+        self.index_loaded = False
+        # Throttled calls are retried by `call`, at the rate shared by every job of the process, within the retry
+        # budget of this job.
+        self.max_attempts = params.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.retry_budget = RetryBudget(params.get("retry_budget", DEFAULT_RETRY_BUDGET))
+        self.rate_limiter = get_rate_limiter(("ssm", self.region))
+        # The client is shared by every inventory load of the process, and reuses its keep-alive connections.
+        self.client = get_client(
+            "ssm",
+            self.region,
+            connect_timeout=15,
+            retries={"max_attempts": 0},
+            max_pool_connections=self.max_workers,
+        )
         self.params = params
         self.username = None
         self.password = None
         self.secret = None
         self.key = None
+        # Values of the parameters fetched so far, and names of every parameter looked up, found or not.
+        self.parameters = {}
+        self.fetched_names = set()
+
+    def call(self, operation, **kwargs):
+        """Call an SSM API operation, retrying throttled calls.
+
+        Args:
+            operation (str): Client method name
+            **kwargs: Arguments of the call
+        Returns:
+            (dict): Response of the call
+        """
+        return call_with_retries(
+            getattr(self.client, operation),
+            self.rate_limiter,
+            self.retry_budget,
+            max_attempts=self.max_attempts,
+            **kwargs,
+        )
 
     def build_parameter_names(self, device_name, manufacturer, platform):
         """Build a list of parameter names to try."""
-        prefix = "/netbox"
+        prefix = PARAMETER_PATH
         # Ordered list of parameter names to try
         return [
             "/".join([prefix, device_name, "username"]),
@@ -68,29 +115,181 @@ class CredentialsAwsSsm(BaseCredentials):
                 return param
         return {}
 
+    @staticmethod
+    def build_default_parameter_names():
+        """Build the list of default parameter names."""
+        prefix = PARAMETER_PATH
+        return [
+            "/".join([prefix, "device_default", "username"]),
+            "/".join([prefix, "device_default", "password"]),
+            "/".join([prefix, "device_default", "secret"]),
+            "/".join([prefix, "device_default", "key"]),
+        ]
+
     def get_default_creds(self):
         """Get default credentials from environment variables.
         Returns:
             (tuple): Tuple of username, password, secret, key
         """
-        prefix = "/netbox"
-        parameter_names = [
-            "/".join([prefix, "device_default", "username"]),
-            "/".join([prefix, "device_default", "password"]),
-            "/".join([prefix, "device_default", "secret"]),
-            "/".join([prefix, "device_default", "key"]),
+        parameter_names = self.build_default_parameter_names()
+        return self.call("get_parameters", Names=parameter_names, WithDecryption=True)["Parameters"]
+
+    def fetch_parameters(self, parameter_names):
+        """Fetch the parameters not looked up yet, in concurrent batches of `GET_PARAMETERS_BATCH_SIZE` names.
+
+        Parameters are first read from the process wide credentials cache, which also remembers the parameters
+        missing from SSM. The manufacturer_platform and default parameters are cached once for every device using
+        them.
+
+        Args:
+            parameter_names (iterable): Parameter names
+        """
+        if self.use_index:
+            self.load_index()
+            return
+
+        missing_names = self.get_uncached_names(parameter_names)
+        if not missing_names:
+            return
+        batches = self.get_batches(missing_names)
+        if len(batches) == 1:
+            responses = [self.get_parameters(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                responses = list(executor.map(self.get_parameters, batches))
+        self.store_parameters(missing_names, responses)
+
+    async def afetch_parameters(self, parameter_names, concurrency: int = None):
+        """Fetch the parameters not looked up yet, like `fetch_parameters`, without blocking the event loop.
+
+        At most `concurrency` batches are fetched at once, and never more than `max_workers`, the size of the client
+        connection pool.
+
+        Args:
+            parameter_names (iterable): Parameter names
+            concurrency (int): Maximum number of batches fetched at once, defaults to `max_workers`
+        """
+        loop = asyncio.get_running_loop()
+        if self.use_index:
+            await loop.run_in_executor(None, self.load_index)
+            return
+
+        missing_names = self.get_uncached_names(parameter_names)
+        if not missing_names:
+            return
+        semaphore = asyncio.Semaphore(min(self.max_workers, concurrency or self.max_workers))
+
+        async def get_parameters(names):
+            async with semaphore:
+                return await loop.run_in_executor(None, self.get_parameters, names)
+
+        responses = await asyncio.gather(*(get_parameters(batch) for batch in self.get_batches(missing_names)))
+        self.store_parameters(missing_names, responses)
+
+    def get_uncached_names(self, parameter_names):
+        """Read the parameters not looked up yet from the credentials cache, and return the names missing from it.
+
+        Args:
+            parameter_names (iterable): Parameter names
+        Returns:
+            (list): Sorted list of the names to fetch from SSM
+        """
+        missing_names = []
+        for name in sorted(set(parameter_names) - self.fetched_names):
+            value = CREDENTIALS_CACHE.get((self.region, name))
+            if value is MISSING:
+                missing_names.append(name)
+                continue
+            if value is not NOT_FOUND:
+                self.parameters[name] = value
+            self.fetched_names.add(name)
+        return missing_names
+
+    @staticmethod
+    def get_batches(parameter_names):
+        """Split parameter names in batches of `GET_PARAMETERS_BATCH_SIZE` names."""
+        return [
+            parameter_names[index : index + GET_PARAMETERS_BATCH_SIZE]  # noqa: E203
+            for index in range(0, len(parameter_names), GET_PARAMETERS_BATCH_SIZE)
         ]
-        return self.client.get_parameters(Names=parameter_names, WithDecryption=True)["Parameters"]
 
-    def get_device_creds(self, device, **kwargs):  # pylint: disable=signature-differs
-        """Get device credentials.
+    def get_parameters(self, parameter_names):
+        """Get a batch of parameters from SSM, parameters which don't exist are left out."""
+        return self.call("get_parameters", Names=parameter_names, WithDecryption=True)["Parameters"]
+
+    def store_parameters(self, parameter_names, responses):
+        """Store fetched parameters, and cache every fetched name, found or not.
 
         Args:
-            device (Device): NetBox device
-            **kwargs: Additional arguments
+            parameter_names (list): Names of the fetched parameters
+            responses (list): Parameters returned by each batch
+        """
+        for parameters in responses:
+            for parameter in parameters:
+                self.parameters[parameter["Name"]] = parameter["Value"]
+        for name in parameter_names:
+            CREDENTIALS_CACHE.set((self.region, name), self.parameters.get(name, NOT_FOUND), ttl=self.cache_ttl)
+        self.fetched_names.update(parameter_names)
+
+    def load_index(self):
+        """Read every parameter under `PARAMETER_PATH` with paginated GetParametersByPath calls, once.
+
+        The parameters are indexed by name, so every device specific, manufacturer_platform and default parameter is
+        resolved from memory, parameters missing from the index don't exist. The index is kept in the process wide
+        credentials cache.
+        """
+        if self.index_loaded:
+            return
+        index = CREDENTIALS_CACHE.get((self.region, f"index:{PARAMETER_PATH}"))
+        if index is MISSING:
+            index = {}
+            kwargs = {"Path": PARAMETER_PATH, "Recursive": True, "WithDecryption": True}
+            while True:
+                page = self.call("get_parameters_by_path", **kwargs)
+                for parameter in page["Parameters"]:
+                    index[parameter["Name"]] = parameter["Value"]
+                if not page.get("NextToken"):
+                    break
+                kwargs["NextToken"] = page["NextToken"]
+            CREDENTIALS_CACHE.set((self.region, f"index:{PARAMETER_PATH}"), index, ttl=self.cache_ttl)
+        self.parameters.update(index)
+        self.index_loaded = True
+
+    def prefetch(self, devices):
+        """Fetch the device specific, manufacturer_platform and default parameters of every device at once.
+
+        Args:
+            devices (iterable): Dicts with the device `name`, and its `manufacturer` and `platform` slugs
+        """
+        parameter_names = set(self.build_default_parameter_names())
+        for device in devices:
+            parameter_names.update(
+                self.build_parameter_names(device["name"], device["manufacturer"], device["platform"])
+            )
+        self.fetch_parameters(parameter_names)
+
+    def resolve_creds(self, parameter_names):
+        """Resolve the credentials from the fetched parameters, trying the names in order for each field.
+
+        Args:
+            parameter_names (list): Ordered list of parameter names
         Returns:
             (tuple): Tuple of username, password, secret, key
         """
+        return tuple(
+            next(
+                (
+                    self.parameters[name]
+                    for name in parameter_names
+                    if name.endswith(f"/{field}") and name in self.parameters
+                ),
+                None,
+            )
+            for field in CREDENTIAL_FIELDS
+        )
+
+    def get_device_parameter_names(self, device, **kwargs):
+        """Build the list of parameter names to try for a device, from its model or its dict and slugs."""
         if isinstance(device, Device):
             device_name = device.name
             manufacturer = device.device_type.manufacturer.slug
@@ -99,13 +298,50 @@ class CredentialsAwsSsm(BaseCredentials):
             device_name = device["name"]
             manufacturer = kwargs.get("manufacturer")
             platform = kwargs.get("platform")
-        parameter_names = self.build_parameter_names(device_name, manufacturer, platform)
-        credentials = self.client.get_parameters(Names=parameter_names, WithDecryption=True)["Parameters"]
-        if not credentials:
-            credentials = self.get_default_creds()
-        return (
-            self.lookup_nested_dict(credentials, "Name", "username").get("Value"),
-            self.lookup_nested_dict(credentials, "Name", "password").get("Value"),
-            self.lookup_nested_dict(credentials, "Name", "secret").get("Value"),
-            self.lookup_nested_dict(credentials, "Name", "key").get("Value"),
+        return self.build_parameter_names(device_name, manufacturer, platform)
+
+    def get_device_creds(self, device, **kwargs):  # pylint: disable=signature-differs
+        """Get device credentials.
+
+        Args:
+            device (Device): NetBox device
+            **kwargs: Additional arguments
+        Returns:
+            (tuple): Tuple of username, password, secret, key
+        """
+        parameter_names = self.get_device_parameter_names(device, **kwargs)
+        self.fetch_parameters(parameter_names)
+        if not any(name in self.parameters for name in parameter_names):
+            parameter_names = self.build_default_parameter_names()
+            self.fetch_parameters(parameter_names)
+        return self.resolve_creds(parameter_names)
+
+    async def aget_device_creds(self, device=None, **kwargs):
+        """Get device credentials without blocking the event loop."""
+        return (await self.aget_many([(device, kwargs)]))[0]
+
+    async def aget_many(self, devices, concurrency: int = DEFAULT_CONCURRENCY):
+        """Get the credentials of many devices, fetching all of their parameters at once.
+
+        The device specific, manufacturer_platform and default parameters of every device are fetched with
+        concurrent batches, the credentials are then resolved from memory.
+
+        Args:
+            devices (list): List of `(device, kwargs)` tuples, as passed to `get_device_creds`
+            concurrency (int): Maximum number of batches fetched at once, capped at `max_workers`
+        Returns:
+            (list): List of username, password, secret, key tuples, in the order of `devices`
+        """
+        device_parameter_names = [self.get_device_parameter_names(device, **kwargs) for device, kwargs in devices]
+        default_parameter_names = self.build_default_parameter_names()
+        await self.afetch_parameters(
+            {name for parameter_names in device_parameter_names for name in parameter_names}
+            | set(default_parameter_names),
+            concurrency=concurrency,
         )
+        return [
+            self.resolve_creds(
+                parameter_names if any(name in self.parameters for name in parameter_names) else default_parameter_names
+            )
+            for parameter_names in device_parameter_names
+        ]
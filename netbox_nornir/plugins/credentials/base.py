@@ -1,4 +1,9 @@
 """Base credentials plugin for Netbox Nornir."""
+import asyncio
+from functools import partial
+
+# Default number of credentials looked up concurrently by `aget_many`.
+DEFAULT_CONCURRENCY = 100
 
 
 class BaseCredentials:
@@ -9,10 +14,26 @@ class BaseCredentials:
     secret = None
     key = None
 
-    def get_device_creds(self, device=None):  # pylint: disable=unused-argument
+    # Extra device relations read by `get_device_creds`, added to the inventory query plan.
+    select_related = []
+    prefetch_related = []
+
+    def prefetch(self, devices):  # pylint: disable=unused-argument
+        """Fetch the credentials of every device of the inventory up front, before `get_device_creds` is called.
+
+        Credentials classes backed by a remote store can override it to fetch credentials in bulk, `devices` is only
+        read from the database when iterated.
+
+        Args:
+            devices (iterable): Dicts with the device `name`, and its `manufacturer` and `platform` slugs
+        """
+
+    def get_device_creds(self, device=None, **kwargs):  # pylint: disable=unused-argument
         """Return the credentials for a given device.
         Args:
-            device (dcim.models.Device): Netbox device object
+            device (dcim.models.Device): Netbox device object, or a dict with the device `id` and `name`
+                when the inventory is loaded from its cache
+            **kwargs: `manufacturer` and `platform` slugs when `device` is a dict
         Return:
             username (string):
             password (string):
@@ -20,3 +41,35 @@ class BaseCredentials:
         """
 
         return (self.username, self.password, self.secret, self.key)
+
+    async def aget_device_creds(self, device=None, **kwargs):
+        """Return the credentials for a given device, without blocking the event loop.
+
+        The default implementation runs `get_device_creds` in the default executor of the loop, credentials classes
+        backed by an async client can override it.
+
+        Args:
+            device (dcim.models.Device): Netbox device object, or a dict as with `get_device_creds`
+            **kwargs: `manufacturer` and `platform` slugs when `device` is a dict
+        Return:
+            (tuple): Tuple of username, password, secret, key
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.get_device_creds, device=device, **kwargs))
+
+    async def aget_many(self, devices, concurrency: int = DEFAULT_CONCURRENCY):
+        """Return the credentials of many devices, looking up at most `concurrency` of them at once.
+
+        Args:
+            devices (list): List of `(device, kwargs)` tuples, as passed to `get_device_creds`
+            concurrency (int): Maximum number of concurrent lookups
+        Return:
+            (list): List of username, password, secret, key tuples, in the order of `devices`
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get_device_creds(device, kwargs):
+            async with semaphore:
+                return await self.aget_device_creds(device, **kwargs)
+
+        return await asyncio.gather(*(get_device_creds(device, kwargs) for device, kwargs in devices))
@@ -0,0 +1,90 @@
+"""Process wide cache of credentials, shared by every job run by a worker.
+
+The cache is disabled unless the `credentials_cache` plugin setting sets a `ttl`, as it keeps secrets in memory. It
+is only shared across jobs by a non-forking worker, the work-horse forked for each job by the default rq worker
+exits with its copy of the cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from netbox_nornir.constraints import PLUGIN_CFG
+
+# Secrets aren't kept past the inventory load unless the cache is enabled.
+DEFAULT_CACHE_TTL = 0
+# About 8 parameter names are cached per device, enough for 12,500 devices.
+DEFAULT_CACHE_MAXSIZE = 100000
+
+# Cached value of a credential known to be missing from its store.
+NOT_FOUND = object()
+# Returned by `TTLCache.get` on a cache miss.
+MISSING = object()
+
+
+class TTLCache:
+    """Thread safe LRU cache, whose entries expire after a TTL.
+
+    Args:
+        ttl (int): Default time to live of the entries in seconds, 0 disables the cache
+        maxsize (int): Maximum number of entries, the least recently used entries are evicted first
+    """
+
+    def __init__(self, ttl: int = DEFAULT_CACHE_TTL, maxsize: int = DEFAULT_CACHE_MAXSIZE):
+        """Initialize the cache."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Get an entry.
+
+        Args:
+            key (hashable): Entry key
+        Returns:
+            Entry value, `MISSING` when the entry isn't cached or has expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: int = None):
+        """Set an entry, evicting the least recently used entries over `maxsize`.
+
+        Args:
+            key (hashable): Entry key
+            value (any): Entry value
+            ttl (int): Time to live of the entry in seconds, defaults to the cache TTL
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """Delete an entry."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Delete every entry."""
+        with self.lock:
+            self.entries.clear()
+
+
+CREDENTIALS_CACHE = TTLCache(
+    ttl=PLUGIN_CFG.get("credentials_cache", {}).get("ttl", DEFAULT_CACHE_TTL),
+    maxsize=PLUGIN_CFG.get("credentials_cache", {}).get("maxsize", DEFAULT_CACHE_MAXSIZE),
+)
@@ -0,0 +1,54 @@
+"""Process wide registry of boto3 clients, shared by every job run by a non-forking worker."""
+import threading
+
+import boto3
+from botocore.client import Config
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+_SESSION = None
+
+
+def _freeze(value):
+    """Get a hashable version of a client config value."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def get_client(service: str, region: str, **config):
+    """Get the boto3 client of a service and region, created once per process.
+
+    Clients are created from a dedicated boto3 session, as sessions aren't thread safe but clients are: the same
+    client, and its pool of keep-alive HTTP connections, is shared by the nornir runner threads and every inventory
+    load of the process. Only a non-forking worker, like `rq.worker.SimpleWorker`, reuses it across jobs, the
+    work-horse forked for each job by the default rq worker creates its own client.
+
+    Args:
+        service (str): AWS service name
+        region (str): AWS region
+        **config: Arguments of the botocore client `Config`
+    Returns:
+        Boto3 client
+    """
+    global _SESSION  # pylint: disable=global-statement
+    key = (service, region, _freeze(config))
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            if _SESSION is None:
+                _SESSION = boto3.session.Session()
+            _CLIENTS[key] = _SESSION.client(service, config=Config(**config), region_name=region)
+        return _CLIENTS[key]
+
+
+def clear_clients():
+    """Drop every client, like after rotating the worker AWS credentials."""
+    global _SESSION  # pylint: disable=global-statement
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+        _SESSION = None
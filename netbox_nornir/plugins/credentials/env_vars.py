@@ -28,3 +28,7 @@ class CredentialsEnvVars(BaseCredentials):
 
         if not self.secret:
             self.secret = self.password
+
+    async def aget_device_creds(self, device=None, **kwargs):
+        """Return the credentials for a given device, read from the environment variables at init without blocking."""
+        return self.get_device_creds(device=device, **kwargs)
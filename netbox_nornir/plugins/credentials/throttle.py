@@ -0,0 +1,162 @@
+"""Client side rate limiting and retries for remote credential stores."""
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from netbox_nornir.exceptions import NornirNetboxException
+
+# Error codes returned by AWS APIs when throttling requests.
+THROTTLING_ERROR_CODES = {
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+}
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BUDGET = 50
+DEFAULT_BASE_DELAY = 0.1
+DEFAULT_MAX_DELAY = 5
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate adapts to throttling responses (AIMD).
+
+    The rate grows additively with every successful call and is divided on every throttled call, so it settles
+    around the highest rate accepted by the remote API. A single limiter is shared by every thread and job of the
+    process calling the same API, see `get_rate_limiter`.
+
+    Args:
+        rate (float): Initial rate, in calls per second
+        min_rate (float): Lowest rate the limiter decreases to
+        max_rate (float): Highest rate the limiter increases to
+        increase (float): Rate added after each successful call
+        decrease (float): Factor the rate is multiplied by after each throttled call
+    """
+
+    def __init__(
+        self,
+        rate: float = 20,
+        min_rate: float = 1,
+        max_rate: float = 1000,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+    ):
+        """Initialize the limiter."""
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for a token to be available, and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                # The bucket holds at most one second worth of calls.
+                self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """Increase the rate after a successful call."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        """Decrease the rate after a throttled call, and drop the tokens accumulated at the previous rate."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RetryBudget:
+    """Number of retries a job can spend across all of its calls, so a throttled job fails instead of stalling.
+
+    Args:
+        retries (int): Number of retries available
+    """
+
+    def __init__(self, retries: int = DEFAULT_RETRY_BUDGET):
+        """Initialize the budget."""
+        self.retries = retries
+        self.lock = threading.Lock()
+
+    def consume(self) -> bool:
+        """Take a retry from the budget, return False when the budget is exhausted."""
+        with self.lock:
+            if self.retries <= 0:
+                return False
+            self.retries -= 1
+            return True
+
+
+_RATE_LIMITERS = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(key) -> AdaptiveRateLimiter:
+    """Get the rate limiter shared by every caller of an API in the process.
+
+    Args:
+        key (hashable): API identifier, like the service name and region
+    Returns:
+        (AdaptiveRateLimiter): Rate limiter
+    """
+    with _RATE_LIMITERS_LOCK:
+        if key not in _RATE_LIMITERS:
+            _RATE_LIMITERS[key] = AdaptiveRateLimiter()
+        return _RATE_LIMITERS[key]
+
+
+def call_with_retries(
+    func,
+    limiter: AdaptiveRateLimiter,
+    budget: RetryBudget,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    **kwargs,
+):
+    """Call an AWS API at the rate allowed by the limiter, retrying throttled calls with jittered backoff.
+
+    Args:
+        func (callable): Boto3 client method
+        limiter (AdaptiveRateLimiter): Rate limiter of the API
+        budget (RetryBudget): Retry budget of the job
+        max_attempts (int): Maximum number of attempts of the call
+        base_delay (float): Base backoff delay in seconds, doubled on each attempt
+        max_delay (float): Maximum backoff delay in seconds
+        **kwargs: Arguments of the call
+    Returns:
+        Response of the call
+    """
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            response = func(**kwargs)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES:
+                raise
+            limiter.on_throttle()
+            attempt += 1
+            if attempt >= max_attempts:
+                raise NornirNetboxException(f"Throttled after {attempt} attempts: `{exc}`") from exc
+            if not budget.consume():
+                raise NornirNetboxException(f"Retry budget of the job exhausted, throttled: `{exc}`") from exc
+            # Full jitter backoff.
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))  # nosec
+            continue
+        limiter.on_success()
+        return response
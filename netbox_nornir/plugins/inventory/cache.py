@@ -0,0 +1,156 @@
+"""Inventory snapshot cache, kept in the Django cache.
+
+Host specs are cached per device and shared by every filter set, the devices matching a filter set are cached
+separately, under a generation. Saving or deleting a device, or any object a host spec is derived from, drops the
+specs of the affected devices and starts a new generation, as do changes of the objects filter sets match devices
+on, like tags, regions or clusters, see `netbox_nornir.signals`. Host specs holding config contexts are also cached
+under a generation of their own, started anew when any config context changes.
+"""
+import hashlib
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import QuerySet
+
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+CACHE_KEY_PREFIX = "netbox_nornir.inventory"
+# Bump when the layout of the cached host specs changes.
+CACHE_VERSION = 1
+# Host specs are cached separately for inventories loading extra data, like config contexts.
+HOST_VARIANTS = ["default", "config_context"]
+
+
+def _host_key(device_id: int, variant: str = "default", generation: Optional[str] = None) -> str:
+    return f"{CACHE_KEY_PREFIX}.host.{variant}.{generation}.{device_id}"
+
+
+def _variant_generation_key(variant: str) -> str:
+    return f"{CACHE_KEY_PREFIX}.host.{variant}.generation"
+
+
+def _members_key(queryset: QuerySet, generation: Optional[str]) -> Optional[str]:
+    """Get the cache key of the devices matching a queryset, None when the queryset can't be cached."""
+    try:
+        query = str(queryset.query)
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha256(query.encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}.members.{generation}.{digest}"
+
+
+def get_generation() -> Optional[str]:
+    """Get the current generation of the filter set memberships.
+
+    Read it before running the device query, and cache the result under it, so a change made while the query runs
+    leaves the result under a generation no longer read.
+    """
+    return cache.get(f"{CACHE_KEY_PREFIX}.generation", version=CACHE_VERSION)
+
+
+def get_variant_generation(variant: str = "default") -> Optional[str]:
+    """Get the current generation of the host specs of a variant.
+
+    Read it before building the host specs, and cache them under it, so a change made while they are built leaves
+    them under a generation no longer read.
+    """
+    return cache.get(_variant_generation_key(variant), version=CACHE_VERSION)
+
+
+def get_members(queryset: QuerySet, generation: Optional[str]) -> Optional[List[int]]:
+    """Get the cached ids of the devices matching a queryset.
+
+    Args:
+        queryset (QuerySet): Device queryset
+        generation (str): Generation of the memberships, from `get_generation`
+    Returns:
+        (list): List of device ids, None on a cache miss
+    """
+    key = _members_key(queryset, generation)
+    if key is None:
+        return None
+    return cache.get(key, version=CACHE_VERSION)
+
+
+def set_members(
+    queryset: QuerySet, device_ids: List[int], generation: Optional[str], timeout: int = DEFAULT_CACHE_TIMEOUT
+):
+    """Cache the ids of the devices matching a queryset.
+
+    Args:
+        queryset (QuerySet): Device queryset
+        device_ids (list): List of device ids
+        generation (str): Generation of the memberships read before running the queryset, from `get_generation`
+        timeout (int): Cache timeout in seconds
+    """
+    key = _members_key(queryset, generation)
+    if key is not None:
+        cache.set(key, device_ids, timeout=timeout, version=CACHE_VERSION)
+
+
+def get_hosts(device_ids: Iterable[int], variant: str = "default", generation: Optional[str] = None) -> Dict[int, Dict]:
+    """Get the cached host specs of devices.
+
+    Args:
+        device_ids (list): List of device ids
+        variant (str): Variant of the host specs
+        generation (str): Generation of the host specs of the variant, from `get_variant_generation`
+    Returns:
+        (dict): Host specs by device id, devices missing from the cache are left out
+    """
+    keys = {_host_key(device_id, variant, generation): device_id for device_id in device_ids}
+    cached = cache.get_many(keys.keys(), version=CACHE_VERSION)
+    return {keys[key]: host_spec for key, host_spec in cached.items()}
+
+
+def set_hosts(
+    host_specs: Dict[int, Dict],
+    variant: str = "default",
+    generation: Optional[str] = None,
+    timeout: int = DEFAULT_CACHE_TIMEOUT,
+):
+    """Cache host specs.
+
+    Args:
+        host_specs (dict): Host specs by device id
+        variant (str): Variant of the host specs
+        generation (str): Generation of the host specs of the variant read before building them, from
+            `get_variant_generation`
+        timeout (int): Cache timeout in seconds
+    """
+    cache.set_many(
+        {_host_key(device_id, variant, generation): host_spec for device_id, host_spec in host_specs.items()},
+        timeout=timeout,
+        version=CACHE_VERSION,
+    )
+
+
+def invalidate_hosts(device_ids: Iterable[int], variants: List[str] = None):
+    """Drop the cached host specs of devices, and every cached filter set membership.
+
+    Args:
+        device_ids (list): List of device ids
+        variants (list): Variants of the host specs to drop, defaults to every variant
+    """
+    variants = variants or HOST_VARIANTS
+    generations = {variant: get_variant_generation(variant) for variant in variants}
+    cache.delete_many(
+        [
+            _host_key(device_id, variant, generation)
+            for device_id in device_ids
+            for variant, generation in generations.items()
+        ],
+        version=CACHE_VERSION,
+    )
+    invalidate_members()
+
+
+def invalidate_variant(variant: str):
+    """Drop the cached host specs of every device for a variant, by starting a new generation of the variant."""
+    cache.set(_variant_generation_key(variant), uuid.uuid4().hex, timeout=None, version=CACHE_VERSION)
+
+
+def invalidate_members():
+    """Drop every cached filter set membership, by starting a new generation."""
+    cache.set(f"{CACHE_KEY_PREFIX}.generation", uuid.uuid4().hex, timeout=None, version=CACHE_VERSION)
@@ -0,0 +1,69 @@
+"""Nornir hosts whose credentials are only resolved when a connection to them is opened."""
+import threading
+from typing import Callable, Optional
+
+from nornir.core.inventory import ConnectionOptions, Host
+
+
+class CredentialsResolver:
+    """Resolve the credentials of a host once, from the first thread needing them.
+
+    Args:
+        resolve (callable): Set the credentials and connection options of the nornir host it's called with
+    """
+
+    def __init__(self, resolve: Callable[[Host], None]):
+        """Initialize the resolver."""
+        self.resolve = resolve
+        self.resolved = False
+        self.lock = threading.Lock()
+
+    def __call__(self, host: Host):
+        """Resolve the credentials of the host, unless already resolved."""
+        with self.lock:
+            if not self.resolved:
+                self.resolve(host)
+                self.resolved = True
+
+
+class DeferredCredentialsHost(Host):
+    """Nornir host resolving its credentials just before its first connection is opened.
+
+    The host is created without username, password, secret or connection options. They are set by its resolver
+    when connection parameters are first read, which happens in the runner thread running a task against the host.
+
+    Args:
+        resolver (CredentialsResolver): Credentials resolver of the host
+        *args: `Host` arguments
+        **kwargs: `Host` arguments
+    """
+
+    __slots__ = ("resolver",)
+
+    def __init__(self, *args, resolver: Optional[CredentialsResolver] = None, **kwargs):
+        """Initialize the host."""
+        self.resolver = resolver
+        super().__init__(*args, **kwargs)
+
+    def resolve_credentials(self):
+        """Resolve the credentials of the host, unless already resolved."""
+        if self.resolver is not None:
+            self.resolver(self)
+
+    def get_connection_parameters(self, connection: Optional[str] = None) -> ConnectionOptions:
+        """Get the connection parameters of the host, resolving its credentials first."""
+        self.resolve_credentials()
+        return super().get_connection_parameters(connection)
+
+
+def resolve_credentials(host: Host):
+    """Resolve the credentials of a host whose credentials are deferred, other hosts are left untouched.
+
+    Tasks reading `host.username`, `host.password` or `host.data["secret"]` directly, instead of opening a nornir
+    connection, must call it first.
+
+    Args:
+        host (Host): Nornir host
+    """
+    if isinstance(host, DeferredCredentialsHost):
+        host.resolve_credentials()
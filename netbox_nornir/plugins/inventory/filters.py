@@ -0,0 +1,137 @@
+"""Translate nornir filters into Django queries, so they are applied by the device query."""
+from typing import Any, Dict, Tuple, Union
+
+from django.db.models import Q
+from nornir.core.filter import AND, NOT_F, OR, F
+
+# Device lookups of the host attributes and host data set by `NetboxORMInventory`.
+HOST_LOOKUPS = {
+    "id": "pk",
+    "name": "name",
+    "platform": "platform__napalm_driver",
+    "role": "device_role__slug",
+    "site": "site__slug",
+    "type": "device_type__slug",
+}
+
+# Keys of the host data set by `NetboxORMInventory`, which can also be filtered as `data__<key>`.
+DATA_KEYS = ["id", "role", "site", "type"]
+
+# Device lookups of the group name prefixes set by `NetboxORMInventory.get_host_groups`.
+GROUP_LOOKUPS = {
+    "manufacturer": "device_type__manufacturer__slug",
+    "platform": "platform__napalm_driver",
+    "role": "device_role__slug",
+    "site": "site__slug",
+    "tenant": "tenant__slug",
+    "type": "device_type__slug",
+}
+
+
+# Query matching every device, unlike `Q()` which is dropped when combined with another query.
+MATCH_ALL = Q(pk__isnull=False)
+
+
+class UntranslatableFilter(Exception):
+    """Raised when a nornir filter rule has no equivalent device query."""
+
+
+def _group_q(group: Any) -> Q:
+    """Get the query matching the devices part of a group."""
+    if group == "global":
+        return MATCH_ALL
+    if isinstance(group, str) and "__" in group:
+        prefix, value = group.split("__", 1)
+        if prefix in GROUP_LOOKUPS:
+            return Q(**{GROUP_LOOKUPS[prefix]: value})
+    raise UntranslatableFilter(f"Unknown group {group}")
+
+
+def _any_q(queries) -> Q:
+    """Get the query matching the devices matched by any of the queries."""
+    if not queries:
+        return Q(pk__in=[])
+    query = queries[0]
+    for other_query in queries[1:]:
+        query |= other_query
+    return query
+
+
+def _all_q(queries) -> Q:
+    """Get the query matching the devices matched by all of the queries."""
+    if not queries:
+        return MATCH_ALL
+    query = queries[0]
+    for other_query in queries[1:]:
+        query &= other_query
+    return query
+
+
+def _rule_q(rule: str, value: Any) -> Q:
+    """Get the query matching a single `F` rule, like `site`, `data__role` or `groups__contains`."""
+    keys = rule.split("__")
+    if keys[0] == "data" and len(keys) > 1 and keys[1] in DATA_KEYS:
+        keys = keys[1:]
+
+    if keys[0] == "groups" and len(keys) == 2:
+        if keys[1] == "contains":
+            return _group_q(value)
+        if keys[1] == "any":
+            return _any_q([_group_q(group) for group in value])
+        if keys[1] == "all":
+            return _all_q([_group_q(group) for group in value])
+
+    if keys[0] in HOST_LOOKUPS:
+        lookup = HOST_LOOKUPS[keys[0]]
+        if len(keys) == 1:
+            return Q(**{lookup: value})
+        if len(keys) == 2 and keys[1] in ("in", "any"):
+            return Q(**{f"{lookup}__in": list(value)})
+
+    raise UntranslatableFilter(f"Unable to translate the filter rule {rule}")
+
+
+def filter_to_q(filter_obj: Union[F, AND, OR, Dict]) -> Tuple[Q, bool]:
+    """Translate a nornir filter into a device query.
+
+    The query always matches a superset of the hosts matched by the filter. Rules without an equivalent query are
+    left out of it, in which case the filter must still be applied to the inventory once loaded.
+
+    Args:
+        filter_obj (F, AND, OR, dict): Nornir filter, or keyword arguments of `Nornir.filter`
+    Returns:
+        (tuple): Device query, and whether the query matches exactly the hosts matched by the filter
+    """
+    if isinstance(filter_obj, dict):
+        filter_obj = F(**filter_obj)
+
+    if isinstance(filter_obj, AND):
+        query_1, exact_1 = filter_to_q(filter_obj.op1)
+        query_2, exact_2 = filter_to_q(filter_obj.op2)
+        return query_1 & query_2, exact_1 and exact_2
+
+    if isinstance(filter_obj, OR):
+        query_1, exact_1 = filter_to_q(filter_obj.op1)
+        query_2, exact_2 = filter_to_q(filter_obj.op2)
+        if not (exact_1 and exact_2):
+            return Q(), False
+        return query_1 | query_2, True
+
+    if isinstance(filter_obj, NOT_F):
+        try:
+            query = _any_q([_rule_q(rule, value) for rule, value in filter_obj.filters.items()])
+        except UntranslatableFilter:
+            return Q(), False
+        return ~query, True
+
+    if isinstance(filter_obj, F):
+        queries = []
+        exact = True
+        for rule, value in filter_obj.filters.items():
+            try:
+                queries.append(_rule_q(rule, value))
+            except UntranslatableFilter:
+                exact = False
+        return _all_q(queries), exact
+
+    return Q(), False
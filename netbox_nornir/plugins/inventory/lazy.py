@@ -0,0 +1,213 @@
+"""Lazy nornir inventory, hosts are only built when they are used."""
+import threading
+from typing import Any, Callable, Dict, Iterable, KeysView, Optional
+
+from nornir.core.inventory import Host, Hosts, Inventory, ParentGroups
+
+# Host attributes a `HostView` can't answer from the host spec, using them builds the host.
+_HOST_ATTRIBUTES = {attribute for attribute in dir(Host) if not attribute.startswith("__")} - {
+    "data",
+    "get",
+    "groups",
+    "hostname",
+    "name",
+    "platform",
+    "port",
+}
+
+
+class HostLoader:
+    """Build the hosts of a lazy inventory on demand, once per host.
+
+    Args:
+        index (dict): Host specs by host name
+        build (callable): Build a nornir host from its name
+        groups (Groups): Inventory groups
+        prefetch (callable): Prepare the build of several hosts at once, from their names
+    """
+
+    def __init__(self, index: Dict[str, Dict], build: Callable[[str], Host], groups, prefetch=None):
+        """Initialize the loader."""
+        self.index = index
+        self.build = build
+        self.groups = groups
+        self.prefetch = prefetch
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def get_host(self, name: str) -> Host:
+        """Get a host, building it on first access."""
+        with self.lock:
+            if name not in self.hosts:
+                self.hosts[name] = self.build(name)
+            return self.hosts[name]
+
+    def prefetch_hosts(self, names: Iterable[str]):
+        """Prepare the build of the hosts not built yet, like fetching their credentials in bulk."""
+        missing_names = [name for name in names if name in self.index and name not in self.hosts]
+        if self.prefetch and missing_names:
+            self.prefetch(missing_names)
+
+    def get_view(self, name: str):
+        """Get the host if already built, a view of its spec otherwise."""
+        if name in self.hosts:
+            return self.hosts[name]
+        return HostView(self, name)
+
+
+class HostView:
+    """Read-only view of a host spec, used to evaluate filters without building the host.
+
+    Attributes which can't be answered from the spec, like credentials or connection options, are read from the
+    host, which is then built.
+    """
+
+    __slots__ = ("loader", "name", "groups")
+
+    def __init__(self, loader: HostLoader, name: str):
+        """Initialize the view."""
+        self.loader = loader
+        self.name = name
+        self.groups = ParentGroups([loader.groups[group] for group in loader.index[name]["groups"]])
+
+    @property
+    def data(self) -> Dict:
+        """Host data."""
+        return self.loader.index[self.name]["data"]
+
+    @property
+    def hostname(self) -> str:
+        """Host hostname."""
+        return self.loader.index[self.name]["hostname"]
+
+    @property
+    def platform(self) -> str:
+        """Host platform."""
+        return self.loader.index[self.name]["platform"]
+
+    @property
+    def port(self) -> Optional[int]:
+        """Host port, inherited from the groups of the host when unset."""
+        port = self.loader.index[self.name].get("port")
+        if port is None:
+            port = next((group.port for group in self.groups if group.port is not None), None)
+        return port
+
+    def __getattr__(self, name: str) -> Any:
+        """Read the attribute from the host."""
+        if name in _HOST_ATTRIBUTES:
+            return getattr(self.loader.get_host(self.name), name)
+        raise AttributeError(name)
+
+    def __getitem__(self, item: str) -> Any:
+        """Get an item from the host data, or the data of its groups."""
+        try:
+            return self.data[item]
+        except KeyError:
+            for group in self.groups:
+                try:
+                    return group[item]
+                except KeyError:
+                    continue
+            raise
+
+    def get(self, item: str, default: Any = None) -> Any:
+        """Get an attribute, or an item from the host data, like `Host.get`."""
+        if hasattr(self, item):
+            return getattr(self, item)
+        try:
+            return self.__getitem__(item)
+        except KeyError:
+            return default
+
+
+class LazyHosts(Hosts):
+    """Hosts mapping building nornir hosts on first access.
+
+    Names, lengths and membership are answered from the host specs, the hosts themselves are built by
+    `__getitem__`, `values` and `items`.
+    """
+
+    def __init__(self, loader: HostLoader, names: Iterable[str] = None):
+        """Initialize the mapping."""
+        super().__init__()
+        self.loader = loader
+        self.names = dict.fromkeys(loader.index if names is None else names)
+
+    def __getitem__(self, name: str) -> Host:
+        """Get a host, building it on first access."""
+        if not dict.__contains__(self, name):
+            if name not in self.names:
+                raise KeyError(name)
+            dict.__setitem__(self, name, self.loader.get_host(name))
+        return dict.__getitem__(self, name)
+
+    def __setitem__(self, name: str, host: Host):
+        """Add a host."""
+        self.names[name] = None
+        dict.__setitem__(self, name, host)
+
+    def __delitem__(self, name: str):
+        """Remove a host."""
+        del self.names[name]
+        if dict.__contains__(self, name):
+            dict.__delitem__(self, name)
+
+    def __contains__(self, name: object) -> bool:
+        """Check the host is part of the mapping, without building it."""
+        return name in self.names
+
+    def __iter__(self):
+        """Iterate over the host names."""
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        """Get the number of hosts."""
+        return len(self.names)
+
+    def get(self, name: str, default: Any = None) -> Host:
+        """Get a host, building it on first access."""
+        if name not in self.names:
+            return default
+        return self[name]
+
+    def keys(self) -> KeysView:
+        """Get the host names."""
+        return self.names.keys()
+
+    def values(self):
+        """Get the hosts, building them."""
+        self.loader.prefetch_hosts(self.names)
+        return [self[name] for name in self.names]
+
+    def items(self):
+        """Get the host names and hosts, building them."""
+        self.loader.prefetch_hosts(self.names)
+        return [(name, self[name]) for name in self.names]
+
+    def view(self, name: str):
+        """Get the host if already built, a view of its spec otherwise."""
+        return self.loader.get_view(name)
+
+
+class LazyInventory(Inventory):
+    """Nornir inventory whose filters are evaluated against the host specs, without building the hosts."""
+
+    __slots__ = ()
+
+    def filter(self, filter_obj=None, filter_func=None, **kwargs) -> "LazyInventory":
+        """Filter the inventory, like `Inventory.filter`."""
+        filter_func = filter_obj or filter_func
+        if filter_func:
+            names = [name for name in self.hosts if filter_func(self.hosts.view(name), **kwargs)]
+        else:
+            names = [
+                name
+                for name in self.hosts
+                if all(self.hosts.view(name).get(key) == value for key, value in kwargs.items())
+            ]
+        return LazyInventory(
+            hosts=LazyHosts(self.hosts.loader, names=names),
+            groups=self.groups,
+            defaults=self.defaults,
+        )
@@ -1,8 +1,16 @@
 """NetBox ORM inventory plugin."""
-from typing import Any, Dict
+import asyncio
+import copy
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List
 
 from django.db.models import QuerySet
+from django.utils.functional import SimpleLazyObject
 from django.utils.module_loading import import_string
+from nornir.core.filter import F
 from nornir.core.inventory import (
     ConnectionOptions,
     Defaults,
@@ -15,9 +23,71 @@ from nornir.core.inventory import (
 )
 
 from dcim.models import Device
+from netbox.config import get_config
+from utilities.utils import deepmerge
 
 from netbox_nornir.constraints import CONNECTION_ENABLE_PASSWORD_PATHS, CONNECTION_SECRETS_PATHS, PLUGIN_CFG
 from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.credentials.base import DEFAULT_CONCURRENCY
+from netbox_nornir.plugins.inventory import cache as inventory_cache
+from netbox_nornir.plugins.inventory.deferred import CredentialsResolver, DeferredCredentialsHost
+from netbox_nornir.plugins.inventory.filters import filter_to_q
+from netbox_nornir.plugins.inventory.lazy import HostLoader, LazyHosts, LazyInventory
+from netbox_nornir.utils import run_coroutine
+
+# Relations read by `create_host` and `get_host_groups`, joined into the device query up front.
+DEVICE_SELECT_RELATED = [
+    "device_role",
+    "device_type__manufacturer",
+    "platform",
+    "primary_ip4",
+    "primary_ip6",
+    "site",
+    "tenant",
+]
+
+# Columns read when streaming the inventory from projected rows instead of device models.
+DEVICE_VALUES_FIELDS = [
+    "id",
+    "name",
+    "custom_field_data",
+    "device_role__slug",
+    "device_type__slug",
+    "device_type__manufacturer__slug",
+    "platform",
+    "platform__napalm_driver",
+    "platform__slug",
+    "primary_ip4__address",
+    "primary_ip6__address",
+    "site__slug",
+    "tenant",
+    "tenant__slug",
+]
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _get_primary_ip(row):
+    """Get the primary IP address of a projected device row, honouring `PREFER_IPV4` like `Device.primary_ip`."""
+    if get_config().PREFER_IPV4 and row["primary_ip4__address"]:
+        return row["primary_ip4__address"]
+    return row["primary_ip6__address"] or row["primary_ip4__address"]
+
+
+def _render_config_context(config_context_data, local_context_data):
+    """Render the config context of a projected device row, like `Device.get_config_context`.
+
+    Args:
+        config_context_data (list): Data of the config contexts applying to the device, ordered by weight
+        local_context_data (dict): Local config context data of the device
+    Returns:
+        (dict): Rendered config context
+    """
+    data = {}
+    for context in config_context_data or []:
+        data = deepmerge(data, context)
+    if local_context_data:
+        data = deepmerge(data, local_context_data)
+    return data
 
 
 def _set_dict_key_path(dictionary, key_path, value):
@@ -70,20 +140,16 @@ def build_out_enable_password_paths(connection_options, device_secret):
         _set_dict_key_path(connection_options, secret_path, device_secret)
 
 
-def set_host(data: Dict[str, Any], name: str, groups, host, defaults) -> Host:
-    """Set host.
+def build_connection_options(connection_options: Dict[str, Dict]) -> Dict[str, ConnectionOptions]:
+    """Build nornir connection options.
 
     Args:
-        data (dict): Data
-        name (str): Name
-        groups (dict): Groups
-        host (dict): Host
-        defaults (dict): Defaults
+        connection_options (dict): Connection options by connection plugin name
     Returns:
-        Host: Host
+        (dict): Nornir connection options by connection plugin name
     """
     connection_option = {}
-    for key, value in data.get("connection_options", {}).items():
+    for key, value in connection_options.items():
         connection_option[key] = ConnectionOptions(
             hostname=value.get("hostname"),
             username=value.get("username"),
@@ -92,7 +158,30 @@ def set_host(data: Dict[str, Any], name: str, groups, host, defaults) -> Host:
             platform=value.get("platform"),
             extras=value.get("extras"),
         )
-    return Host(
+    return connection_option
+
+
+def set_host(data: Dict[str, Any], name: str, groups, host, defaults, connection_options=None) -> Host:
+    """Set host.
+
+    Args:
+        data (dict): Data
+        name (str): Name
+        groups (dict): Groups
+        host (dict): Host
+        defaults (dict): Defaults
+        connection_options (dict): Nornir connection options, built from `data` when not given
+    Returns:
+        Host: Host, a `DeferredCredentialsHost` when the host spec holds a credentials `resolver`
+    """
+    if connection_options is None:
+        connection_options = build_connection_options(data.get("connection_options", {}))
+    kwargs = {}
+    host_class = Host
+    if host.get("resolver") is not None:
+        kwargs["resolver"] = host["resolver"]
+        host_class = DeferredCredentialsHost
+    return host_class(
         name=name,
         hostname=host["hostname"],
         username=host["username"],
@@ -101,7 +190,8 @@ def set_host(data: Dict[str, Any], name: str, groups, host, defaults) -> Host:
         data=data,
         groups=groups,
         defaults=defaults,
-        connection_options=connection_option,
+        connection_options=connection_options,
+        **kwargs,
     )
 
 
@@ -114,10 +204,43 @@ class NetboxORMInventory:
         filters: Dict = None,
         credentials_class: str = "netbox_nornir.plugins.credentials.env_vars.CredentialsEnvVars",
         credentials_params: Dict = None,
+        select_related: List[str] = None,
+        prefetch_related: List[str] = None,
+        cache: bool = False,
+        cache_timeout: int = None,
+        lazy: bool = False,
+        lazy_credentials: bool = False,
+        async_credentials: bool = False,
+        credentials_concurrency: int = DEFAULT_CONCURRENCY,
+        stream: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        config_context: bool = False,
+        nornir_filter=None,
     ) -> None:
         """Initialize inventory."""
+        # A dict is the keyword arguments of `F`, for both the device query and the inventory filter.
+        self.nornir_filter = F(**nornir_filter) if isinstance(nornir_filter, dict) else nornir_filter
+        self.nornir_filter_exact = True
+        self.config_context = config_context
+        self.config_contexts = {}
+        self.lazy = lazy
+        self.lazy_credentials = lazy_credentials
+        self.async_credentials = async_credentials
+        self.credentials_concurrency = credentials_concurrency
+        self.stream = stream
+        self.chunk_size = chunk_size
+        if cache and not PLUGIN_CFG.get("inventory_cache", False):
+            raise NornirNetboxException(
+                "The inventory cache requires the `inventory_cache` plugin setting, keeping the cache up to date."
+            )
+        self.cache = cache
+        self.cache_timeout = cache_timeout or PLUGIN_CFG.get(
+            "inventory_cache_timeout", inventory_cache.DEFAULT_CACHE_TIMEOUT
+        )
         self.queryset = queryset
         self.filters = filters
+        self.select_related = select_related or []
+        self.prefetch_related = prefetch_related or []
 
         if isinstance(credentials_class, str):
             self.cred_class = import_string(credentials_class)
@@ -126,15 +249,75 @@ class NetboxORMInventory:
                 f"A valid credentials class path (as defined by Django's import_string function) is required, but got {credentials_class} which is not importable."
             )
         self.credentials_params = credentials_params
+        self.connection_options = {}
+        self.nornir_connection_options = {}
+        self.platform_group_options = {}
+        # Guards the connection options shared between hosts, set from runner threads with `lazy_credentials`.
+        self.credentials_lock = threading.Lock()
 
-    def load(self) -> Inventory:
-        """Load inventory."""
+    def get_select_related(self) -> List[str]:
+        """Get the relations to join into the device query.
+
+        Credentials classes can declare extra relations they read from the device with a `select_related`
+        attribute, subclasses can extend this method.
+
+        Returns:
+            (list): List of relation lookups
+        """
+        relations = [
+            *DEVICE_SELECT_RELATED,
+            *getattr(self.cred_class, "select_related", []),
+            *self.select_related,
+        ]
+        return list(dict.fromkeys(relations))
+
+    def get_prefetch_related(self) -> List[str]:
+        """Get the relations to prefetch alongside the device query.
+
+        Credentials classes can declare extra relations with a `prefetch_related` attribute, subclasses can
+        extend this method.
+
+        Returns:
+            (list): List of relation lookups
+        """
+        relations = [
+            *getattr(self.cred_class, "prefetch_related", []),
+            *self.prefetch_related,
+        ]
+        return list(dict.fromkeys(relations))
+
+    def get_queryset(self) -> QuerySet:
+        """Build the device query used to load the inventory.
+
+        The query plan joins every relation read while building the hosts, so loading the inventory costs a
+        constant number of queries regardless of the number of devices.
 
-        if isinstance(self.queryset, QuerySet) and not self.queryset:
-            self.queryset = Device.objects.all()
+        Returns:
+            (QuerySet): Planned device queryset
+        """
+        queryset = self.queryset
+        if queryset is None or (isinstance(queryset, QuerySet) and not queryset.exists()):
+            queryset = Device.objects.all()
 
         if self.filters:
-            self.queryset = self.queryset.filter(**self.filters)
+            queryset = queryset.filter(**self.filters)
+
+        if self.nornir_filter is not None:
+            query, self.nornir_filter_exact = filter_to_q(self.nornir_filter)
+            queryset = queryset.filter(query)
+
+        # Related models are loaded whole, restricting their columns would defer them into a query per device.
+        queryset = queryset.select_related(*self.get_select_related())
+        prefetch_related = self.get_prefetch_related()
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if self.config_context:
+            queryset = queryset.annotate_config_context_data()
+        return queryset
+
+    def load(self) -> Inventory:
+        """Load inventory."""
+        self.queryset = self.get_queryset()
 
         hosts = Hosts()
         groups = Groups()
@@ -145,30 +328,176 @@ class NetboxORMInventory:
         else:
             cred = self.cred_class()
 
-        for device in self.queryset:
-            host = self.create_host(device, cred, {})
+        if self.lazy:
+            return self.apply_nornir_filter(self.load_lazy(cred, defaults))
+
+        if self.async_credentials and not self.lazy_credentials:
+            built_hosts = self.create_hosts_async(cred)
+        else:
+            if not self.lazy_credentials:
+                cred.prefetch(self.iter_credential_devices())
+
+            if self.cache:
+                built_hosts = (self.create_host_from_spec(spec, cred) for spec in self.get_cached_host_specs({}))
+            elif self.stream:
+                built_hosts = (self.create_host_from_spec(spec, cred) for spec in self.iter_host_specs({}))
+            else:
+                built_hosts = (self.create_host(device, cred, {}) for device in self.queryset)
 
-            hosts[device.name] = set_host(
+        for host in built_hosts:
+            for group in host["groups"]:
+                if group not in groups.keys():
+                    groups[group] = Group(name=group, defaults=defaults)
+
+            hosts[host["name"]] = set_host(
                 data=host["data"],
                 name=host["name"],
                 groups=host["groups"],
                 host=host,
                 defaults=defaults,
+                connection_options=self.get_host_connection_options(host, groups),
             )
 
-            for group in hosts[device.name].groups:
-                if group not in groups.keys():
-                    groups[group] = Group(name=group, defaults=defaults)
-
         for _host in hosts.values():
             _host.groups = ParentGroups([groups[_group] for _group in _host.groups])
         for _group in groups.values():
             _group.groups = ParentGroups([groups[_group] for _group in _group.groups])
 
-        return Inventory(hosts=hosts, groups=groups, defaults=defaults)
+        return self.apply_nornir_filter(Inventory(hosts=hosts, groups=groups, defaults=defaults))
+
+    def apply_nornir_filter(self, inventory: Inventory) -> Inventory:
+        """Apply the parts of the nornir filter which couldn't be translated into the device query.
+
+        Args:
+            inventory (Inventory): Inventory loaded from the device query
+        Returns:
+            (Inventory): Filtered inventory
+        """
+        if self.nornir_filter is None or self.nornir_filter_exact:
+            return inventory
+        return inventory.filter(self.nornir_filter)
+
+    def load_lazy(self, cred, defaults: Defaults) -> LazyInventory:
+        """Load a lazy inventory, hosts are only built, and their credentials resolved, when they are used.
+
+        Args:
+            cred (BaseCredentials): Credentials class instance
+            defaults (Defaults): Inventory defaults
+        Returns:
+            (LazyInventory): Lazy inventory
+        """
+        groups = Groups()
+
+        if self.cache:
+            devices = {}
+            host_specs = {spec["name"]: spec for spec in self.get_cached_host_specs({})}
+        elif self.stream:
+            devices = {}
+            host_specs = {spec["name"]: spec for spec in self.iter_host_specs({})}
+        else:
+            devices = {device.name: device for device in self.queryset}
+            host_specs = {name: self.get_host_spec(device, {}) for name, device in devices.items()}
+
+        for host_spec in host_specs.values():
+            for group in host_spec["groups"]:
+                if group not in groups:
+                    groups[group] = Group(name=group, defaults=defaults)
+
+        def build_host(name: str) -> Host:
+            device = devices.get(name)
+            if device is None:
+                host = self.create_host_from_spec(host_specs[name], cred)
+            else:
+                host = host_specs[name]
+                host["data"]["obj"] = device
+                host = self.set_host_credentials(host, cred, device=device)
+
+            nornir_host = set_host(
+                data=host["data"],
+                name=host["name"],
+                groups=host["groups"],
+                host=host,
+                defaults=defaults,
+                connection_options=self.get_host_connection_options(host, groups),
+            )
+            nornir_host.groups = ParentGroups([groups[_group] for _group in nornir_host.groups])
+            return nornir_host
+
+        def prefetch(names: List[str]):
+            cred.prefetch(
+                {
+                    "name": host_specs[name]["name"],
+                    "manufacturer": host_specs[name]["manufacturer"],
+                    "platform": host_specs[name]["platform_slug"],
+                }
+                for name in names
+            )
+
+        loader = HostLoader(
+            index=host_specs,
+            build=build_host,
+            groups=groups,
+            prefetch=None if self.lazy_credentials else prefetch,
+        )
+        return LazyInventory(hosts=LazyHosts(loader), groups=groups, defaults=defaults)
 
     def create_host(self, device, cred, params: Dict):
         """Create host."""
+        host = self.get_host_spec(device, params)
+        host["data"]["obj"] = device
+        return self.set_host_credentials(host, cred, device=device)
+
+    def create_host_from_spec(self, host: Dict, cred):
+        """Create host from a cached host spec, the device is only fetched when `host.data["obj"]` is used."""
+        host["data"]["obj"] = SimpleLazyObject(partial(Device.objects.get, pk=host["data"]["id"]))
+        return self.set_host_credentials(host, cred)
+
+    def create_hosts_async(self, cred) -> List[Dict]:
+        """Create every host, resolving their credentials concurrently with `BaseCredentials.aget_many`.
+
+        At most `credentials_concurrency` credentials are looked up at once, so resolving the credentials of the
+        whole inventory costs about as long as its slowest lookups.
+
+        Args:
+            cred (BaseCredentials): Credentials class instance
+        Returns:
+            (list): List of host specs, with their credentials set
+        """
+        hosts = []
+        if self.cache or self.stream:
+            host_specs = self.get_cached_host_specs({}) if self.cache else self.iter_host_specs({})
+            for host in host_specs:
+                host["data"]["obj"] = SimpleLazyObject(partial(Device.objects.get, pk=host["data"]["id"]))
+                hosts.append((host, None))
+        else:
+            for device in self.queryset:
+                host = self.get_host_spec(device, {})
+                host["data"]["obj"] = device
+                hosts.append((host, device))
+
+        async def get_many():
+            loop = asyncio.get_running_loop()
+            # Threads are only started for lookups actually running at once, as bounded by the credentials class.
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.credentials_concurrency))
+            return await cred.aget_many(
+                [self.get_device_creds_args(host, device=device) for host, device in hosts],
+                concurrency=self.credentials_concurrency,
+            )
+
+        creds = run_coroutine(get_many())
+        return [self.apply_host_credentials(host, host_creds) for (host, _), host_creds in zip(hosts, creds)]
+
+    def get_host_spec(self, device, params: Dict) -> Dict:
+        """Get the host attributes derived from the device, without any credentials.
+
+        The spec only holds plain values, so it can be kept in the inventory cache.
+
+        Args:
+            device (dcim.models.Device): Device obj
+            params (dict): Host parameters
+        Returns:
+            (dict): Host spec
+        """
         host = {"data": {}}
         if "use_fqdn" in params and params.get("use_fqdn"):
             host["hostname"] = f"{device.name}.{params.get('fqdn')}"
@@ -188,13 +517,99 @@ class NetboxORMInventory:
             raise NornirNetboxException(f"Platform missing from device {device.name}, preemptively failed.")
 
         host["platform"] = device.platform.napalm_driver
+        host["platform_slug"] = device.platform.slug
+        host["manufacturer"] = device.device_type.manufacturer.slug
         host["data"]["id"] = device.id
         host["data"]["type"] = device.device_type.slug
         host["data"]["site"] = device.site.slug
         host["data"]["role"] = device.device_role.slug
-        host["data"]["obj"] = device
+        if self.config_context:
+            host["data"]["config_context"] = self.intern_config_context(device.get_config_context())
+        host["groups"] = self.get_host_groups(device=device)
+        return host
 
-        username, password, secret, key = cred.get_device_creds(device=device)
+    @staticmethod
+    def get_device_creds(cred, host: Dict, device=None):
+        """Get the credentials of a host, from its device when loaded or from its spec otherwise.
+
+        Args:
+            cred (BaseCredentials): Credentials class instance
+            host (dict): Host spec
+            device (dcim.models.Device): Device obj
+        Returns:
+            (tuple): Tuple of username, password, secret, key
+        """
+        device, kwargs = NetboxORMInventory.get_device_creds_args(host, device=device)
+        return cred.get_device_creds(device=device, **kwargs)
+
+    @staticmethod
+    def get_device_creds_args(host: Dict, device=None):
+        """Get the arguments of `get_device_creds` for a host, its device when loaded or its spec otherwise.
+
+        Args:
+            host (dict): Host spec
+            device (dcim.models.Device): Device obj
+        Returns:
+            (tuple): Device, or dict with the device `id` and `name`, and keyword arguments
+        """
+        if device is not None:
+            return device, {}
+        return (
+            {"id": host["data"]["id"], "name": host["name"]},
+            {"manufacturer": host["manufacturer"], "platform": host["platform_slug"]},
+        )
+
+    def set_host_credentials(self, host: Dict, cred, device=None):
+        """Set the credentials and connection options of a host spec, or its credentials resolver when deferred."""
+        if self.lazy_credentials:
+            return self.defer_host_credentials(host, cred, device=device)
+        return self.apply_host_credentials(host, self.get_device_creds(cred, host, device=device))
+
+    def defer_host_credentials(self, host: Dict, cred, device=None):
+        """Set a resolver on a host spec, looking up its credentials when a connection to the host is opened.
+
+        Args:
+            host (dict): Host spec
+            cred (BaseCredentials): Credentials class instance
+            device (dcim.models.Device): Device obj
+        Returns:
+            (dict): Host spec, without credentials
+        """
+        host["username"] = None
+        host["password"] = None
+        host["data"]["secret"] = None
+        host["data"]["enable_password"] = None
+        host["data"]["key"] = None
+        host["data"]["connection_options"] = {}
+        host["resolver"] = CredentialsResolver(
+            partial(self.resolve_host_credentials, host_spec=host, cred=cred, device=device)
+        )
+        return host
+
+    def resolve_host_credentials(self, nornir_host: Host, host_spec: Dict, cred, device=None):
+        """Set the credentials and connection options of a host built with deferred credentials.
+
+        The credentials are looked up in the calling runner thread, concurrently with the other hosts, only the
+        connection options shared between hosts are set under a lock.
+
+        Args:
+            nornir_host (Host): Nornir host
+            host_spec (dict): Host spec, sharing its data with the nornir host
+            cred (BaseCredentials): Credentials class instance
+            device (dcim.models.Device): Device obj
+        """
+        creds = self.get_device_creds(cred, host_spec, device=device)
+        with self.credentials_lock:
+            host_spec["resolver"] = None
+            self.apply_host_credentials(host_spec, creds)
+            groups = {group.name: group for group in nornir_host.groups}
+            nornir_host.connection_options = self.get_host_connection_options(host_spec, groups)
+        nornir_host.username = host_spec["username"]
+        nornir_host.password = host_spec["password"]
+
+    def apply_host_credentials(self, host: Dict, creds):
+        """Set the credentials, as returned by `get_device_creds`, and connection options of a host spec."""
+        username, password, secret, key = creds
 
         host["username"] = username
         host["password"] = password
@@ -202,22 +617,210 @@ class NetboxORMInventory:
         host["data"]["enable_password"] = secret
         host["data"]["key"] = key
 
-        global_options = PLUGIN_CFG.get("connection_options", {"netmiko": {}, "napalm": {}, "scrapli": {}})
+        host["data"]["connection_options"] = self.get_connection_options(host["platform"], secret)
+        return host
+
+    def get_connection_options(self, platform: str, secret: str) -> Dict[str, Dict]:
+        """Get the connection options of a platform and secret combination, built once per inventory.
+
+        Args:
+            platform (str): Napalm driver of the platform
+            secret (str): Device secret
+        Returns:
+            (dict): Connection options by connection plugin name, shared by every host of the combination
+        """
+        combination = (platform, secret)
+        if combination not in self.connection_options:
+            global_options = PLUGIN_CFG.get("connection_options", {"netmiko": {}, "napalm": {}, "scrapli": {}})
 
-        conn_options = global_options
+            conn_options = copy.deepcopy(global_options)
 
-        build_out_secret_paths(conn_options, secret)
-        build_out_enable_password_paths(conn_options, secret)
+            build_out_secret_paths(conn_options, secret)
+            build_out_enable_password_paths(conn_options, secret)
 
-        host["data"]["connection_options"] = conn_options
-        host["groups"] = self.get_host_groups(device=device)
+            if platform:
+                if not conn_options.get("napalm"):
+                    conn_options["napalm"] = {}
+                conn_options["napalm"]["platform"] = platform
+
+            self.connection_options[combination] = conn_options
+            self.nornir_connection_options[combination] = build_connection_options(conn_options)
+        return self.connection_options[combination]
+
+    def get_host_connection_options(self, host: Dict, groups: Groups) -> Dict[str, ConnectionOptions]:
+        """Get the nornir connection options to set on a host, sharing them through its platform group.
+
+        The first platform and secret combination seen for a platform is set on the `platform__*` group, which
+        nornir hosts inherit from, so hosts with that combination carry no connection options of their own. Hosts
+        of the platform with another secret share the options built once for their combination.
+
+        Args:
+            host (dict): Host spec, with its credentials set
+            groups (Groups): Inventory groups, including the platform group of the host
+        Returns:
+            (dict): Nornir connection options by connection plugin name
+        """
+        if host.get("resolver") is not None:
+            # Set by `resolve_host_credentials` once the credentials are known.
+            return {}
+        combination = (host["platform"], host["data"]["secret"])
+        group_name = f"platform__{host['platform']}"
+        if self.platform_group_options.setdefault(group_name, combination) == combination:
+            groups[group_name].connection_options = self.nornir_connection_options[combination]
+            return {}
+        return self.nornir_connection_options[combination]
+
+    def get_cached_host_specs(self, params: Dict) -> List[Dict]:
+        """Get the host specs of the queryset from the inventory cache, building only the missing entries.
+
+        Args:
+            params (dict): Host parameters
+        Returns:
+            (list): List of host specs, in queryset order
+        """
+        variant = self.get_cache_variant()
+        generation = inventory_cache.get_generation()
+        variant_generation = inventory_cache.get_variant_generation(variant)
+        device_ids = inventory_cache.get_members(self.queryset, generation)
+        if device_ids is None:
+            device_ids = list(self.queryset.values_list("pk", flat=True))
+            inventory_cache.set_members(self.queryset, device_ids, generation, timeout=self.cache_timeout)
+
+        host_specs = inventory_cache.get_hosts(device_ids, variant=variant, generation=variant_generation)
+        if self.config_context:
+            for host_spec in host_specs.values():
+                host_spec["data"]["config_context"] = self.intern_config_context(host_spec["data"]["config_context"])
+        missing_ids = [device_id for device_id in device_ids if device_id not in host_specs]
+        if missing_ids:
+            missing_queryset = self.queryset.filter(pk__in=missing_ids)
+            if self.stream:
+                built_specs = {spec["data"]["id"]: spec for spec in self.iter_host_specs(params, missing_queryset)}
+            else:
+                built_specs = {device.pk: self.get_host_spec(device, params) for device in missing_queryset}
+            inventory_cache.set_hosts(
+                built_specs, variant=variant, generation=variant_generation, timeout=self.cache_timeout
+            )
+            host_specs.update(built_specs)
+
+        return [host_specs[device_id] for device_id in device_ids if device_id in host_specs]
+
+    def get_cache_variant(self) -> str:
+        """Get the variant of the cached host specs built by this inventory."""
+        if self.config_context:
+            return "config_context"
+        return "default"
+
+    def intern_config_context(self, config_context: Dict) -> Dict:
+        """Get the single shared instance of a rendered config context, identical contexts are stored once.
+
+        The instance is shared by every host with an identical context, it must not be mutated, tasks changing the
+        config context of a host work on a `copy.deepcopy` of it.
+        """
+        key = json.dumps(config_context, sort_keys=True, default=str)
+        return self.config_contexts.setdefault(key, config_context)
+
+    def iter_credential_devices(self) -> Iterator[Dict]:
+        """Stream the devices of the queryset as expected by `BaseCredentials.prefetch`.
 
-        if device.platform.napalm_driver:
-            if not host["data"]["connection_options"].get("napalm"):
-                host["data"]["connection_options"]["napalm"] = {}
-            host["data"]["connection_options"]["napalm"]["platform"] = device.platform.napalm_driver
+        Returns:
+            (iterator): Dicts with the device `name`, and its `manufacturer` and `platform` slugs
+        """
+        rows = (
+            self.queryset.prefetch_related(None)
+            .filter(platform__isnull=False)
+            .values_list("name", "device_type__manufacturer__slug", "platform__slug")
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for name, manufacturer, platform in rows:
+            yield {"name": name, "manufacturer": manufacturer, "platform": platform}
+
+    def iter_host_specs(self, params: Dict, queryset: QuerySet = None) -> Iterator[Dict]:
+        """Stream the host specs of the queryset, reading only the projected columns in chunks.
+
+        No device model is instantiated, so memory stays flat while the queryset is iterated.
+
+        Args:
+            params (dict): Host parameters
+            queryset (QuerySet): Device queryset, defaults to the inventory queryset
+        Returns:
+            (iterator): Host specs, in queryset order
+        """
+        if queryset is None:
+            queryset = self.queryset
+        fields = [*DEVICE_VALUES_FIELDS]
+        if self.config_context:
+            fields.extend(["config_context_data", "local_context_data"])
+        rows = queryset.prefetch_related(None).values(*fields).iterator(chunk_size=self.chunk_size)
+        for row in rows:
+            yield self.get_host_spec_from_row(row, params)
+
+    def get_host_spec_from_row(self, row: Dict, params: Dict) -> Dict:
+        """Get the host attributes derived from a projected device row, see `get_host_spec`.
+
+        Args:
+            row (dict): Device row, with the `DEVICE_VALUES_FIELDS` columns
+            params (dict): Host parameters
+        Returns:
+            (dict): Host spec
+        """
+        host = {"data": {}}
+        if "use_fqdn" in params and params.get("use_fqdn"):
+            host["hostname"] = f"{row['name']}.{params.get('fqdn')}"
+        else:
+            primary_ip = _get_primary_ip(row)
+            if primary_ip:
+                host["hostname"] = str(primary_ip.ip)
+            else:
+                host["hostname"] = row["name"]
+        host["name"] = row["name"]
+
+        if (row["custom_field_data"] or {}).get("access_port"):
+            host["port"] = row["custom_field_data"]["access_port"]
+        else:
+            host["port"] = 22
+
+        if not row["platform"]:
+            raise NornirNetboxException(f"Platform missing from device {row['name']}, preemptively failed.")
+
+        host["platform"] = row["platform__napalm_driver"]
+        host["platform_slug"] = row["platform__slug"]
+        host["manufacturer"] = row["device_type__manufacturer__slug"]
+        host["data"]["id"] = row["id"]
+        host["data"]["type"] = row["device_type__slug"]
+        host["data"]["site"] = row["site__slug"]
+        host["data"]["role"] = row["device_role__slug"]
+        if self.config_context:
+            host["data"]["config_context"] = self.intern_config_context(
+                _render_config_context(row["config_context_data"], row["local_context_data"])
+            )
+        host["groups"] = self.get_host_groups_from_row(row)
         return host
 
+    @staticmethod
+    def get_host_groups_from_row(row: Dict):
+        """Get the names of the groups a projected device row should be part of, see `get_host_groups`.
+
+        Args:
+            row (dict): Device row, with the `DEVICE_VALUES_FIELDS` columns
+        Returns:
+            (list): List of group names the device should be part of
+        """
+        groups = [
+            "global",
+            f"site__{row['site__slug']}",
+            f"role__{row['device_role__slug']}",
+            f"type__{row['device_type__slug']}",
+            f"manufacturer__{row['device_type__manufacturer__slug']}",
+        ]
+
+        if row["platform"]:
+            groups.append(f"platform__{row['platform__napalm_driver']}")
+
+        if row["tenant"]:
+            groups.append(f"tenant__{row['tenant__slug']}")
+
+        return groups
+
     @staticmethod
     def get_host_groups(device):
         """Get the names of the groups a given device should be part of.
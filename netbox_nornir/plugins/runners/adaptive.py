@@ -0,0 +1,318 @@
+"""Nornir runner adapting the number of hosts run at once, separately for each platform."""
+import fnmatch
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from nornir.core.inventory import Host
+from nornir.core.task import AggregatedResult, MultiResult, Result, Task
+
+from netbox_nornir.exceptions import NornirNetboxException
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_NUM_WORKERS = 100
+# Hosts of a pool are started in turn from each of their groups with this prefix, sites by default.
+DEFAULT_FAIR_GROUP_PREFIX = "site__"
+DEFAULT_LIMITS = {"initial": 20, "floor": 1, "ceiling": 100, "max_latency": None}
+# A host is slow when it took longer than this factor times the average latency of its pool.
+LATENCY_FACTOR = 2.0
+LATENCY_SMOOTHING = 0.2
+DECREASE_FACTOR = 0.5
+
+# Limits reached by the previous runs are kept in the Django cache, by pool key, so the next jobs start from them.
+CACHE_KEY_PREFIX = "netbox_nornir.runner_limit"
+LEARNT_LIMITS_TIMEOUT = 60 * 60 * 24
+
+
+def _limit_key(key: Tuple) -> str:
+    digest = hashlib.sha256("\0".join(part or "" for part in key).encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}.{digest}"
+
+
+def validate_limits(initial: int, floor: int, ceiling: int):
+    """Check the limits of a pool allow at least one host, and the floor isn't above the ceiling.
+
+    Raises:
+        NornirNetboxException: When the limits are invalid
+    """
+    if floor < 1 or initial < 1:
+        raise NornirNetboxException(
+            f"Runner limits must allow at least one host, got floor {floor}, initial {initial}."
+        )
+    if ceiling < floor:
+        raise NornirNetboxException(f"Runner limit ceiling {ceiling} is below its floor {floor}.")
+
+
+class ConcurrencyPool:
+    """Hosts run at most `limit` at once, the limit being adjusted with AIMD.
+
+    The limit grows by one for each `limit` hosts run successfully, and is halved when a host fails or is slow,
+    at most once for the hosts started before the previous decrease.
+
+    Args:
+        key (tuple): Platform and site of the hosts, site being None when pools aren't per site
+        initial (int): Initial limit
+        floor (int): Minimum limit
+        ceiling (int): Maximum limit
+        max_latency (float): Seconds above which a host is slow, defaults to twice the average latency
+    """
+
+    def __init__(self, key: Tuple, initial: int, floor: int, ceiling: int, max_latency: Optional[float] = None):
+        """Initialize the pool."""
+        validate_limits(initial, floor, ceiling)
+        self.key = key
+        self.floor = floor
+        self.ceiling = ceiling
+        self.max_latency = max_latency
+        self.limit = float(min(max(initial, floor), ceiling))
+        # Queued hosts by fair group, served in turn.
+        self.queues: Dict[Optional[str], deque] = OrderedDict()
+        self.active = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def name(self) -> str:
+        """Name of the pool in the job log."""
+        return "/".join(part for part in self.key if part)
+
+    def add(self, host: Host, fair_group: Optional[str] = None):
+        """Queue a host, behind the other hosts of its fair group."""
+        self.queues.setdefault(fair_group, deque()).append(host)
+
+    def start(self, can_run: Callable[[Host], bool]) -> Optional[Host]:
+        """Take the next host of the pool, from the next fair group whose next host can run.
+
+        Args:
+            can_run (callable): Whether a host can run, given the hosts of its groups already running
+        Returns:
+            (Host): Host to start, None when the pool is at its limit or none of its hosts can run
+        """
+        if self.active >= int(self.limit):
+            return None
+        for fair_group in list(self.queues):
+            queue = self.queues.pop(fair_group)
+            if not can_run(queue[0]):
+                self.queues[fair_group] = queue
+                continue
+            host = queue.popleft()
+            # The fair group goes to the back of the line.
+            if queue:
+                self.queues[fair_group] = queue
+            self.active += 1
+            return host
+        return None
+
+    def drain(self) -> List[Host]:
+        """Take every host still queued."""
+        hosts = [host for queue in self.queues.values() for host in queue]
+        self.queues.clear()
+        return hosts
+
+    def is_congested(self, latency: float, failed: bool) -> bool:
+        """Whether a host run shows the platform is overloaded."""
+        if failed:
+            return True
+        if self.max_latency is not None:
+            return latency > self.max_latency
+        return self.latency is not None and latency > LATENCY_FACTOR * self.latency
+
+    def finish(self, started: float, latency: float, failed: bool) -> bool:
+        """Record a host run, and adjust the limit.
+
+        Args:
+            started (float): Monotonic time the host was started
+            latency (float): Seconds the host took
+            failed (bool): Whether the host failed
+        Returns:
+            (bool): Whether the limit changed
+        """
+        self.active -= 1
+        self.completed += 1
+        self.failed += failed
+        previous = int(self.limit)
+        if self.is_congested(latency, failed):
+            if started > self.last_decrease:
+                self.limit = max(float(self.floor), self.limit * DECREASE_FACTOR)
+                self.last_decrease = time.monotonic()
+        else:
+            self.limit = min(float(self.ceiling), self.limit + 1 / self.limit)
+        if not failed:
+            self.latency = (
+                latency if self.latency is None else self.latency + LATENCY_SMOOTHING * (latency - self.latency)
+            )
+        return int(self.limit) != previous
+
+
+class AdaptiveRunner:
+    """Run hosts in threads, with a concurrency limit adjusted from the latency and failures of each platform.
+
+    Hosts are split into a pool per platform, or per platform and site. Each pool starts from the limit it reached in
+    the previous run, kept in the Django cache, or its `initial` limit, and adjusts it between its `floor` and
+    `ceiling`. The limits reached are logged at the end of the run, in the job log when the task is run with a
+    `logger`.
+
+    Within a pool, hosts are started in turn from each of their sites, or the groups of `fair_group_prefix`, and
+    `group_limits` caps the number of hosts of a group running at once across every pool, like the hosts of a site
+    behind a thin WAN link or a shared jump host.
+
+    Args:
+        num_workers (int): Maximum number of hosts run at once, across every pool
+        limits (dict): `initial`, `floor`, `ceiling` and `max_latency` by platform, with a `default` entry for the
+            other platforms
+        per_site (bool): Whether hosts have a pool per platform and site, instead of per platform
+        group_limits (dict): Maximum number of hosts running at once by group name, or by group name pattern like
+            `site__*`, exact names taking precedence over patterns
+        fair_group_prefix (str): Prefix of the groups the hosts of a pool are started in turn from
+    """
+
+    def __init__(
+        self,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        limits: Optional[Dict] = None,
+        per_site: bool = False,
+        group_limits: Optional[Dict[str, int]] = None,
+        fair_group_prefix: str = DEFAULT_FAIR_GROUP_PREFIX,
+    ):
+        """Initialize the runner."""
+        if num_workers < 1:
+            raise NornirNetboxException("Runner num_workers must allow at least one host.")
+        if any(limit < 1 for limit in (group_limits or {}).values()):
+            raise NornirNetboxException("Runner group limits must allow at least one host.")
+        for platform_limits in (limits or {}).values():
+            platform_limits = {**DEFAULT_LIMITS, **(limits or {}).get("default", {}), **platform_limits}
+            validate_limits(platform_limits["initial"], platform_limits["floor"], platform_limits["ceiling"])
+        self.num_workers = num_workers
+        self.limits = limits or {}
+        self.per_site = per_site
+        self.group_limits = group_limits or {}
+        self.fair_group_prefix = fair_group_prefix
+
+    def get_pool_key(self, host: Host) -> Tuple:
+        """Get the key of the pool of a host."""
+        site = host.data.get("site") if self.per_site else None
+        return (host.platform or "default", site)
+
+    def get_pool(self, key: Tuple, learnt_limit: Optional[int] = None) -> ConcurrencyPool:
+        """Build the pool of a key, starting from the limit it reached in the previous run."""
+        limits = {**DEFAULT_LIMITS, **self.limits.get("default", {}), **self.limits.get(key[0], {})}
+        initial = learnt_limit if learnt_limit and learnt_limit >= 1 else limits["initial"]
+        return ConcurrencyPool(key, initial, limits["floor"], limits["ceiling"], limits["max_latency"])
+
+    def get_fair_group(self, host: Host) -> Optional[str]:
+        """Get the group the host is started in turn with, None for hosts without such a group."""
+        return next((group.name for group in host.groups if group.name.startswith(self.fair_group_prefix)), None)
+
+    def get_group_limit(self, group_name: str) -> Optional[int]:
+        """Get the maximum number of hosts of a group running at once, None for unlimited groups."""
+        if group_name in self.group_limits:
+            return self.group_limits[group_name]
+        for pattern, limit in self.group_limits.items():
+            if fnmatch.fnmatchcase(group_name, pattern):
+                return limit
+        return None
+
+    def get_pools(self, hosts: List[Host]) -> List[ConcurrencyPool]:
+        """Split the hosts into their pools."""
+        keys = {host.name: self.get_pool_key(host) for host in hosts}
+        cache_keys = {_limit_key(key): key for key in set(keys.values())}
+        learnt_limits = {cache_keys[cache_key]: limit for cache_key, limit in cache.get_many(cache_keys).items()}
+        pools = {}
+        for host in hosts:
+            key = keys[host.name]
+            if key not in pools:
+                pools[key] = self.get_pool(key, learnt_limits.get(key))
+            pools[key].add(host, self.get_fair_group(host))
+        return list(pools.values())
+
+    def run(self, task: Task, hosts: List[Host]) -> AggregatedResult:
+        """Run a task over every host.
+
+        Args:
+            task (Task): Nornir task
+            hosts (list): Nornir hosts
+        Returns:
+            (AggregatedResult): Results by host name
+        """
+        result = AggregatedResult(task.name)
+        pools = self.get_pools(hosts)
+        # Limits of the groups of the hosts, and their hosts running, by group name.
+        group_limits = {}
+        running = {}
+        for host in hosts:
+            for group in host.groups:
+                if group.name not in group_limits:
+                    group_limits[group.name] = self.get_group_limit(group.name)
+        limited_groups = {name for name, limit in group_limits.items() if limit is not None}
+
+        def can_run(host: Host) -> bool:
+            return all(
+                running.get(group.name, 0) < group_limits[group.name]
+                for group in host.groups
+                if group.name in limited_groups
+            )
+
+        futures = {}
+        with ThreadPoolExecutor(self.num_workers) as executor:
+            while True:
+                # Start one host at a time from each pool, until the workers are busy or no pool can start one.
+                started = True
+                while started and len(futures) < self.num_workers:
+                    started = False
+                    for pool in pools:
+                        if len(futures) >= self.num_workers:
+                            break
+                        host = pool.start(can_run)
+                        if host is None:
+                            continue
+                        for group in host.groups:
+                            running[group.name] = running.get(group.name, 0) + 1
+                        futures[executor.submit(task.copy().start, host)] = (pool, host, time.monotonic())
+                        started = True
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pool, host, started_at = futures.pop(future)
+                    for group in host.groups:
+                        running[group.name] -= 1
+                    host_result: MultiResult = future.result()
+                    result[host.name] = host_result
+                    if pool.finish(started_at, time.monotonic() - started_at, host_result.failed):
+                        LOGGER.debug("Runner limit of %s set to %s", pool.name, int(pool.limit))
+        # No host is left queued with valid limits, fail any host left over rather than dropping it silently.
+        for pool in pools:
+            for host in pool.drain():
+                result[host.name] = self.get_unscheduled_result(task, host)
+        self.log_limits(task, pools)
+        return result
+
+    @staticmethod
+    def get_unscheduled_result(task: Task, host: Host) -> MultiResult:
+        """Get the failed result of a host the runner couldn't start."""
+        exception = NornirNetboxException(f"The runner couldn't schedule {host.name}, host skipped.")
+        multi_result = MultiResult(task.name)
+        multi_result.append(Result(host=host, result=str(exception), failed=True, exception=exception, name=task.name))
+        return multi_result
+
+    @staticmethod
+    def log_limits(task: Task, pools: List[ConcurrencyPool]):
+        """Keep the limits reached for the next runs, and log them."""
+        if not pools:
+            return
+        cache.set_many({_limit_key(pool.key): int(pool.limit) for pool in pools}, timeout=LEARNT_LIMITS_TIMEOUT)
+        message = "Runner limits: " + ", ".join(
+            f"{pool.name} {int(pool.limit)} ({pool.floor}-{pool.ceiling}, {pool.failed}/{pool.completed} failed)"
+            for pool in pools
+        )
+        LOGGER.info(message)
+        logger = task.params.get("logger")
+        if logger is not None and hasattr(logger, "log_info"):
+            logger.log_info(task.params.get("obj"), message)
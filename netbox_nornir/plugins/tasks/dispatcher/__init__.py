@@ -1,12 +1,24 @@
 """Used to intialize the dispatcher."""
 # pylint: disable=raise-missing-from
 
-import importlib
 import logging
+import threading
 
 from nornir.core.exceptions import NornirSubTaskError
 from nornir.core.task import Result, Task
+from netbox_nornir.constraints import PLUGIN_CFG
 from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.inventory.deferred import resolve_credentials
+from netbox_nornir.plugins.tasks.dispatcher.config_store import store_task_result
+from netbox_nornir.plugins.tasks.dispatcher.markers import (
+    get_config_marker,
+    get_unchanged_result,
+    is_conditional,
+    set_marker,
+    unchanged_config,
+)
+from netbox_nornir.plugins.tasks.dispatcher.pool import get_connection_pool
+from netbox_nornir.plugins.tasks.dispatcher.registry import DispatchRegistry
 
 
 LOGGER = logging.getLogger(__name__)
@@ -28,6 +40,46 @@ _DEFAULT_DRIVERS_MAPPING = {
     "paloalto_panos": "netbox_nornir.plugins.tasks.dispatcher.paloalto_panos.NetboxNornirDriver",
 }
 
+_REGISTRY = None
+# Registries of the mappings passed as `default_drivers_mapping`, by mapping items.
+_MAPPING_REGISTRIES = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> DispatchRegistry:
+    """Get the dispatch registry of the plugin, built once from the default drivers and `dispatcher_mapping`.
+
+    Built when the plugin is ready, so a driver missing from the configured mapping fails at startup.
+
+    Returns:
+        (DispatchRegistry): Dispatch registry
+    """
+    global _REGISTRY  # pylint: disable=global-statement
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = DispatchRegistry({**_DEFAULT_DRIVERS_MAPPING, **PLUGIN_CFG.get("dispatcher_mapping", {})})
+    return _REGISTRY
+
+
+def get_mapping_registry(mapping) -> DispatchRegistry:
+    """Get the dispatch registry of a drivers mapping, built once per distinct mapping.
+
+    Args:
+        mapping (dict): Import path of the driver class by platform
+    Returns:
+        (DispatchRegistry): Dispatch registry
+    """
+    registry = get_registry()
+    if mapping is registry.mapping or mapping is _DEFAULT_DRIVERS_MAPPING:
+        return registry
+    key = frozenset(mapping.items())
+    if key not in _MAPPING_REGISTRIES:
+        with _REGISTRY_LOCK:
+            if key not in _MAPPING_REGISTRIES:
+                _MAPPING_REGISTRIES[key] = DispatchRegistry(mapping)
+    return _MAPPING_REGISTRIES[key]
+
 
 def dispatcher(task: Task, method: str, logger, obj, *args, **kwargs) -> Result:
     """Helper Task to retrieve a given Nornir task for a given platform.
@@ -35,23 +87,34 @@ def dispatcher(task: Task, method: str, logger, obj, *args, **kwargs) -> Result:
     Args:
         task (Nornir Task):  Nornir Task object.
         method (str):  The string value of the method to dynamically find.
+        conditional (bool): With `get_config`, only download the configuration when the configuration marker of the
+            driver changed, defaults to the `conditional_config` plugin setting.
 
     Returns:
-        Result: Nornir Task result.
+        Result: Nornir Task result. With `conditional`, which requires the config store, the result of a
+            `get_config` skipped as unchanged is `{"unchanged": True, "marker": <marker>, "config_ref": ConfigRef}`,
+            with the handle of the last configuration.
     """
-    if kwargs.get("default_drivers_mapping"):
-        default_drivers_mapping = kwargs["default_drivers_mapping"]
-        del kwargs["default_drivers_mapping"]
-    else:
-        default_drivers_mapping = _DEFAULT_DRIVERS_MAPPING
+    default_drivers_mapping = kwargs.pop("default_drivers_mapping", None)
+    conditional = kwargs.pop("conditional", None)
+    conditional = method == "get_config" and is_conditional(conditional)
 
     logger.log_debug(
         f"Executing dispatcher for {task.host.name} ({task.host.platform})",
         grouping=task.host.name,
     )
 
+    if default_drivers_mapping:
+        try:
+            registry = get_mapping_registry(default_drivers_mapping)
+        except NornirNetboxException as exc:
+            logger.log_failure(obj, f"{exc}, preemptively failed.", grouping=task.host.name)
+            raise NornirNetboxException(f"{exc}, preemptively failed.")
+    else:
+        registry = get_registry()
+
     # Get the platform specific driver, if not available, get the default driver
-    driver = default_drivers_mapping.get(task.host.platform, default_drivers_mapping.get("default"))
+    driver = registry.get_driver(task.host.platform)
     logger.log_debug(f"Found driver {driver}", grouping=task.host.name)
 
     if not driver:
@@ -64,20 +127,8 @@ def dispatcher(task: Task, method: str, logger, obj, *args, **kwargs) -> Result:
             f"Unable to find the driver for {method} for platform: {task.host.platform}, preemptively failed."
         )
 
-    module_name, class_name = driver.rsplit(".", 1)
-    driver_class = getattr(importlib.import_module(module_name), class_name)
-
-    if not driver_class:
-        logger.log_failure(
-            obj,
-            f"Unable to locate the class {driver}, preemptively failed.",
-            grouping=task.host.name,
-        )
-        raise NornirNetboxException(f"Unable to locate the class {driver}, preemptively failed.")
-
-    try:
-        driver_task = getattr(driver_class, method)
-    except AttributeError:
+    driver_task = registry.get_task(task.host.platform, method)
+    if driver_task is None:
         logger.log_failure(
             obj,
             f"Unable to locate the method {method} for {driver}, preemptively failed.",
@@ -85,17 +136,48 @@ def dispatcher(task: Task, method: str, logger, obj, *args, **kwargs) -> Result:
         )
         raise NornirNetboxException(f"Unable to locate the method {method} for {driver}, preemptively failed.")
 
+    # Hosts loaded with `lazy_credentials` look up their credentials here, in the runner thread of the host.
+    try:
+        resolve_credentials(task.host)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.log_failure(obj, f"Unable to resolve the credentials: {exc}", grouping=task.host.name)
+        raise NornirNetboxException(f"Unable to resolve the credentials of {task.host.name}: {exc}")
+
+    # Reuse the sessions left open by previous jobs, and keep the sessions opened by the driver for the next ones.
+    pool = get_connection_pool()
+    if pool is not None:
+        pool.borrow(task.host)
+
+    marker_task = registry.get_task(task.host.platform, "get_config_marker") if conditional else None
+    marker = None
     result = None
     error = None
     try:
-        result = task.run(task=driver_task, logger=logger, obj=obj, *args, **kwargs)
+        if marker_task is not None:
+            marker = get_config_marker(task, marker_task, logger, obj)
+        unchanged_result = get_unchanged_result(task.host, marker)
+        if unchanged_result is not None:
+            logger.log_debug("Configuration unchanged, skipping get_config", grouping=task.host.name)
+            result = task.run(task=unchanged_config, result=unchanged_result)
+        else:
+            result = task.run(task=driver_task, logger=logger, obj=obj, *args, **kwargs)
     except NornirSubTaskError as exc:
-        traceback_lines = exc.result[0].result.splitlines()
-        logger.log_failure(obj, f"Subtask failed: {traceback_lines[-1]}", grouping=task.host.name)
-        error = traceback_lines[-1]
-        for line in traceback_lines:
-            logger.log_debug(line, grouping=task.host.name)
-        raise NornirNetboxException(f"Subtask failed: {traceback_lines[-1]}")
+        # Driver tasks may fail with a result other than a traceback, like the dict of `collect`.
+        error = str(exc.result[0].exception or exc.result[0].result)
+        logger.log_failure(obj, f"Subtask failed: {error}", grouping=task.host.name)
+        if isinstance(exc.result[0].result, str):
+            for line in exc.result[0].result.splitlines():
+                logger.log_debug(line, grouping=task.host.name)
+        raise NornirNetboxException(f"Subtask failed: {error}")
+    finally:
+        if pool is not None:
+            pool.release(task.host, healthy=result is not None)
+
+    # With the config store enabled, the result only keeps a handle of the configuration.
+    if method == "get_config" and unchanged_result is None:
+        store_task_result(task.host.name, result)
+        if marker is not None and not result[0].failed:
+            set_marker(task.host, marker)
     return Result(
         host=task.host,
         result=result,
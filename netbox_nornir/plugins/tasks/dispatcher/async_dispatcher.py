@@ -0,0 +1,211 @@
+"""Asyncio execution of the dispatcher for the HTTP API drivers.
+
+HTTP API drivers implement an `a<method>` coroutine, like `aget_config`, run for every host concurrently from a
+single event loop, instead of one runner thread per host. `httpx` is used as async HTTP client when installed
+(`pip install netbox-nornir[async]`), the shared HTTP transport is run in threads otherwise.
+"""
+import asyncio
+import traceback
+from typing import Dict, Optional
+
+from nornir.core import Nornir
+from nornir.core.inventory import Host
+from nornir.core.task import AggregatedResult, MultiResult, Result
+
+from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.plugins.inventory.deferred import DeferredCredentialsHost, resolve_credentials
+from netbox_nornir.plugins.tasks.dispatcher import dispatcher, get_registry
+from netbox_nornir.plugins.tasks.dispatcher.config_store import store_config
+from netbox_nornir.plugins.tasks.dispatcher.markers import get_unchanged_result, is_conditional, set_marker
+from netbox_nornir.plugins.tasks.dispatcher.preflight import is_preflight_enabled, preflight
+from netbox_nornir.plugins.tasks.dispatcher.transport import HttpRequest, get_transport
+from netbox_nornir.utils import run_coroutine
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_CONCURRENCY = 200
+
+
+class AsyncHttpClient:
+    """Async HTTP client of the API drivers.
+
+    Args:
+        concurrency (int): Maximum number of open connections
+        timeout (int): Timeout of the requests in seconds
+        verify (bool): Verify the device certificates
+    """
+
+    def __init__(self, concurrency: int, timeout: int, verify: bool):
+        """Initialize the client."""
+        self.client = None
+        if httpx is not None:
+            self.client = httpx.AsyncClient(
+                verify=verify,
+                timeout=timeout,
+                trust_env=False,
+                limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            )
+
+    async def send(self, request: HttpRequest):
+        """Send a request to a device.
+
+        Args:
+            request (HttpRequest): Request
+        Returns:
+            Response, with `text` and `raise_for_status`
+        """
+        if self.client is None:
+            return await asyncio.get_running_loop().run_in_executor(None, get_transport().send, request)
+        return await self.client.request(request.method, f"{request.base_url}{request.path}", **(request.kwargs or {}))
+
+    async def aclose(self):
+        """Close the open connections."""
+        if self.client is not None:
+            await self.client.aclose()
+
+
+def build_multi_result(host: Host, method: str, result: Optional[Dict] = None, exception: Exception = None):
+    """Build the result of a host, shaped as the result of the `dispatcher` task.
+
+    Args:
+        host (Host): Nornir host
+        method (str): Driver method name
+        result (dict): Result of the driver coroutine
+        exception (Exception): Exception raised by the driver coroutine
+    Returns:
+        (MultiResult): Result of the `dispatcher` task, followed by the result of the driver method
+    """
+    failed = exception is not None
+    if failed:
+        result = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    driver_result = Result(host=host, result=result, failed=failed, exception=exception, name=method)
+    driver_results = MultiResult(method)
+    driver_results.append(driver_result)
+    multi_result = MultiResult("dispatcher")
+    multi_result.append(
+        Result(
+            host=host,
+            result=result if failed else driver_results,
+            failed=failed,
+            exception=exception,
+            name="dispatcher",
+        )
+    )
+    multi_result.append(driver_result)
+    return multi_result
+
+
+async def run_hosts(hosts: Dict, method: str, logger, obj, concurrency: int) -> AggregatedResult:
+    """Run the driver coroutine of every host, with at most `concurrency` hosts at once.
+
+    Args:
+        hosts (dict): Nornir host, driver coroutine and configuration marker coroutine, by host name
+        method (str): Driver method name
+        logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+        obj (Device): A Netbox Device Django ORM object instance.
+        concurrency (int): Maximum number of hosts run at once
+    Returns:
+        (AggregatedResult): Results by host name
+    """
+    settings = PLUGIN_CFG.get("http_transport", {})
+    client = AsyncHttpClient(concurrency, timeout=settings.get("timeout", 10), verify=settings.get("verify", False))
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def run_config_marker(host: Host, marker_task):
+        try:
+            return await marker_task(host, client)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.log_warning(obj, f"Unable to get the configuration marker: `{exc}`", grouping=host.name)
+            return None
+
+    async def run_host(host: Host, driver_task, marker_task):
+        async with semaphore:
+            logger.log_debug(f"Executing {method} for {host.name} ({host.platform})", grouping=host.name)
+            try:
+                if isinstance(host, DeferredCredentialsHost):
+                    await loop.run_in_executor(None, resolve_credentials, host)
+                marker = None if marker_task is None else await run_config_marker(host, marker_task)
+                unchanged_result = await loop.run_in_executor(None, get_unchanged_result, host, marker)
+                if unchanged_result is not None:
+                    return host.name, build_multi_result(host, method, result=unchanged_result)
+                result = await driver_task(host, client)
+                if method == "get_config":
+                    result = await loop.run_in_executor(None, store_config, host.name, result)
+                    if marker is not None:
+                        await loop.run_in_executor(None, set_marker, host, marker)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.log_failure(obj, f"`{method}` failed: `{exc}`", grouping=host.name)
+                return host.name, build_multi_result(host, method, exception=exc)
+            return host.name, build_multi_result(host, method, result=result)
+
+    try:
+        results = await asyncio.gather(*(run_host(*host_tasks) for host_tasks in hosts.values()))
+    finally:
+        await client.aclose()
+
+    aggregated_result = AggregatedResult(method)
+    for name, multi_result in results:
+        aggregated_result[name] = multi_result
+    return aggregated_result
+
+
+def dispatcher_async(
+    nr: Nornir, method: str, logger, obj, concurrency: int = None, conditional: bool = None
+) -> AggregatedResult:
+    """Run a dispatcher method on every host, from an event loop for the hosts whose driver supports it.
+
+    Equivalent to `nr.run(task=dispatcher, method=method, logger=logger, obj=obj)`. Hosts whose driver implements
+    the `a<method>` coroutine are run concurrently from an event loop, the other hosts are run by the nornir runner.
+    With the `preflight` plugin setting enabled, unreachable hosts are dropped first.
+
+    Args:
+        nr (Nornir): Nornir object
+        method (str): Driver method name
+        logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+        obj (Device): A Netbox Device Django ORM object instance.
+        concurrency (int): Maximum number of hosts run at once, defaults to the `async_dispatcher` plugin setting
+        conditional (bool): With `get_config`, only download the configuration when the configuration marker of the
+            driver changed, defaults to the `conditional_config` plugin setting. Requires the config store, see
+            `dispatcher`.
+    Returns:
+        (AggregatedResult): Results by host name
+    """
+    concurrency = concurrency or PLUGIN_CFG.get("async_dispatcher", {}).get("concurrency", DEFAULT_CONCURRENCY)
+    conditional = method == "get_config" and is_conditional(conditional)
+    registry = get_registry()
+    if is_preflight_enabled():
+        preflight(nr, logger, obj)
+
+    # Hosts are split by platform from views of lazy inventories, without building them all at once.
+    inventory_hosts = nr.inventory.hosts
+    get_host = getattr(inventory_hosts, "view", inventory_hosts.get)
+    async_tasks = {}
+    sync_names = set()
+    for name in inventory_hosts.keys():
+        if name in nr.data.failed_hosts:
+            continue
+        platform = get_host(name).platform
+        driver_task = registry.get_task(platform, f"a{method}")
+        if driver_task is None:
+            sync_names.add(name)
+        else:
+            marker_task = registry.get_task(platform, "aget_config_marker") if conditional else None
+            async_tasks[name] = (driver_task, marker_task)
+
+    aggregated_result = AggregatedResult(method)
+    if sync_names:
+        sync_nr = nr.filter(filter_func=lambda host: host.name in sync_names)
+        aggregated_result.update(
+            sync_nr.run(task=dispatcher, method=method, logger=logger, obj=obj, conditional=conditional)
+        )
+    if async_tasks:
+        async_nr = nr.filter(filter_func=lambda host: host.name in async_tasks)
+        async_hosts = {name: (host, *async_tasks[name]) for name, host in async_nr.inventory.hosts.items()}
+        async_result = run_coroutine(run_hosts(async_hosts, method, logger, obj, concurrency))
+        nr.data.failed_hosts.update(async_result.failed_hosts.keys())
+        aggregated_result.update(async_result)
+    return aggregated_result
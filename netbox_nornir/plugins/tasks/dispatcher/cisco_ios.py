@@ -1,7 +1,33 @@
 """network_importer driver for cisco IOS."""
+from typing import Optional
+
+from nornir.core.task import Task
+
+from netbox_nornir.constraints import PLUGIN_CFG
 
 from .default import NetboxNornirDriver as DefaultNetboxNornirDriver
 
 
 class NetboxNornirDriver(DefaultNetboxNornirDriver):
     """Driver for Cisco IOS."""
+
+    @staticmethod
+    def get_config_marker(task: Task, logger, obj) -> Optional[str]:
+        """Get the output of the `cisco_ios` entry of the `marker_commands` conditional config setting.
+
+        IOS has no marker which is cheap on every release, so conditional config is off for IOS unless a command
+        is set. `show running-config | include Last configuration change` works everywhere, but the device renders
+        its whole running configuration to filter it, which only saves the transfer.
+
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+        Returns:
+            str: Output of the command, None without a command or output
+        """
+        command = PLUGIN_CFG.get("conditional_config", {}).get("marker_commands", {}).get("cisco_ios")
+        if not command:
+            return None
+        device = task.host.get_connection("napalm", task.nornir.config)
+        return device.cli([command])[command].strip() or None
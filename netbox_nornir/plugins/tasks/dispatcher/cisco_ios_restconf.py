@@ -1,15 +1,35 @@
 """Cisco IOS RESTCONF driver."""
-import requests
+from typing import Dict, Optional
+
+from nornir.core.inventory import Host
 from nornir.core.task import Result, Task
 
 from .default import NetmikoNetboxNornirDriver as DefaultNetboxNornirDriver
+from .transport import HttpRequest, get_base_url, get_transport
 
 
 class NetboxNornirDriver(DefaultNetboxNornirDriver):
-    """Fortigate for configuration backup."""
+    """Cisco IOS RESTCONF driver for configuration backup."""
 
-    @staticmethod
-    def get_config(task: Task, logger, obj) -> Result:
+    # Port of the API when the host port is unset or the SSH port.
+    API_PORT = 443
+
+    @classmethod
+    def get_config_request(cls, host: Host) -> HttpRequest:
+        """Build the request reading the native configuration of the device."""
+        return HttpRequest(
+            "GET",
+            get_base_url(host, default_port=cls.API_PORT),
+            "/restconf/data/Cisco-IOS-XE-native:native",
+            {
+                "auth": (host.username, host.password),
+                "headers": {"Accept": "application/yang-data+json"},
+                "params": {"content": "config", "depth": "65535"},
+            },
+        )
+
+    @classmethod
+    def get_config(cls, task: Task, logger, obj) -> Result:
         """Get the latest configuration from the device.
         Args:
             task (Task): Nornir Task.
@@ -20,23 +40,61 @@ class NetboxNornirDriver(DefaultNetboxNornirDriver):
                 { "config: <running configuration> }
         """
 
-        session = requests.Session()
-        session.trust_env = False
         logger.log_debug(
             f"Executing get_config for {task.host.name} on {task.host.platform}",
             grouping=task.host.name,
         )
-        auth = (task.host.username, task.host.password)
-        headers = {"Accept": "application/yang-data+json"}
-        params = {"content": "config", "depth": "65535"}
-
-        response = session.get(
-            f"https://{task.host.hostname}/restconf/data/Cisco-IOS-XE-native:native",
-            auth=auth,
-            headers=headers,
-            params=params,
-            verify=False,
-            timeout=10,
-        )
+        response = get_transport().send(cls.get_config_request(task.host))
         response.raise_for_status()
         return Result(host=task.host, result={"config": response.text})
+
+    @classmethod
+    async def aget_config(cls, host: Host, client) -> Dict:
+        """Get the latest configuration from the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            dict: Dict containing the running configuration
+                { "config: <running configuration> }
+        """
+        response = await client.send(cls.get_config_request(host))
+        response.raise_for_status()
+        return {"config": response.text}
+
+    @classmethod
+    def get_config_marker_request(cls, host: Host) -> HttpRequest:
+        """Build the request reading the entity tag of the native configuration of the device."""
+        request = cls.get_config_request(host)
+        return request._replace(method="HEAD")
+
+    @staticmethod
+    def parse_config_marker(response) -> Optional[str]:
+        """Get the entity tag, or the last modification time, of the configuration from the response."""
+        response.raise_for_status()
+        return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+    @classmethod
+    def get_config_marker(cls, task: Task, logger, obj) -> Optional[str]:
+        """Get the marker of the configuration of the device.
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+        Returns:
+            str: ETag or Last-Modified of the configuration, None when missing
+        """
+        response = get_transport().send(cls.get_config_marker_request(task.host))
+        return cls.parse_config_marker(response)
+
+    @classmethod
+    async def aget_config_marker(cls, host: Host, client) -> Optional[str]:
+        """Get the marker of the configuration of the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            str: ETag or Last-Modified of the configuration, None when missing
+        """
+        response = await client.send(cls.get_config_marker_request(host))
+        return cls.parse_config_marker(response)
@@ -0,0 +1,327 @@
+"""Content-addressed store of the configurations retrieved by `get_config`.
+
+Configurations are compressed and saved once per distinct content, named after the SHA-256 of the uncompressed
+configuration, into a Django storage: a directory of the worker by default, or any storage backend shared by the
+workers. The `get_config` results then only carry a `ConfigRef` handle, instead of the whole configuration.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import quote
+
+from django.conf import settings as django_settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.utils.module_loading import import_string
+from nornir.core.task import MultiResult
+
+from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.exceptions import NornirNetboxException
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Directory of the configurations under the `MEDIA_ROOT` of NetBox, unless the `location` setting is set.
+DEFAULT_DIRECTORY = os.path.join("netbox_nornir", "configs")
+DEFAULT_COMPRESSION = "gzip"
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+# Configurations are spooled in memory up to this size, and to a temporary file past it.
+SPOOL_SIZE = 1024 * 1024
+
+
+class ConfigRef(NamedTuple):
+    """Handle of a stored configuration.
+
+    Attributes:
+        digest (str): SHA-256 of the configuration
+        size (int): Size of the uncompressed configuration in bytes
+        timestamp (str): ISO 8601 time the configuration was retrieved
+        changed (bool): Whether the configuration differs from the previous one of the host
+    """
+
+    digest: str
+    size: int
+    timestamp: str
+    changed: bool
+
+
+class ConfigWriter:
+    """Text stream compressing a configuration into a temporary file, stored once committed.
+
+    Args:
+        store (ConfigStore): Store the configuration is committed into
+        host_name (str): Name of the host the configuration belongs to
+    """
+
+    def __init__(self, store: "ConfigStore", host_name: str):
+        """Initialize the writer."""
+        self.store = store
+        self.host_name = host_name
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)  # pylint: disable=consider-using-with
+        self.compressor = store.get_compressor(self.file)
+
+    def write(self, data: str) -> int:
+        """Write a chunk of the configuration."""
+        encoded = data.encode()
+        self.hash.update(encoded)
+        self.size += len(encoded)
+        self.compressor.write(encoded)
+        return len(data)
+
+    def commit(self) -> ConfigRef:
+        """Store the configuration, unless a configuration with the same content was stored before.
+
+        Returns:
+            (ConfigRef): Handle of the configuration
+        """
+        self.compressor.close()
+        self.file.seek(0)
+        try:
+            return self.store.commit(self.host_name, self.hash.hexdigest(), self.size, self.file)
+        finally:
+            self.file.close()
+
+    def close(self):
+        """Discard the configuration, when not committed."""
+        self.file.close()
+
+
+class ConfigStore:
+    """Content-addressed store of configurations.
+
+    Configurations are saved as `objects/<digest[:2]>/<digest>.<extension>`, and the reference of the last
+    configuration of each host as `refs/<host name>.json`, which tells whether a new configuration changed.
+
+    Args:
+        storage (Storage): Django storage the configurations are saved into
+        compression (str): `gzip`, or `zstd` with the `zstandard` package installed
+        level (int): Compression level, defaults to the default level of the compression
+    """
+
+    def __init__(self, storage: Storage, compression: str = DEFAULT_COMPRESSION, level: Optional[int] = None):
+        """Initialize the store."""
+        if compression not in EXTENSIONS:
+            raise NornirNetboxException(f"Unsupported config store compression {compression}.")
+        if compression == "zstd" and zstandard is None:
+            raise NornirNetboxException("The zstd config store compression requires the zstandard package.")
+        self.storage = storage
+        self.compression = compression
+        self.level = DEFAULT_LEVELS[compression] if level is None else level
+        self.lock = threading.Lock()
+
+    def get_compressor(self, file):
+        """Get a binary stream compressing into `file`."""
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).stream_writer(file, closefd=False)
+        return gzip.GzipFile(fileobj=file, mode="wb", compresslevel=self.level, mtime=0)
+
+    def get_decompressor(self, file):
+        """Get a binary stream decompressing `file`."""
+        if self.compression == "zstd":
+            return zstandard.ZstdDecompressor().stream_reader(file)
+        return gzip.GzipFile(fileobj=file, mode="rb")
+
+    def get_object_name(self, digest: str) -> str:
+        """Get the storage name of a configuration."""
+        return f"objects/{digest[:2]}/{digest}.{EXTENSIONS[self.compression]}"
+
+    @staticmethod
+    def get_ref_name(host_name: str) -> str:
+        """Get the storage name of the reference of a host."""
+        return f"refs/{quote(host_name, safe='')}.json"
+
+    def writer(self, host_name: str) -> ConfigWriter:
+        """Get a text stream the configuration of a host is written into, stored once committed.
+
+        Args:
+            host_name (str): Name of the host
+        Returns:
+            (ConfigWriter): Writer, `commit` returns the handle of the configuration
+        """
+        return ConfigWriter(self, host_name)
+
+    def put(self, host_name: str, config: str) -> ConfigRef:
+        """Store the configuration of a host.
+
+        Args:
+            host_name (str): Name of the host
+            config (str): Configuration
+        Returns:
+            (ConfigRef): Handle of the configuration
+        """
+        writer = self.writer(host_name)
+        writer.write(config)
+        return writer.commit()
+
+    def commit(self, host_name: str, digest: str, size: int, file) -> ConfigRef:
+        """Save a compressed configuration unless already stored, and update the reference of the host.
+
+        Args:
+            host_name (str): Name of the host
+            digest (str): SHA-256 of the configuration
+            size (int): Size of the uncompressed configuration in bytes
+            file: Binary file of the compressed configuration
+        Returns:
+            (ConfigRef): Handle of the configuration
+        """
+        name = self.get_object_name(digest)
+        with self.lock:
+            if not self.storage.exists(name):
+                saved_name = self.storage.save(name, File(file))
+                # Another worker saved the same configuration first, the storage picked another name.
+                if saved_name != name:
+                    self.storage.delete(saved_name)
+        previous = self.get_ref(host_name)
+        ref = ConfigRef(
+            digest=digest,
+            size=size,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            changed=previous is None or previous.digest != digest,
+        )
+        self.set_ref(host_name, ref)
+        return ref
+
+    def get_ref(self, host_name: str) -> Optional[ConfigRef]:
+        """Get the handle of the last configuration of a host, None when no configuration was stored yet."""
+        ref_name = self.get_ref_name(host_name)
+        if not self.storage.exists(ref_name):
+            return None
+        with self.storage.open(ref_name, "rb") as ref_file:
+            return ConfigRef(**json.load(ref_file))
+
+    def set_ref(self, host_name: str, ref: ConfigRef):
+        """Set the handle of the last configuration of a host, replacing the previous handle.
+
+        On a file system storage the handle is written into a temporary file renamed over the previous handle, so the host
+        always has a handle. Other storages save the new handle first, which replaces the previous one on storages
+        overwriting existing names, like S3. Storages keeping existing names get the new handle under another name
+        first, copied over the previous handle once it's deleted.
+        """
+        ref_name = self.get_ref_name(host_name)
+        content = json.dumps(ref._asdict()).encode()
+        with self.lock:
+            if isinstance(self.storage, FileSystemStorage):
+                self.replace_file(self.storage.path(ref_name), content)
+                return
+            saved_name = self.storage.save(ref_name, ContentFile(content))
+            if saved_name != ref_name:
+                self.storage.delete(ref_name)
+                self.storage.save(ref_name, ContentFile(content))
+                self.storage.delete(saved_name)
+
+    def replace_file(self, path: str, content: bytes):
+        """Replace the content of a file of a file system storage atomically, through a temporary file next to it."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as temporary_file:
+            temporary_file.write(content)
+        try:
+            if self.storage.file_permissions_mode is not None:
+                os.chmod(temporary_file.name, self.storage.file_permissions_mode)
+            os.replace(temporary_file.name, path)
+        except OSError:
+            os.unlink(temporary_file.name)
+            raise
+
+    @contextmanager
+    def open(self, digest: str):
+        """Open a stored configuration.
+
+        Args:
+            digest (str): SHA-256 of the configuration
+        Yields:
+            Binary stream of the uncompressed configuration
+        """
+        name = self.get_object_name(digest)
+        if not self.storage.exists(name):
+            raise NornirNetboxException(f"Configuration {digest} not found in the config store.")
+        with self.storage.open(name, "rb") as compressed_file:
+            with self.get_decompressor(compressed_file) as config_file:
+                yield config_file
+
+    def get(self, digest: str) -> str:
+        """Read a stored configuration.
+
+        Args:
+            digest (str): SHA-256 of the configuration
+        Returns:
+            (str): Configuration
+        """
+        with self.open(digest) as config_file:
+            return config_file.read().decode()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_config_store() -> Optional[ConfigStore]:
+    """Get the config store of the worker, None unless enabled by the `config_store` plugin setting."""
+    global _STORE  # pylint: disable=global-statement
+    settings = PLUGIN_CFG.get("config_store", {})
+    if not settings.get("enabled", False):
+        return None
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                storage = settings.get("storage")
+                if storage == "default":
+                    storage = default_storage
+                elif storage:
+                    storage = import_string(storage)(**settings.get("storage_options", {}))
+                else:
+                    location = settings.get("location") or os.path.join(django_settings.MEDIA_ROOT, DEFAULT_DIRECTORY)
+                    storage = FileSystemStorage(location=location)
+                _STORE = ConfigStore(
+                    storage,
+                    compression=settings.get("compression", DEFAULT_COMPRESSION),
+                    level=settings.get("level"),
+                )
+    return _STORE
+
+
+def store_config(host_name: str, result: Dict) -> Dict:
+    """Move the configuration of a `get_config` result into the config store, when enabled.
+
+    Args:
+        host_name (str): Name of the host
+        result (dict): Result of `get_config`, `{"config": <running configuration>}`
+    Returns:
+        (dict): `{"config_ref": ConfigRef}` with the store enabled, the result unchanged otherwise
+    """
+    store = get_config_store()
+    if store is None or not isinstance(result, dict) or not isinstance(result.get("config"), str):
+        return result
+    return {"config_ref": store.put(host_name, result["config"])}
+
+
+def store_task_result(host_name: str, result: MultiResult):
+    """Move the configuration of a `get_config` task result into the config store, when enabled.
+
+    The results of the subtasks, which hold the same configuration, are dropped once it's stored.
+
+    Args:
+        host_name (str): Name of the host
+        result (MultiResult): Result of the `get_config` driver task
+    """
+    if not result or result[0].failed:
+        return
+    stored = store_config(host_name, result[0].result)
+    if stored is result[0].result:
+        return
+    result[0].result = stored
+    for subtask_result in result[1:]:
+        if not subtask_result.failed:
+            subtask_result.result = None
@@ -1,4 +1,7 @@
 """Default collection of Nornir Tasks based on Napalm."""
+import logging
+from typing import Dict, List
+
 from netmiko import NetmikoAuthenticationException, NetmikoTimeoutException
 from nornir.core.exceptions import NornirSubTaskError
 from nornir.core.task import Result, Task
@@ -20,6 +23,69 @@ RUN_COMMAND_MAPPING = {
     "netscaler": "show run",
 }
 
+# Getters supported by `collect`, with the napalm getters each of them is built from.
+COLLECT_GETTERS = {
+    "config": ["config"],
+    "facts": ["facts"],
+    "environment": ["environment"],
+    "interfaces": ["interfaces", "interfaces_ip"],
+}
+
+
+def napalm_collect(task: Task, getters: List[str], getters_options: Dict = None) -> Result:
+    """Run napalm getters over the open host connection, like `napalm_get`, without failing on a single getter.
+
+    Args:
+        task (Task): Nornir Task.
+        getters (list): Napalm getters to run.
+        getters_options (dict): Options of each getter, by getter name.
+    Returns:
+        Result: Nornir Result object with the result of each getter, and the error of each failed getter
+            { "results": {<getter>: <result>}, "errors": {<getter>: <error>} }
+    """
+    device = task.host.get_connection("napalm", task.nornir.config)
+    getters_options = getters_options or {}
+    results = {}
+    errors = {}
+    for getter in getters:
+        try:
+            results[getter] = getattr(device, f"get_{getter}")(**getters_options.get(getter, {}))
+        except Exception as exc:  # pylint: disable=broad-except
+            errors[getter] = f"{type(exc).__name__}: {exc}"
+    return Result(host=task.host, result={"results": results, "errors": errors})
+
+
+def get_collect_getters(task: Task, logger, obj, getters: List[str] = None) -> List[str]:
+    """Validate the getters passed to `collect`, defaulting to every supported getter."""
+    getters = list(getters or COLLECT_GETTERS)
+    unknown_getters = [getter for getter in getters if getter not in COLLECT_GETTERS]
+    if unknown_getters:
+        logger.log_failure(obj, f"`collect` unknown getters: `{unknown_getters}`", grouping=task.host.name)
+        raise NornirNetboxException(f"`collect` unknown getters: `{unknown_getters}`")
+    return getters
+
+
+def tolerate_failed_subresults(subresults: List[Result]):
+    """Keep the failed subtasks of a `collect` getter from failing the host, logged as warnings.
+
+    A failed subtask is recorded in the results of the host by `task.run`, which would fail the host and the
+    `dispatcher` task running `collect` even though the other getters succeeded.
+    """
+    for subresult in subresults:
+        if subresult.failed:
+            subresult.failed = False
+            subresult.severity_level = logging.WARNING
+
+
+def build_collect_result(task: Task, logger, obj, results: Dict, errors: Dict) -> Result:
+    """Build the result of `collect`, the host only fails when every getter failed."""
+    for getter, error in errors.items():
+        logger.log_warning(obj, f"`collect` getter `{getter}` failed: `{error}`", grouping=task.host.name)
+    failed = bool(errors) and not results
+    if failed:
+        logger.log_failure(obj, "`collect` failed for every getter", grouping=task.host.name)
+    return Result(host=task.host, result={**results, "errors": errors}, failed=failed)
+
 
 class NetboxNornirDriver:
     """Default collection of Nornir Tasks based on Napalm."""
@@ -102,7 +168,7 @@ class NetboxNornirDriver:
             raise NornirNetboxException(
                 f"`get_{method}` method failed with an unexpected issue: `{traceback_lines[-1]}`"
             ) from exc
-        facts = results[0].result.get("facts", None)
+        facts = results[0].result.get(method, None)
         return Result(host=task.host, result={method: facts})
 
     @staticmethod
@@ -149,13 +215,85 @@ class NetboxNornirDriver:
             ) from exc
 
         naplam_interfaces = results[0].result
+        combined_interfaces = NetboxNornirDriver.combine_interfaces(
+            naplam_interfaces["interfaces"], naplam_interfaces["interfaces_ip"]
+        )
+        return Result(host=task.host, result={"interfaces": combined_interfaces})
+
+    @staticmethod
+    def combine_interfaces(interfaces: Dict, interfaces_ip: Dict) -> Dict:
+        """Merge the napalm `interfaces` and `interfaces_ip` getters results, by interface name."""
         combined_interfaces = {}
-        for interface_name, interface_details in naplam_interfaces["interfaces"].items():
+        for interface_name, interface_details in interfaces.items():
             combined_interfaces[interface_name] = {
                 **interface_details,
-                **naplam_interfaces["interfaces_ip"].get(interface_name, {}),
+                **interfaces_ip.get(interface_name, {}),
             }
-        return Result(host=task.host, result={"interfaces": combined_interfaces})
+        return combined_interfaces
+
+    @staticmethod
+    def collect(task: Task, logger, obj, getters: List[str] = None) -> Result:
+        """Collect several getters from the device over a single napalm connection.
+
+        The napalm getters of every requested getter run in one subtask, a getter failing doesn't prevent the other
+        getters from being collected.
+
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+            getters (list): Getters to collect among `config`, `facts`, `environment` and `interfaces`, defaults
+                to every getter.
+        Returns:
+            Result: Nornir Result object with a dict as a result containing each collected getter, as returned by
+                its own method, and the error of each failed getter
+                { "config": <running configuration>, "facts": <facts>, ..., "errors": {<getter>: <error>} }
+        """
+        getters = get_collect_getters(task, logger, obj, getters)
+        logger.log_debug(
+            f"Executing collect of {getters} for {task.host.name} on {task.host.platform}",
+            grouping=task.host.name,
+        )
+        napalm_getters = [napalm_getter for getter in getters for napalm_getter in COLLECT_GETTERS[getter]]
+        try:
+            result = task.run(
+                task=napalm_collect,
+                getters=napalm_getters,
+                getters_options={"config": {"retrieve": "running"}},
+            )
+        except NornirSubTaskError as exc:
+            traceback_lines = exc.result[0].result.splitlines()
+            logger.log_failure(
+                obj,
+                f"`collect` method failed with an unexpected issue: `{traceback_lines[-1]}`",
+                grouping=task.host.name,
+            )
+            for traceback_line in traceback_lines:
+                logger.log_debug(
+                    traceback_line,
+                    grouping=task.host.name,
+                )
+            raise NornirNetboxException(
+                f"`collect` method failed with an unexpected issue: `{traceback_lines[-1]}`"
+            ) from exc
+
+        napalm_results = result[0].result["results"]
+        napalm_errors = result[0].result["errors"]
+        results = {}
+        errors = {}
+        for getter in getters:
+            getter_errors = [napalm_errors[name] for name in COLLECT_GETTERS[getter] if name in napalm_errors]
+            if getter_errors:
+                errors[getter] = "; ".join(getter_errors)
+            elif getter == "config":
+                results[getter] = napalm_results["config"].get("running", None)
+            elif getter == "interfaces":
+                results[getter] = NetboxNornirDriver.combine_interfaces(
+                    napalm_results["interfaces"], napalm_results["interfaces_ip"]
+                )
+            else:
+                results[getter] = napalm_results[getter]
+        return build_collect_result(task, logger, obj, results, errors)
 
 
 class NetmikoNetboxNornirDriver(NetboxNornirDriver):
@@ -269,3 +407,51 @@ class NetmikoNetboxNornirDriver(NetboxNornirDriver):
         This should match napalm's return object. The function should also set `self.interfaces` to the return value.
         """
         return NotImplementedError("get_interfaces is not implemented for NetmikoNetboxNornirDriver")
+
+    @classmethod
+    def collect(cls, task: Task, logger, obj, getters: List[str] = None) -> Result:
+        """Collect several getters from the device, reusing the connection opened by the first getter.
+
+        Each getter runs the `get_<getter>` method of the driver, so drivers overriding them are collected with
+        their own implementation. Getters still implemented with napalm, like `get_environment`, aren't run, as
+        they would open a napalm session next to the netmiko one. A getter failing doesn't prevent the other
+        getters from being collected, its failed subtasks are kept in the results without failing the host.
+
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+            getters (list): Getters to collect among `config`, `facts`, `environment` and `interfaces`, defaults
+                to every getter.
+        Returns:
+            Result: Nornir Result object with a dict as a result containing each collected getter, and the error of
+                each failed getter
+                { "config": <running configuration>, ..., "errors": {<getter>: <error>} }
+        """
+        getters = get_collect_getters(task, logger, obj, getters)
+        logger.log_debug(
+            f"Executing collect of {getters} for {task.host.name} on {task.host.platform}",
+            grouping=task.host.name,
+        )
+        results = {}
+        errors = {}
+        for getter in getters:
+            method = f"get_{getter}"
+            if getattr(cls, method) is getattr(NetboxNornirDriver, method):
+                errors[getter] = f"`{method}` is not implemented over netmiko"
+                continue
+            subresults_count = len(task.results)
+            try:
+                result = getattr(cls, method)(task, logger, obj)
+            except NornirNetboxException as exc:
+                errors[getter] = str(exc)
+                continue
+            finally:
+                tolerate_failed_subresults(task.results[subresults_count:])
+            if isinstance(result, Exception):
+                errors[getter] = str(result)
+            elif result.failed:
+                errors[getter] = str(result.exception)
+            else:
+                results[getter] = result.result.get(getter)
+        return build_collect_result(task, logger, obj, results, errors)
@@ -1,15 +1,31 @@
 """Fortinet FortiOS Netbox Nornir Driver."""
-import requests
+import json
+from typing import Dict, Optional
+
+from nornir.core.inventory import Host
 from nornir.core.task import Result, Task
 
 from .default import NetmikoNetboxNornirDriver as DefaultNetboxNornirDriver
+from .transport import HttpRequest, get_base_url, get_transport
 
 
 class NetboxNornirDriver(DefaultNetboxNornirDriver):
     """Fortigate for configuration backup."""
 
-    @staticmethod
-    def get_config(task: Task, logger, obj) -> Result:
+    # Port of the API when the host port is unset or the SSH port.
+    API_PORT = 443
+
+    @classmethod
+    def get_config_request(cls, host: Host) -> HttpRequest:
+        """Build the request exporting the configuration of the device."""
+        return HttpRequest(
+            "GET",
+            get_base_url(host, default_port=cls.API_PORT),
+            f"/api/v2/monitor/system/config/backup?scope=global&access_token={host.data['key']}",
+        )
+
+    @classmethod
+    def get_config(cls, task: Task, logger, obj) -> Result:
         """Get the latest configuration from the device.
         Args:
             task (Task): Nornir Task.
@@ -20,20 +36,67 @@ class NetboxNornirDriver(DefaultNetboxNornirDriver):
                 { "config: <running configuration> }
         """
 
-        session = requests.Session()
-        session.trust_env = False
         logger.log_debug(
             f"Executing get_config for {task.host.name} on {task.host.platform}",
             grouping=task.host.name,
         )
-        if task.host.port == 22:
-            port = 443
-        else:
-            port = task.host.port
-        response = session.get(
-            f"https://{task.host.hostname}:{port}/api/v2/monitor/system/config/backup?scope=global&access_token={task.host.data['key']}",
-            verify=False,
-            timeout=10,
-        )
+        response = get_transport().send(cls.get_config_request(task.host))
         response.raise_for_status()
         return Result(host=task.host, result={"config": response.text})
+
+    @classmethod
+    async def aget_config(cls, host: Host, client) -> Dict:
+        """Get the latest configuration from the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            dict: Dict containing the running configuration
+                { "config: <running configuration> }
+        """
+        response = await client.send(cls.get_config_request(host))
+        response.raise_for_status()
+        return {"config": response.text}
+
+    @classmethod
+    def get_config_marker_request(cls, host: Host) -> HttpRequest:
+        """Build the request reading the configuration checksums of the device."""
+        return HttpRequest(
+            "GET",
+            get_base_url(host, default_port=cls.API_PORT),
+            f"/api/v2/monitor/system/ha-checksums?access_token={host.data['key']}",
+        )
+
+    @staticmethod
+    def parse_config_marker(response) -> Optional[str]:
+        """Get the configuration checksums of the device from the response."""
+        response.raise_for_status()
+        checksums = [member.get("checksum") for member in response.json().get("results", [])]
+        if not any(checksums):
+            return None
+        return json.dumps(checksums, sort_keys=True)
+
+    @classmethod
+    def get_config_marker(cls, task: Task, logger, obj) -> Optional[str]:
+        """Get the marker of the configuration of the device.
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+        Returns:
+            str: Configuration checksums, None when missing
+        """
+        response = get_transport().send(cls.get_config_marker_request(task.host))
+        return cls.parse_config_marker(response)
+
+    @classmethod
+    async def aget_config_marker(cls, host: Host, client) -> Optional[str]:
+        """Get the marker of the configuration of the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            str: Configuration checksums, None when missing
+        """
+        response = await client.send(cls.get_config_marker_request(host))
+        return cls.parse_config_marker(response)
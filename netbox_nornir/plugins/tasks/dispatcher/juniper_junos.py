@@ -1,7 +1,29 @@
 """default network_importer driver for Juniper."""
+from typing import Optional
+
+from nornir.core.task import Task
 
 from .default import NetboxNornirDriver as DefaultNetboxNornirDriver
 
+MARKER_COMMAND = "show system commit"
+
 
 class NetboxNornirDriver(DefaultNetboxNornirDriver):
     """Collection of Nornir Tasks specific to Juniper Junos devices."""
+
+    @staticmethod
+    def get_config_marker(task: Task, logger, obj) -> Optional[str]:
+        """Get the last commit of the device.
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+        Returns:
+            str: Commit history entry `0`, with the time and author of the last commit, None when missing
+        """
+        device = task.host.get_connection("napalm", task.nornir.config)
+        output = device.cli([MARKER_COMMAND])[MARKER_COMMAND]
+        for line in output.splitlines():
+            if line.strip().startswith("0 "):
+                return " ".join(line.split())
+        return None
@@ -0,0 +1,107 @@
+"""Configuration change markers, to skip `get_config` on devices whose configuration didn't change.
+
+Drivers implementing `get_config_marker` return a cheap marker of the device configuration, like a configuration
+revision or the time of the last commit. The configuration is only downloaded when the marker differs from the
+marker of the last configuration retrieved, kept in the Django cache by platform and host name, as each driver has a
+marker of its own.
+
+Conditional config requires the config store, so the result of a skipped `get_config` holds the `config_ref` of
+the last configuration, see `get_unchanged_result`.
+"""
+import hashlib
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from nornir.core.inventory import Host
+from nornir.core.task import Result, Task
+
+from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.tasks.dispatcher.config_store import get_config_store
+
+# Markers expire, so every device is downloaded again at least once per timeout.
+DEFAULT_MARKER_TIMEOUT = 60 * 60 * 24 * 7
+CACHE_KEY_PREFIX = "netbox_nornir.config_marker"
+
+
+def _marker_key(host: Host) -> str:
+    digest = hashlib.sha256(f"{host.platform}\0{host.name}".encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}.get_config_marker.{digest}"
+
+
+def is_conditional(conditional: Optional[bool] = None) -> bool:
+    """Whether `get_config` is conditional, defaults to the `conditional_config` plugin setting.
+
+    Raises:
+        NornirNetboxException: When conditional without the config store, which keeps the configuration of skipped
+            hosts
+    """
+    if conditional is None:
+        conditional = PLUGIN_CFG.get("conditional_config", {}).get("enabled", False)
+    if conditional and get_config_store() is None:
+        raise NornirNetboxException("Conditional config requires the `config_store` plugin setting to be enabled")
+    return conditional
+
+
+def get_marker(host: Host) -> Optional[str]:
+    """Get the marker of the last configuration retrieved from a host, None when unknown."""
+    return cache.get(_marker_key(host))
+
+
+def set_marker(host: Host, marker: str):
+    """Set the marker of the last configuration retrieved from a host."""
+    timeout = PLUGIN_CFG.get("conditional_config", {}).get("timeout", DEFAULT_MARKER_TIMEOUT)
+    cache.set(_marker_key(host), marker, timeout=timeout)
+
+
+def clear_marker(host: Host):
+    """Drop the marker of a host, so its next `get_config` downloads the configuration."""
+    cache.delete(_marker_key(host))
+
+
+def get_unchanged_result(host: Host, marker: Optional[str]) -> Optional[Dict]:
+    """Get the result of `get_config` for an unchanged configuration.
+
+    The result stands for the result of the driver stored into the config store, `{"config_ref": ConfigRef}`, with
+    the handle of the last configuration of the host.
+
+    Args:
+        host (Host): Nornir host
+        marker (str): Marker of the current configuration of the host
+    Returns:
+        (dict): `{"unchanged": True, "marker": <marker>, "config_ref": ConfigRef}`, None when the configuration has
+            to be downloaded, also when the config store doesn't hold the last configuration of the host
+    """
+    if marker is None or marker != get_marker(host):
+        return None
+    store = get_config_store()
+    ref = None if store is None else store.get_ref(host.name)
+    if ref is None:
+        return None
+    return {"unchanged": True, "marker": marker, "config_ref": ref._replace(changed=False)}
+
+
+def unchanged_config(task: Task, result: Dict) -> Result:
+    """Nornir task standing for `get_config` when the configuration of the host didn't change."""
+    return Result(host=task.host, result=result)
+
+
+def get_config_marker(task: Task, marker_task, logger, obj) -> Optional[str]:
+    """Get the marker of the configuration of a host, None when it couldn't be retrieved.
+
+    The marker is looked up over the host connection directly, not as a subtask, so a failure only falls back to
+    downloading the configuration, without failing the host.
+
+    Args:
+        task (Task): Nornir Task.
+        marker_task (callable): `get_config_marker` method of the driver.
+        logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+        obj (Device): A Netbox Device Django ORM object instance.
+    Returns:
+        (str): Marker of the configuration
+    """
+    try:
+        return marker_task(task, logger, obj)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.log_warning(obj, f"Unable to get the configuration marker: `{exc}`", grouping=task.host.name)
+        return None
@@ -1,17 +1,195 @@
 """Palo Alto PANOS driver."""
-import xml.dom.minidom  # nosec
+import io
+from typing import Dict, List, Optional, TextIO
+from xml.etree import ElementTree  # nosec
+from xml.parsers import expat  # nosec
 
-import requests
+from nornir.core.inventory import Host
 from nornir.core.task import Result, Task
 
 from .default import NetmikoNetboxNornirDriver as DefaultNetboxNornirDriver
+from .config_store import get_config_store
+from .transport import HttpRequest, get_base_url, get_transport
+
+CHUNK_SIZE = 64 * 1024
+# Jobs changing the running configuration, commits on the firewall and pushes from Panorama.
+COMMIT_JOB_TYPES = ("Commit", "CommitAll")
+
+
+def _escape(data: str) -> str:
+    """Escape character data, like `xml.dom.minidom`."""
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+
+class XmlPrettyPrinter:
+    """Incremental XML pretty printer, writing the same output as `xml.dom.minidom` `toprettyxml()`.
+
+    The document is fed in chunks and written out as it's parsed, only the open elements and the pending
+    character data are kept in memory, instead of the whole document tree. CDATA sections are kept as such, written
+    without indentation like minidom does.
+
+    Args:
+        writer (TextIO): Text stream the document is written into, like a `StringIO` or an open file
+        indent (str): Indentation of each level
+        newl (str): Line separator
+    """
+
+    def __init__(self, writer: TextIO, indent: str = "\t", newl: str = "\n"):
+        """Initialize the printer."""
+        self.writer = writer
+        self.indent = indent
+        self.newl = newl
+        # Open elements, as [name, whether the children were started, pending text and CDATA nodes].
+        self.stack: List[list] = []
+        # CDATA node of the section being parsed, None outside of CDATA sections.
+        self.cdata: Optional[list] = None
+        self.in_cdata = False
+        self.parser = expat.ParserCreate()  # nosec
+        self.parser.buffer_text = True
+        self.parser.ordered_attributes = True
+        self.parser.StartElementHandler = self.start_element
+        self.parser.EndElementHandler = self.end_element
+        self.parser.CharacterDataHandler = self.character_data
+        self.parser.StartCdataSectionHandler = self.start_cdata_section
+        self.parser.EndCdataSectionHandler = self.end_cdata_section
+        self.parser.CommentHandler = self.comment
+        self.parser.ProcessingInstructionHandler = self.processing_instruction
+        self.writer.write(f'<?xml version="1.0" ?>{newl}')
+
+    def feed(self, data):
+        """Parse a chunk of the document, bytes or str."""
+        self.parser.Parse(data, False)
+
+    def close(self):
+        """Parse the end of the document."""
+        self.parser.Parse(b"", True)
+
+    def start_child(self):
+        """Write the children start of the current element, and its character data preceding the child."""
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        if not frame[1]:
+            self.writer.write(">" + self.newl)
+            frame[1] = True
+        self.flush_text(frame)
+
+    def format_node(self, node: list, indent: str = "", newl: str = "") -> str:
+        """Format a text node, escaped, or a CDATA node, which minidom writes without indentation."""
+        kind, parts = node
+        if kind == "cdata":
+            return f"<![CDATA[{''.join(parts)}]]>"
+        return indent + _escape("".join(parts)) + newl
+
+    def flush_text(self, frame: list):
+        """Write the pending text and CDATA nodes of an element, as children on their own lines."""
+        for node in frame[2]:
+            self.writer.write(self.format_node(node, self.indent * len(self.stack), self.newl))
+        frame[2] = []
+
+    def start_element(self, name: str, attributes: List[str]):
+        """Write the start tag of an element, left open until its first child."""
+        self.start_child()
+        self.writer.write(self.indent * len(self.stack) + "<" + name)
+        for attribute, value in zip(attributes[::2], attributes[1::2]):
+            self.writer.write(f' {attribute}="{_escape(value)}"')
+        self.stack.append([name, False, []])
+
+    def end_element(self, name: str):
+        """Write the end of an element, inline when its only child is a text or CDATA node."""
+        frame = self.stack[-1]
+        if not frame[1] and len(frame[2]) <= 1:
+            if frame[2]:
+                self.writer.write(f">{self.format_node(frame[2][0])}</{name}>{self.newl}")
+            else:
+                self.writer.write("/>" + self.newl)
+            self.stack.pop()
+            return
+        self.start_child()
+        self.stack.pop()
+        self.writer.write(f"{self.indent * len(self.stack)}</{name}>{self.newl}")
+
+    def character_data(self, data: str):
+        """Buffer character data, written once the next child or the end of the element is parsed.
+
+        Like minidom, consecutive text is a single node, and each CDATA section a node of its own.
+        """
+        if not self.stack:
+            return
+        nodes = self.stack[-1][2]
+        if self.in_cdata:
+            if self.cdata is None:
+                self.cdata = ["cdata", []]
+                nodes.append(self.cdata)
+            self.cdata[1].append(data)
+        elif nodes and nodes[-1][0] == "text":
+            nodes[-1][1].append(data)
+        else:
+            nodes.append(["text", [data]])
+
+    def start_cdata_section(self):
+        """Start a CDATA section, its character data is a node of its own."""
+        self.in_cdata = True
+        self.cdata = None
+
+    def end_cdata_section(self):
+        """End a CDATA section."""
+        self.in_cdata = False
+        self.cdata = None
+
+    def comment(self, data: str):
+        """Write a comment on its own line."""
+        self.start_child()
+        self.writer.write(f"{self.indent * len(self.stack)}<!--{data}-->{self.newl}")
+
+    def processing_instruction(self, target: str, data: str):
+        """Write a processing instruction on its own line."""
+        self.start_child()
+        self.writer.write(f"{self.indent * len(self.stack)}<?{target} {data}?>{self.newl}")
 
 
 class NetboxNornirDriver(DefaultNetboxNornirDriver):
     """Palo Alto PANOS driver for configuration backup."""
 
+    # Port of the API when the host port is unset or the SSH port.
+    API_PORT = 443
+
+    @classmethod
+    def get_config_request(cls, host: Host) -> HttpRequest:
+        """Build the request exporting the configuration of the device."""
+        return HttpRequest(
+            "GET",
+            get_base_url(host, default_port=cls.API_PORT),
+            f"/api/?type=export&category=configuration&key={host.data['key']}",
+        )
+
     @staticmethod
-    def get_config(task: Task, logger, obj) -> Result:
+    def format_config(config: str) -> str:
+        """Pretty print the exported XML configuration."""
+        buffer = io.StringIO()
+        printer = XmlPrettyPrinter(buffer)
+        printer.feed(config)
+        printer.close()
+        return buffer.getvalue()
+
+    @classmethod
+    def stream_config(cls, host: Host, writer: TextIO):
+        """Export the configuration of the device, pretty printed into `writer` as the response is received.
+
+        Args:
+            host (Host): Nornir host.
+            writer (TextIO): Text stream the configuration is written into, like a `StringIO` or an open file.
+        """
+        request = cls.get_config_request(host)
+        with get_transport().send(request._replace(kwargs={"stream": True})) as response:
+            response.raise_for_status()
+            printer = XmlPrettyPrinter(writer)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                printer.feed(chunk)
+            printer.close()
+
+    @classmethod
+    def get_config(cls, task: Task, logger, obj) -> Result:
         """Get the latest configuration from the device.
         Args:
             task (Task): Nornir Task.
@@ -19,25 +197,86 @@ class NetboxNornirDriver(DefaultNetboxNornirDriver):
             obj (Device): A Netbox Device Django ORM object instance.
         Returns:
             Result: Nornir Result object with a dict as a result containing the running configuration
-                { "config: <running configuration> }
+                { "config: <running configuration> }, or { "config_ref": <ConfigRef> } with the config store enabled
         """
 
-        session = requests.Session()
-        session.trust_env = False
         logger.log_debug(
             f"Executing get_config for {task.host.name} on {task.host.platform}",
             grouping=task.host.name,
         )
-        if task.host.port == 22:
-            port = 443
-        else:
-            port = task.host.port
-        response = session.get(
-            f"https://{task.host.hostname}:{port}/api/?type=export&category=configuration&key={task.host.data['key']}",
-            verify=False,
-            timeout=10,
+        # With the config store enabled, the export is streamed straight into the store.
+        store = get_config_store()
+        if store is not None:
+            writer = store.writer(task.host.name)
+            try:
+                cls.stream_config(task.host, writer)
+                return Result(host=task.host, result={"config_ref": writer.commit()})
+            finally:
+                writer.close()
+
+        buffer = io.StringIO()
+        cls.stream_config(task.host, buffer)
+        return Result(host=task.host, result={"config": buffer.getvalue()})
+
+    @classmethod
+    async def aget_config(cls, host: Host, client) -> Dict:
+        """Get the latest configuration from the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            dict: Dict containing the running configuration
+                { "config: <running configuration> }
+        """
+        response = await client.send(cls.get_config_request(host))
+        response.raise_for_status()
+        return {"config": cls.format_config(response.text)}
+
+    @classmethod
+    def get_config_marker_request(cls, host: Host) -> HttpRequest:
+        """Build the request listing the jobs of the device."""
+        return HttpRequest(
+            "GET",
+            get_base_url(host, default_port=cls.API_PORT),
+            "/api/",
+            {"params": {"type": "op", "cmd": "<show><jobs><all></all></jobs></show>", "key": host.data["key"]}},
         )
+
+    @staticmethod
+    def parse_config_marker(response) -> Optional[str]:
+        """Get the last commit job of the device from the response."""
         response.raise_for_status()
-        xml_response = xml.dom.minidom.parseString(response.text)  # nosec
-        xml_pretty = xml_response.toprettyxml()  # nosec
-        return Result(host=task.host, result={"config": xml_pretty})
+        commits = [
+            (int(job.findtext("id")), job.findtext("tfin"))
+            for job in ElementTree.fromstring(response.content).iter("job")  # nosec
+            if job.findtext("type") in COMMIT_JOB_TYPES and job.findtext("status") == "FIN"
+        ]
+        if not commits:
+            return None
+        job_id, finished = max(commits)
+        return f"{job_id} {finished}"
+
+    @classmethod
+    def get_config_marker(cls, task: Task, logger, obj) -> Optional[str]:
+        """Get the marker of the configuration of the device.
+        Args:
+            task (Task): Nornir Task.
+            logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+            obj (Device): A Netbox Device Django ORM object instance.
+        Returns:
+            str: Id and finish time of the last commit job, None when missing
+        """
+        response = get_transport().send(cls.get_config_marker_request(task.host))
+        return cls.parse_config_marker(response)
+
+    @classmethod
+    async def aget_config_marker(cls, host: Host, client) -> Optional[str]:
+        """Get the marker of the configuration of the device, with an async HTTP client.
+        Args:
+            host (Host): Nornir host.
+            client (AsyncHttpClient): Async HTTP client.
+        Returns:
+            str: Id and finish time of the last commit job, None when missing
+        """
+        response = await client.send(cls.get_config_marker_request(host))
+        return cls.parse_config_marker(response)
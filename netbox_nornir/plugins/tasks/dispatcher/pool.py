@@ -0,0 +1,165 @@
+"""Worker resident pool of nornir connections, reused by the dispatcher across jobs.
+
+Connections are only reused across jobs by a non-forking worker, like `rq.worker.SimpleWorker`, the work-horse forked
+for each job by the default rq worker closes them when the job ends, see `netbox_nornir.worker`.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from nornir.core.inventory import Host
+from nornir.core.plugins.connections import ConnectionPlugin
+
+from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.worker import check_worker
+
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_MAX_SESSIONS = 500
+
+
+def _is_alive(connection: ConnectionPlugin) -> bool:
+    """Check a connection is still usable, napalm and netmiko connections both expose `is_alive`."""
+    try:
+        alive = connection.connection.is_alive()
+    except Exception:  # pylint: disable=broad-except
+        return False
+    if isinstance(alive, dict):
+        return bool(alive.get("is_alive"))
+    return bool(alive)
+
+
+def _close(connection: ConnectionPlugin):
+    """Close a connection, ignoring errors from sessions already dropped by the device."""
+    try:
+        connection.close()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+class ConnectionPool:
+    """Idle nornir connections, by host, connection plugin and credentials.
+
+    Connections are borrowed into `host.connections` before a driver runs, and released back into the pool once
+    it's done. A connection is only reused when the host connection parameters, credentials included, are unchanged,
+    it hasn't been idle longer than `idle_timeout`, and it's still alive.
+
+    Args:
+        idle_timeout (int): Seconds an idle connection is kept before being closed
+        max_sessions (int): Maximum number of idle connections, the least recently used are closed first
+    """
+
+    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        """Initialize the pool."""
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # Idle connections and their release time, by host name, connection plugin name and fingerprint.
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_fingerprint(host: Host, connection: str) -> str:
+        """Get the fingerprint of the parameters a host connection is opened with, credentials included."""
+        params = host.get_connection_parameters(connection)
+        values = [params.hostname, params.port, params.username, params.password, params.platform, params.extras]
+        return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+    def borrow(self, host: Host):
+        """Move the pooled connections of a host into `host.connections`.
+
+        Connections opened with other parameters, like credentials which have since been rotated, and dead
+        connections are closed instead.
+
+        Args:
+            host (Host): Nornir host
+        """
+        with self.lock:
+            expired = self.evict_idle()
+            keys = [key for key in self.sessions if key[0] == host.name and key[1] not in host.connections]
+            entries = [(key, self.sessions.pop(key)[0]) for key in keys]
+        for connection in expired:
+            _close(connection)
+
+        for (_, name, fingerprint), connection in entries:
+            if fingerprint == self.get_fingerprint(host, name) and _is_alive(connection):
+                host.connections[name] = connection
+            else:
+                _close(connection)
+
+    def release(self, host: Host, healthy: bool = True):
+        """Move the connections of a host back into the pool, closing them when the driver failed.
+
+        Args:
+            host (Host): Nornir host
+            healthy (bool): Whether the connections can be reused
+        """
+        to_close = []
+        for name in list(host.connections):
+            connection = host.connections.pop(name)
+            if not healthy:
+                to_close.append(connection)
+                continue
+            key = (host.name, name, self.get_fingerprint(host, name))
+            with self.lock:
+                if key in self.sessions:
+                    to_close.append(self.sessions.pop(key)[0])
+                self.sessions[key] = (connection, time.monotonic())
+                while len(self.sessions) > self.max_sessions:
+                    to_close.append(self.sessions.popitem(last=False)[1][0])
+        for connection in to_close:
+            _close(connection)
+
+    def evict_idle(self):
+        """Drop the connections idle longer than `idle_timeout`, must be called with the lock held.
+
+        Returns:
+            (list): Evicted connections, to be closed by the caller once the lock is released
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        expired_keys = [key for key, (_, released) in self.sessions.items() if released <= deadline]
+        return [self.sessions.pop(key)[0] for key in expired_keys]
+
+    def invalidate(self, host_name: Optional[str] = None):
+        """Close the pooled connections of a host, or every pooled connection, like after rotating credentials.
+
+        Args:
+            host_name (str): Nornir host name, defaults to every host
+        """
+        with self.lock:
+            keys = [key for key in self.sessions if host_name is None or key[0] == host_name]
+            connections = [self.sessions.pop(key)[0] for key in keys]
+        for connection in connections:
+            _close(connection)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_connection_pool() -> Optional[ConnectionPool]:
+    """Get the connection pool of the worker, None unless enabled by the `connection_pool` plugin setting."""
+    global _POOL  # pylint: disable=global-statement
+    settings = PLUGIN_CFG.get("connection_pool", {})
+    if not settings.get("enabled", False):
+        return None
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                check_worker("connection_pool")
+                _POOL = ConnectionPool(
+                    idle_timeout=settings.get("idle_timeout", DEFAULT_IDLE_TIMEOUT),
+                    max_sessions=settings.get("max_sessions", DEFAULT_MAX_SESSIONS),
+                )
+    return _POOL
+
+
+def invalidate_connections(host_name: Optional[str] = None):
+    """Close the pooled connections of a host, or every pooled connection.
+
+    Args:
+        host_name (str): Nornir host name, defaults to every host
+    """
+    if _POOL is not None:
+        _POOL.invalidate(host_name)
@@ -0,0 +1,149 @@
+"""Reachability pre-flight, dropping the hosts which don't accept TCP connections before the dispatcher runs.
+
+Every host is probed concurrently from an event loop with a short timeout, instead of each unreachable host holding
+a runner worker for the whole connection timeout of its driver. Probe results are kept in the Django cache, shared by
+the jobs of every worker.
+"""
+import asyncio
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from nornir.core import Nornir
+from nornir.core.inventory import Host
+
+from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.plugins.tasks.dispatcher import get_registry
+from netbox_nornir.plugins.tasks.dispatcher.transport import get_port
+from netbox_nornir.utils import run_coroutine
+
+DEFAULT_PORT = 22
+DEFAULT_TIMEOUT = 3
+DEFAULT_CONCURRENCY = 500
+DEFAULT_CACHE_TIMEOUT = 30
+
+CACHE_KEY_PREFIX = "netbox_nornir.probe"
+
+
+def _probe_key(address: Tuple[Optional[str], int]) -> str:
+    digest = hashlib.sha256(f"{address[0]}:{address[1]}".encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}.{digest}"
+
+
+def get_probe_address(host: Host) -> Tuple[Optional[str], int]:
+    """Get the address the driver of a host connects to, the API port for API drivers and SSH otherwise."""
+    registry = get_registry()
+    driver_class = registry.drivers.get(host.platform, registry.drivers.get("default"))
+    api_port = getattr(driver_class, "API_PORT", None)
+    if api_port:
+        return host.hostname, get_port(host, api_port)
+    return host.hostname, host.port or DEFAULT_PORT
+
+
+def get_cached_probes(addresses: Iterable[Tuple[Optional[str], int]]) -> Dict[Tuple[Optional[str], int], Optional[str]]:
+    """Get the cached probe results of addresses.
+
+    Returns:
+        (dict): Reason each address is unreachable, None when reachable, by address, uncached addresses left out
+    """
+    keys = {_probe_key(address): address for address in addresses}
+    return {keys[key]: probe["reason"] for key, probe in cache.get_many(keys).items()}
+
+
+def set_cached_probe(address: Tuple[Optional[str], int], reason: Optional[str], cache_timeout: int):
+    """Cache the probe result of an address."""
+    if cache_timeout > 0:
+        cache.set(_probe_key(address), {"reason": reason}, timeout=cache_timeout)
+
+
+async def probe(hostname: Optional[str], port: int, timeout: float) -> Optional[str]:
+    """Open, and close, a TCP connection to an address.
+
+    Args:
+        hostname (str): Host name or IP address
+        port (int): TCP port
+        timeout (float): Timeout in seconds, name resolution included
+    Returns:
+        (str): Reason the address is unreachable, None when reachable
+    """
+    if not hostname:
+        return "no hostname"
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(hostname, port), timeout)
+    except asyncio.TimeoutError:
+        return f"TCP connection to {hostname}:{port} timed out after {timeout}s"
+    except OSError as exc:
+        return f"TCP connection to {hostname}:{port} failed: {exc.strerror or exc}"
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return None
+
+
+async def probe_hosts(hosts: Dict[str, Host], timeout: float, concurrency: int, cache_timeout: int) -> Dict:
+    """Probe the address of every host, at most `concurrency` at once, each address once.
+
+    Args:
+        hosts (dict): Nornir hosts by name
+        timeout (float): Timeout of each probe in seconds
+        concurrency (int): Maximum number of probes at once
+        cache_timeout (int): Seconds the probe results are cached
+    Returns:
+        (dict): Reason each unreachable host is unreachable, by host name
+    """
+    addresses = {name: get_probe_address(host) for name, host in hosts.items()}
+    reasons = get_cached_probes(set(addresses.values()))
+    to_probe = set(addresses.values()) - set(reasons)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe_address(address: Tuple[str, int]):
+        async with semaphore:
+            reason = await probe(*address, timeout)
+        set_cached_probe(address, reason, cache_timeout)
+        reasons[address] = reason
+
+    await asyncio.gather(*(probe_address(address) for address in to_probe))
+    return {name: reasons[address] for name, address in addresses.items() if reasons[address] is not None}
+
+
+def preflight(
+    nr: Nornir, logger, obj, timeout: float = None, concurrency: int = None, cache_timeout: int = None
+) -> Dict[str, str]:
+    """Probe every host of a nornir object, and mark the unreachable hosts as failed before running a task.
+
+    Failed hosts are skipped by `nr.run`, like by `dispatcher_async`. Hosts already failed aren't probed.
+
+    Args:
+        nr (Nornir): Nornir object
+        logger (NornirLogger): Custom NornirLogger object to reflect job results (via Netbox Jobs) and Python logger.
+        obj (Device): A Netbox Device Django ORM object instance.
+        timeout (float): Timeout of each probe in seconds, defaults to the `preflight` plugin setting
+        concurrency (int): Maximum number of probes at once, defaults to the `preflight` plugin setting
+        cache_timeout (int): Seconds the probe results are cached, defaults to the `preflight` plugin setting
+    Returns:
+        (dict): Reason each unreachable host is unreachable, by host name
+    """
+    settings = PLUGIN_CFG.get("preflight", {})
+    timeout = timeout or settings.get("timeout", DEFAULT_TIMEOUT)
+    concurrency = concurrency or settings.get("concurrency", DEFAULT_CONCURRENCY)
+    cache_timeout = settings.get("cache_timeout", DEFAULT_CACHE_TIMEOUT) if cache_timeout is None else cache_timeout
+
+    # Lazy inventories answer the host address from the host spec, without building the host and its credentials.
+    inventory_hosts = nr.inventory.hosts
+    get_host = getattr(inventory_hosts, "view", inventory_hosts.get)
+    hosts = {name: get_host(name) for name in inventory_hosts.keys() if name not in nr.data.failed_hosts}
+    if not hosts:
+        return {}
+    unreachable = run_coroutine(probe_hosts(hosts, timeout, concurrency, cache_timeout))
+    for name, reason in unreachable.items():
+        logger.log_failure(obj, f"Unreachable, skipped: {reason}", grouping=name)
+    nr.data.failed_hosts.update(unreachable)
+    return unreachable
+
+
+def is_preflight_enabled() -> bool:
+    """Whether the dispatcher runs the pre-flight, from the `preflight` plugin setting."""
+    return PLUGIN_CFG.get("preflight", {}).get("enabled", False)
@@ -0,0 +1,81 @@
+"""Dispatch registry, resolving the driver task of a platform and method without importing anything per call."""
+import importlib
+import inspect
+from typing import Callable, Dict, Optional, Tuple
+
+from netbox_nornir.exceptions import NornirNetboxException
+
+# Leading parameters of the driver tasks run by `dispatcher`, and of the driver coroutines run by `dispatcher_async`.
+TASK_PARAMETERS = ("task", "logger", "obj")
+COROUTINE_PARAMETERS = ("host", "client")
+
+
+def import_driver(driver: str) -> type:
+    """Import a driver class from its path.
+
+    Args:
+        driver (str): Import path of the driver class
+    Returns:
+        (type): Driver class
+    """
+    try:
+        module_name, class_name = driver.rsplit(".", 1)
+        driver_class = getattr(importlib.import_module(module_name), class_name)
+    except (AttributeError, ImportError, ValueError) as exc:
+        raise NornirNetboxException(f"Unable to locate the class {driver}: {exc}")
+    if not inspect.isclass(driver_class):
+        raise NornirNetboxException(f"Unable to locate the class {driver}, {driver_class} isn't a class.")
+    return driver_class
+
+
+def is_driver_task(method: Callable) -> bool:
+    """Whether a driver method is a task, taking `(task, logger, obj)`, or a coroutine taking `(host, client)`.
+
+    Helpers of the drivers, like `get_config_request` or `combine_interfaces`, aren't dispatched.
+    """
+    try:
+        parameters = tuple(inspect.signature(method).parameters)
+    except (TypeError, ValueError):
+        return False
+    if inspect.iscoroutinefunction(method):
+        return parameters[: len(COROUTINE_PARAMETERS)] == COROUTINE_PARAMETERS
+    return parameters[: len(TASK_PARAMETERS)] == TASK_PARAMETERS
+
+
+class DispatchRegistry:
+    """Driver tasks of every platform and method, resolved once from a drivers mapping.
+
+    Every driver class of the mapping is imported when the registry is built, so a typo in the mapping fails right
+    away instead of in the middle of a job. Only the driver tasks and coroutines are registered, see `is_driver_task`.
+
+    Args:
+        mapping (dict): Import path of the driver class by platform, with a `default` entry for other platforms
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        """Initialize the registry, importing and validating every driver."""
+        self.mapping = dict(mapping)
+        self.drivers = {platform: import_driver(driver) for platform, driver in self.mapping.items()}
+        self.tasks: Dict[Tuple[str, str], Callable] = {
+            (platform, name): method
+            for platform, driver_class in self.drivers.items()
+            for name, method in inspect.getmembers(driver_class, callable)
+            if not name.startswith("_") and is_driver_task(method)
+        }
+
+    def get_driver(self, platform: str) -> Optional[str]:
+        """Get the import path of the driver of a platform, the default driver for unknown platforms."""
+        return self.mapping.get(platform, self.mapping.get("default"))
+
+    def get_task(self, platform: str, method: str) -> Optional[Callable]:
+        """Get the driver task of a platform and method.
+
+        Args:
+            platform (str): Host platform
+            method (str): Driver method name
+        Returns:
+            (callable): Driver task, None when the driver of the platform doesn't implement the method
+        """
+        if platform not in self.drivers:
+            platform = "default"
+        return self.tasks.get((platform, method))
@@ -0,0 +1,161 @@
+"""Shared HTTP transport of the API drivers, keeping a pool of keep-alive connections per device."""
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from nornir.core.inventory import Host
+from requests.adapters import HTTPAdapter
+
+from netbox_nornir.constraints import PLUGIN_CFG
+
+DEFAULT_POOL_MAXSIZE = 4
+DEFAULT_MAX_HOSTS = 1000
+DEFAULT_TIMEOUT = 10
+
+
+class HttpRequest(NamedTuple):
+    """Request to a device API, sent by the shared transport or an async client."""
+
+    method: str
+    base_url: str
+    path: str
+    # `requests` arguments, also accepted by `httpx`: `auth`, `headers` and `params`.
+    kwargs: Optional[Dict] = None
+
+
+class HttpTransport:
+    """Keep-alive HTTP sessions of the API drivers, one per device, shared by every job of the worker.
+
+    Requests to the same device reuse the open connections of its session instead of a new TCP and TLS handshake.
+    Sessions of the least recently used devices are closed over `max_hosts`.
+
+    Args:
+        pool_maxsize (int): Maximum number of open connections per device
+        max_hosts (int): Maximum number of device sessions kept open
+        timeout (int): Default timeout of the requests in seconds
+        verify (bool): Verify the device certificates
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_hosts: int = DEFAULT_MAX_HOSTS,
+        timeout: int = DEFAULT_TIMEOUT,
+        verify: bool = False,
+    ):
+        """Initialize the transport."""
+        self.pool_maxsize = pool_maxsize
+        self.max_hosts = max_hosts
+        self.timeout = timeout
+        self.verify = verify
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_session(self, base_url: str) -> requests.Session:
+        """Get the session of a device, created on first use.
+
+        Args:
+            base_url (str): Scheme, hostname and port of the device
+        Returns:
+            (requests.Session): Device session
+        """
+        closed_sessions = []
+        with self.lock:
+            session = self.sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                session.trust_env = False
+                session.verify = self.verify
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.sessions[base_url] = session
+                while len(self.sessions) > self.max_hosts:
+                    closed_sessions.append(self.sessions.popitem(last=False)[1])
+            else:
+                self.sessions.move_to_end(base_url)
+        for closed_session in closed_sessions:
+            closed_session.close()
+        return session
+
+    def request(self, method: str, base_url: str, path: str, **kwargs) -> requests.Response:
+        """Send a request to a device, over its session.
+
+        Args:
+            method (str): HTTP method
+            base_url (str): Scheme, hostname and port of the device
+            path (str): Path of the request, with its query string
+            **kwargs: `requests` arguments
+        Returns:
+            (requests.Response): Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.get_session(base_url).request(method, f"{base_url}{path}", **kwargs)
+
+    def send(self, request: HttpRequest) -> requests.Response:
+        """Send a request to a device, over its session.
+
+        Args:
+            request (HttpRequest): Request
+        Returns:
+            (requests.Response): Response
+        """
+        return self.request(request.method, request.base_url, request.path, **(request.kwargs or {}))
+
+    def close(self):
+        """Close every session."""
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Get the HTTP transport of the worker, configured by the `http_transport` plugin setting."""
+    global _TRANSPORT  # pylint: disable=global-statement
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                settings = PLUGIN_CFG.get("http_transport", {})
+                _TRANSPORT = HttpTransport(
+                    pool_maxsize=settings.get("pool_maxsize", DEFAULT_POOL_MAXSIZE),
+                    max_hosts=settings.get("max_hosts", DEFAULT_MAX_HOSTS),
+                    timeout=settings.get("timeout", DEFAULT_TIMEOUT),
+                    verify=settings.get("verify", False),
+                )
+    return _TRANSPORT
+
+
+def get_port(host: Host, default_port: int = None) -> Optional[int]:
+    """Get the port of a host API.
+
+    Args:
+        host (Host): Nornir host
+        default_port (int): Port of the API when the host port is unset or the SSH port
+    Returns:
+        (int): Port of the host API, None when unset
+    """
+    if default_port and host.port in (None, 22):
+        return default_port
+    return host.port
+
+
+def get_base_url(host: Host, default_port: int = None) -> str:
+    """Get the HTTPS base URL of a host API.
+
+    Args:
+        host (Host): Nornir host
+        default_port (int): Port of the API when the host port is unset or the SSH port
+    Returns:
+        (str): Base URL of the host API
+    """
+    port = get_port(host, default_port)
+    if port:
+        return f"https://{host.hostname}:{port}"
+    return f"https://{host.hostname}"
@@ -0,0 +1,177 @@
+"""Signal handlers for plugin.
+
+The handlers keep the inventory cache up to date, they are only connected with the `inventory_cache` plugin setting
+enabled, see `connect_signals`. Cache entries are dropped once the transaction of the change commits, so an
+inventory loaded meanwhile can't cache the state before the change again.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import ManyToManyField, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from dcim.models import (
+    Device,
+    DeviceRole,
+    DeviceType,
+    Location,
+    Manufacturer,
+    Platform,
+    Rack,
+    Region,
+    Site,
+    SiteGroup,
+    VirtualChassis,
+)
+from extras.models import ConfigContext, Tag
+from ipam.models import IPAddress
+from tenancy.models import Tenant, TenantGroup
+from virtualization.models import Cluster, ClusterGroup, ClusterType
+
+from netbox_nornir.plugins.inventory.cache import invalidate_hosts, invalidate_members, invalidate_variant
+
+# Lookups of the devices whose cached host spec is derived from an instance of each model.
+INVENTORY_CACHE_LOOKUPS = {
+    Device: lambda instance: Q(pk=instance.pk),
+    DeviceRole: lambda instance: Q(device_role=instance),
+    DeviceType: lambda instance: Q(device_type=instance),
+    IPAddress: lambda instance: Q(primary_ip4=instance) | Q(primary_ip6=instance),
+    Manufacturer: lambda instance: Q(device_type__manufacturer=instance),
+    Platform: lambda instance: Q(platform=instance),
+    Site: lambda instance: Q(site=instance),
+    Tenant: lambda instance: Q(tenant=instance),
+}
+
+# Models host specs aren't derived from, but inventory filters can match devices on, like `tags__slug` or
+# `site__region`. Changing them only drops the cached filter set memberships.
+INVENTORY_MEMBERS_MODELS = [
+    Cluster,
+    ClusterGroup,
+    ClusterType,
+    Location,
+    Rack,
+    Region,
+    SiteGroup,
+    Tag,
+    TenantGroup,
+    VirtualChassis,
+]
+
+# Lookups of the devices whose config context is assigned through an instance of each model, besides the models
+# host specs are derived from. Nested regions, site groups, locations and tenant groups assign their descendants.
+CONFIG_CONTEXT_LOOKUPS = {
+    Cluster: lambda instance: Q(cluster=instance),
+    ClusterGroup: lambda instance: Q(cluster__group=instance),
+    ClusterType: lambda instance: Q(cluster__type=instance),
+    Location: lambda instance: Q(location__in=instance.get_descendants(include_self=True)),
+    Region: lambda instance: Q(site__region__in=instance.get_descendants(include_self=True)),
+    SiteGroup: lambda instance: Q(site__group__in=instance.get_descendants(include_self=True)),
+    Tag: lambda instance: Q(tags=instance),
+    TenantGroup: lambda instance: Q(tenant__group__in=instance.get_descendants(include_self=True)),
+}
+
+
+def invalidate_inventory_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop the cached host specs of the devices affected by a change.
+
+    Deletions are handled before the delete happens, while the affected devices still reference the instance.
+    """
+    lookup = INVENTORY_CACHE_LOOKUPS[sender](instance)
+    device_ids = list(Device.objects.filter(lookup).values_list("pk", flat=True))
+    transaction.on_commit(partial(invalidate_hosts, device_ids))
+
+
+def invalidate_inventory_members(sender, **kwargs):  # pylint: disable=unused-argument
+    """Drop the cached filter set memberships when an object filters can match devices on changes."""
+    transaction.on_commit(invalidate_members)
+
+
+def invalidate_device_tags(sender, instance, action, model, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """Drop the cached config contexts of devices, and the filter set memberships, when their tags change.
+
+    Tag assignments of every model share a single through model, only the changes of devices are handled.
+    """
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Device):
+        transaction.on_commit(partial(invalidate_hosts, [instance.pk], variants=["config_context"]))
+    elif model is Device:
+        # Clearing the devices of a tag doesn't tell which devices were tagged.
+        if pk_set is None:
+            transaction.on_commit(partial(invalidate_variant, "config_context"))
+            transaction.on_commit(invalidate_members)
+        else:
+            transaction.on_commit(partial(invalidate_hosts, list(pk_set), variants=["config_context"]))
+
+
+def invalidate_config_context_hosts(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop the cached config contexts of the devices assigned config contexts through a changed object.
+
+    Deletions are handled before the delete happens, while the affected devices still reference the instance.
+    """
+    lookup = CONFIG_CONTEXT_LOOKUPS[sender](instance)
+    device_ids = list(Device.objects.filter(lookup).values_list("pk", flat=True))
+    transaction.on_commit(partial(invalidate_hosts, device_ids, variants=["config_context"]))
+
+
+def invalidate_config_context_cache(sender, action=None, **kwargs):  # pylint: disable=unused-argument
+    """Drop every cached host spec holding config context data when a config context, or its assignment, changes.
+
+    The specs are dropped by starting a new generation of the `config_context` variant, without reading the
+    devices. Assignment changes are handled once done, on their `post_` action.
+    """
+    if action is not None and not action.startswith("post_"):
+        return
+    transaction.on_commit(partial(invalidate_variant, "config_context"))
+
+
+def connect_signals():
+    """Connect the handlers keeping the inventory cache up to date, connecting them again has no effect."""
+    for model in INVENTORY_CACHE_LOOKUPS:
+        post_save.connect(
+            invalidate_inventory_cache, sender=model, dispatch_uid=f"netbox_nornir_post_save_{model.__name__}"
+        )
+        pre_delete.connect(
+            invalidate_inventory_cache, sender=model, dispatch_uid=f"netbox_nornir_pre_delete_{model.__name__}"
+        )
+
+    for model in INVENTORY_MEMBERS_MODELS:
+        post_save.connect(
+            invalidate_inventory_members, sender=model, dispatch_uid=f"netbox_nornir_post_save_{model.__name__}"
+        )
+        post_delete.connect(
+            invalidate_inventory_members, sender=model, dispatch_uid=f"netbox_nornir_post_delete_{model.__name__}"
+        )
+
+    for model in CONFIG_CONTEXT_LOOKUPS:
+        post_save.connect(
+            invalidate_config_context_hosts,
+            sender=model,
+            dispatch_uid=f"netbox_nornir_post_save_config_context_{model.__name__}",
+        )
+        pre_delete.connect(
+            invalidate_config_context_hosts,
+            sender=model,
+            dispatch_uid=f"netbox_nornir_pre_delete_config_context_{model.__name__}",
+        )
+
+    m2m_changed.connect(
+        invalidate_device_tags,
+        sender=Device._meta.get_field("tags").remote_field.through,
+        dispatch_uid="netbox_nornir_m2m_changed_Device_tags",
+    )
+
+    post_save.connect(
+        invalidate_config_context_cache, sender=ConfigContext, dispatch_uid="netbox_nornir_post_save_ConfigContext"
+    )
+    pre_delete.connect(
+        invalidate_config_context_cache, sender=ConfigContext, dispatch_uid="netbox_nornir_pre_delete_ConfigContext"
+    )
+    for field in ConfigContext._meta.many_to_many:
+        if not isinstance(field, ManyToManyField):
+            continue
+        m2m_changed.connect(
+            invalidate_config_context_cache,
+            sender=field.remote_field.through,
+            dispatch_uid=f"netbox_nornir_m2m_changed_ConfigContext_{field.name}",
+        )
@@ -0,0 +1,129 @@
+"""Tests of the asyncio dispatcher of the HTTP API drivers."""
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+from nornir.core import Nornir
+from nornir.core.inventory import Defaults, Groups, Host, Hosts, Inventory
+from nornir.core.task import Result
+from nornir.plugins.runners import ThreadedRunner
+
+from netbox_nornir.plugins.inventory.lazy import HostLoader, LazyHosts, LazyInventory
+from netbox_nornir.plugins.tasks.dispatcher import async_dispatcher
+from netbox_nornir.plugins.tasks.dispatcher.async_dispatcher import AsyncHttpClient, dispatcher_async
+from netbox_nornir.plugins.tasks.dispatcher.registry import DispatchRegistry
+from netbox_nornir.plugins.tasks.dispatcher.transport import HttpRequest
+
+
+class SyncDriver:
+    """Driver run by the nornir runner."""
+
+    @staticmethod
+    def get_config(task, logger, obj):
+        """Get the configuration."""
+        return Result(host=task.host, result={"config": f"config of {task.host.name}"})
+
+
+class AsyncDriver(SyncDriver):
+    """Driver run from the event loop, failing for the hosts named `failing-*`."""
+
+    @staticmethod
+    async def aget_config(host, client):
+        """Get the configuration."""
+        if host.name.startswith("failing-"):
+            raise RuntimeError("Unreachable")
+        return {"config": f"config of {host.name}"}
+
+
+def get_nornir(platforms, lazy=False):
+    """Get a nornir object of hosts by name and platform, with a lazy inventory or a plain one."""
+    if lazy:
+        index = {
+            name: {"hostname": name, "platform": platform, "groups": [], "data": {}}
+            for name, platform in platforms.items()
+        }
+        build = mock.Mock(side_effect=lambda name: Host(name, hostname=name, platform=platforms[name]))
+        inventory = LazyInventory(
+            hosts=LazyHosts(HostLoader(index, build, Groups())), groups=Groups(), defaults=Defaults()
+        )
+    else:
+        build = None
+        hosts = Hosts({name: Host(name, platform=platform) for name, platform in platforms.items()})
+        inventory = Inventory(hosts=hosts, groups=Groups(), defaults=Defaults())
+    return Nornir(inventory=inventory, runner=ThreadedRunner(num_workers=2)), build
+
+
+class DispatcherAsyncTestCase(SimpleTestCase):
+    """Hosts of API drivers run from the event loop, the others from the runner, with the same results."""
+
+    def setUp(self):
+        """Dispatch the `sync` and `async` platforms to the test drivers."""
+        registry = DispatchRegistry(
+            {
+                "default": f"{SyncDriver.__module__}.{SyncDriver.__name__}",
+                "async": f"{AsyncDriver.__module__}.{AsyncDriver.__name__}",
+            }
+        )
+        for module in ("netbox_nornir.plugins.tasks.dispatcher", async_dispatcher.__name__):
+            patcher = mock.patch(f"{module}.get_registry", return_value=registry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.logger = mock.Mock()
+
+    def run_dispatcher(self, nr):
+        """Run `get_config` on every host."""
+        return dispatcher_async(nr, "get_config", self.logger, None, conditional=False)
+
+    def test_split(self):
+        """Test the hosts are run by the event loop or the runner depending on their driver, with the same result."""
+        nr, _ = get_nornir({"router-1": "sync", "firewall-1": "async"})
+        with mock.patch.object(async_dispatcher, "run_hosts", wraps=async_dispatcher.run_hosts) as run_hosts:
+            result = self.run_dispatcher(nr)
+
+        self.assertEqual(sorted(result), ["firewall-1", "router-1"])
+        self.assertEqual(list(run_hosts.call_args.args[0]), ["firewall-1"])
+        sync_result, async_result = result["router-1"], result["firewall-1"]
+        self.assertEqual([sub.name for sub in async_result], [sub.name for sub in sync_result])
+        self.assertEqual(async_result[1].result, {"config": "config of firewall-1"})
+        self.assertEqual(async_result[0].result[0].result, async_result[1].result)
+        self.assertEqual(sync_result[0].result[0].result, sync_result[1].result)
+        self.assertFalse(result.failed)
+
+    def test_failed_hosts(self):
+        """Test the hosts failed from the event loop are marked as failed, like the runner does."""
+        nr, _ = get_nornir({"firewall-1": "async", "failing-1": "async"})
+
+        result = self.run_dispatcher(nr)
+
+        self.assertEqual(set(result.failed_hosts), {"failing-1"})
+        self.assertEqual(nr.data.failed_hosts, {"failing-1"})
+        self.assertIsInstance(result["failing-1"][0].exception, RuntimeError)
+        self.assertEqual([sub.name for sub in result["failing-1"]], ["dispatcher", "get_config"])
+
+    def test_lazy_inventory(self):
+        """Test hosts of a lazy inventory already failed aren't built."""
+        nr, build = get_nornir({"router-1": "sync", "firewall-1": "async", "failing-1": "async"}, lazy=True)
+        nr.data.failed_hosts.add("failing-1")
+
+        result = self.run_dispatcher(nr)
+
+        self.assertEqual(sorted(result), ["firewall-1", "router-1"])
+        self.assertEqual(sorted(call.args[0] for call in build.call_args_list), ["firewall-1", "router-1"])
+
+
+class AsyncHttpClientTestCase(SimpleTestCase):
+    """Requests are sent with httpx when installed, over the shared transport otherwise."""
+
+    def test_without_httpx(self):
+        """Test requests are sent over the shared transport, from a thread, without httpx."""
+        request = HttpRequest("GET", "https://10.0.0.1", "/api/")
+        with mock.patch.object(async_dispatcher, "httpx", None), mock.patch.object(
+            async_dispatcher, "get_transport"
+        ) as get_transport:
+            client = AsyncHttpClient(concurrency=2, timeout=10, verify=False)
+            response = asyncio.run(client.send(request))
+            asyncio.run(client.aclose())
+
+        self.assertIsNone(client.client)
+        get_transport.return_value.send.assert_called_once_with(request)
+        self.assertIs(response, get_transport.return_value.send.return_value)
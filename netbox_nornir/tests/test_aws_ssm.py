@@ -0,0 +1,264 @@
+"""Tests of the AWS SSM credentials class."""
+import asyncio
+import os
+import threading
+import time
+from unittest import mock
+
+import boto3
+from botocore.stub import Stubber
+from django.test import SimpleTestCase
+from moto import mock_aws
+
+from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.credentials.aws_ssm import CredentialsAwsSsm
+from netbox_nornir.plugins.credentials.cache import CREDENTIALS_CACHE
+from netbox_nornir.plugins.credentials.clients import clear_clients
+from netbox_nornir.plugins.credentials.throttle import AdaptiveRateLimiter
+
+REGION = "eu-west-2"
+
+
+def get_device(name, manufacturer="cisco", platform="ios"):
+    """Get a device as passed to `prefetch`."""
+    return {"name": name, "manufacturer": manufacturer, "platform": platform}
+
+
+class CredentialsAwsSsmTestCase(SimpleTestCase):
+    """Parameters are fetched from a mocked SSM, in batches, and cached."""
+
+    def setUp(self):
+        """Start a mocked SSM holding default, platform and device credentials."""
+        environ = mock.patch.dict(
+            os.environ,
+            {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_REGION": REGION},
+        )
+        environ.start()
+        self.addCleanup(environ.stop)
+        mocked_aws = mock_aws()
+        mocked_aws.start()
+        self.addCleanup(mocked_aws.stop)
+        # Clients and cached parameters would outlive the mocked account.
+        clear_clients()
+        self.addCleanup(clear_clients)
+        CREDENTIALS_CACHE.clear()
+        self.addCleanup(CREDENTIALS_CACHE.clear)
+
+        self.ssm = boto3.client("ssm", region_name=REGION)
+        self.put_parameters("device_default", "default")
+        self.put_parameters("cisco_ios", "platform")
+        self.put_parameters("router-1", "device")
+
+    def put_parameters(self, path, value):
+        """Create the username, password, secret and key parameters under a path."""
+        for field in ("username", "password", "secret", "key"):
+            self.ssm.put_parameter(Name=f"/netbox/{path}/{field}", Value=f"{value}-{field}", Type="SecureString")
+
+    @staticmethod
+    def count_calls(creds, operation):
+        """Record the calls of a client operation, still sent to the mocked SSM."""
+        return mock.patch.object(creds.client, operation, wraps=getattr(creds.client, operation))
+
+    def test_prefetch_batches(self):
+        """Test every parameter name is fetched once, in batches of at most 10 names."""
+        creds = CredentialsAwsSsm()
+        devices = [get_device(f"router-{index}") for index in range(1, 4)]
+        with self.count_calls(creds, "get_parameters") as get_parameters:
+            creds.prefetch(devices)
+
+        # 4 names for each device, the platform and the default credentials.
+        names = [name for call in get_parameters.call_args_list for name in call.kwargs["Names"]]
+        self.assertEqual(get_parameters.call_count, 2)
+        self.assertTrue(all(len(call.kwargs["Names"]) <= 10 for call in get_parameters.call_args_list))
+        self.assertEqual(len(names), 20)
+        self.assertEqual(len(set(names)), 20)
+
+        with self.count_calls(creds, "get_parameters") as get_parameters:
+            device_creds = creds.get_device_creds(devices[0], manufacturer="cisco", platform="ios")
+            platform_creds = creds.get_device_creds(devices[1], manufacturer="cisco", platform="ios")
+        get_parameters.assert_not_called()
+        self.assertEqual(device_creds, ("device-username", "device-password", "device-secret", "device-key"))
+        self.assertEqual(platform_creds, ("platform-username", "platform-password", "platform-secret", "platform-key"))
+
+    def test_default_creds(self):
+        """Test devices without device or platform parameters get the default credentials."""
+        creds = CredentialsAwsSsm()
+        device = get_device("switch-1", manufacturer="arista", platform="eos")
+        creds.prefetch([device])
+        self.assertEqual(
+            creds.get_device_creds(device, manufacturer="arista", platform="eos"),
+            ("default-username", "default-password", "default-secret", "default-key"),
+        )
+
+    def test_negative_cache(self):
+        """Test parameters found missing are cached, so the next inventory load doesn't fetch them again."""
+        device = get_device("switch-1", manufacturer="arista", platform="eos")
+        CredentialsAwsSsm({"cache_ttl": 60}).prefetch([device])
+
+        creds = CredentialsAwsSsm({"cache_ttl": 60})
+        with self.count_calls(creds, "get_parameters") as get_parameters:
+            creds.prefetch([device])
+            device_creds = creds.get_device_creds(device, manufacturer="arista", platform="eos")
+        get_parameters.assert_not_called()
+        self.assertEqual(device_creds, ("default-username", "default-password", "default-secret", "default-key"))
+
+    def test_cache_disabled(self):
+        """Test parameters aren't kept past the inventory load by default."""
+        device = get_device("switch-1", manufacturer="arista", platform="eos")
+        CredentialsAwsSsm().prefetch([device])
+
+        creds = CredentialsAwsSsm()
+        with self.count_calls(creds, "get_parameters") as get_parameters:
+            creds.prefetch([device])
+        get_parameters.assert_called()
+
+    def test_aget_many_concurrency(self):
+        """Test `aget_many` fetches at most `concurrency` batches at once."""
+        creds = CredentialsAwsSsm()
+        get_parameters = creds.client.get_parameters
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def count_running(**kwargs):
+            with lock:
+                running.append(None)
+                peak.append(len(running))
+            time.sleep(0.05)
+            try:
+                return get_parameters(**kwargs)
+            finally:
+                with lock:
+                    running.pop()
+
+        devices = [(get_device(f"router-{index}"), {"manufacturer": "cisco", "platform": "ios"}) for index in range(8)]
+        with mock.patch.object(creds.client, "get_parameters", side_effect=count_running):
+            device_creds = asyncio.run(creds.aget_many(devices, concurrency=2))
+
+        # 4 names for each device, the platform and the default credentials, in 4 batches.
+        self.assertEqual(len(peak), 4)
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(device_creds[1], ("device-username", "device-password", "device-secret", "device-key"))
+
+    def test_index_paging(self):
+        """Test the index follows `NextToken` over every page of the parameter tree."""
+        for index in range(2, 8):
+            self.put_parameters(f"router-{index}", f"device-{index}")
+
+        creds = CredentialsAwsSsm({"index": True})
+        with self.count_calls(creds, "get_parameters_by_path") as get_parameters_by_path:
+            creds.prefetch([get_device("router-7")])
+
+        # 36 parameters, over pages of at most 10 parameters.
+        self.assertGreater(get_parameters_by_path.call_count, 1)
+        self.assertTrue(all(call.kwargs.get("NextToken") for call in get_parameters_by_path.call_args_list[1:]))
+        self.assertEqual(len(creds.parameters), 36)
+        self.assertEqual(
+            creds.get_device_creds(get_device("router-7"), manufacturer="cisco", platform="ios"),
+            ("device-7-username", "device-7-password", "device-7-secret", "device-7-key"),
+        )
+
+
+class CredentialsAwsSsmStubbedTestCase(SimpleTestCase):
+    """SSM calls are retried when throttled, against a stubbed client."""
+
+    def setUp(self):
+        """Stub the client of a credentials class, without backoff delays."""
+        environ = mock.patch.dict(
+            os.environ,
+            {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_REGION": REGION},
+        )
+        environ.start()
+        self.addCleanup(environ.stop)
+        sleep = mock.patch("netbox_nornir.plugins.credentials.throttle.time.sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+        clear_clients()
+        self.addCleanup(clear_clients)
+        CREDENTIALS_CACHE.clear()
+        self.addCleanup(CREDENTIALS_CACHE.clear)
+
+    def get_creds(self, params=None):
+        """Get a credentials class whose client is stubbed, with a rate limiter of its own."""
+        creds = CredentialsAwsSsm(params or {})
+        creds.rate_limiter = AdaptiveRateLimiter()
+        stubber = Stubber(creds.client)
+        stubber.activate()
+        self.addCleanup(stubber.deactivate)
+        return creds, stubber
+
+    @staticmethod
+    def get_parameters_response(names):
+        """Get the response of `GetParameters` or `GetParametersByPath` holding every name."""
+        return {"Parameters": [{"Name": name, "Value": f"{name}-value", "Type": "SecureString"} for name in names]}
+
+    def test_retry_throttled(self):
+        """Test throttled calls are retried, and slow the rate limiter down."""
+        creds, stubber = self.get_creds()
+        names = creds.build_default_parameter_names()
+        expected_params = {"Names": sorted(names), "WithDecryption": True}
+        stubber.add_client_error("get_parameters", service_error_code="ThrottlingException", http_status_code=400)
+        stubber.add_client_error("get_parameters", service_error_code="ThrottlingException", http_status_code=400)
+        stubber.add_response("get_parameters", self.get_parameters_response(names), expected_params)
+
+        creds.fetch_parameters(names)
+
+        stubber.assert_no_pending_responses()
+        self.assertEqual(creds.parameters["/netbox/device_default/username"], "/netbox/device_default/username-value")
+        self.assertEqual(creds.retry_budget.retries, 48)
+        self.assertLess(creds.rate_limiter.rate, 20)
+
+    def test_retry_max_attempts(self):
+        """Test a call throttled `max_attempts` times fails."""
+        creds, stubber = self.get_creds({"max_attempts": 3})
+        for _ in range(3):
+            stubber.add_client_error("get_parameters", service_error_code="ThrottlingException", http_status_code=400)
+
+        with self.assertRaisesRegex(NornirNetboxException, "Throttled after 3 attempts"):
+            creds.fetch_parameters(creds.build_default_parameter_names())
+        stubber.assert_no_pending_responses()
+
+    def test_retry_budget(self):
+        """Test throttled calls fail once the retry budget of the inventory load is spent."""
+        creds, stubber = self.get_creds({"retry_budget": 1})
+        for _ in range(2):
+            stubber.add_client_error("get_parameters", service_error_code="ThrottlingException", http_status_code=400)
+
+        with self.assertRaisesRegex(NornirNetboxException, "Retry budget"):
+            creds.fetch_parameters(creds.build_default_parameter_names())
+        stubber.assert_no_pending_responses()
+
+    def test_no_retry_other_errors(self):
+        """Test errors other than throttling aren't retried."""
+        creds, stubber = self.get_creds()
+        stubber.add_client_error("get_parameters", service_error_code="AccessDeniedException", http_status_code=400)
+
+        with self.assertRaisesRegex(Exception, "AccessDeniedException"):
+            creds.fetch_parameters(creds.build_default_parameter_names())
+        self.assertEqual(creds.retry_budget.retries, 50)
+
+    def test_index_paging_throttled(self):
+        """Test the index retries a throttled page, then carries on from its `NextToken`."""
+        creds, stubber = self.get_creds({"index": True})
+        path_params = {"Path": "/netbox", "Recursive": True, "WithDecryption": True}
+        stubber.add_response(
+            "get_parameters_by_path",
+            {**self.get_parameters_response(["/netbox/router-1/username"]), "NextToken": "page-2"},
+            path_params,
+        )
+        stubber.add_client_error(
+            "get_parameters_by_path", service_error_code="ThrottlingException", http_status_code=400
+        )
+        stubber.add_response(
+            "get_parameters_by_path",
+            self.get_parameters_response(["/netbox/router-1/password"]),
+            {**path_params, "NextToken": "page-2"},
+        )
+
+        creds.prefetch([get_device("router-1")])
+
+        stubber.assert_no_pending_responses()
+        self.assertEqual(
+            creds.get_device_creds(get_device("router-1"), manufacturer="cisco", platform="ios")[:2],
+            ("/netbox/router-1/username-value", "/netbox/router-1/password-value"),
+        )
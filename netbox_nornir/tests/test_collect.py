@@ -0,0 +1,136 @@
+"""Tests of the collect dispatcher method."""
+from unittest import mock
+
+from django.test import SimpleTestCase
+from netmiko import NetmikoTimeoutException
+from nornir.core.inventory import Host
+from nornir.core.processor import Processors
+from nornir.core.task import Result, Task
+
+from netbox_nornir.plugins.tasks.dispatcher import dispatcher
+from netbox_nornir.plugins.tasks.dispatcher.default import (
+    NetmikoNetboxNornirDriver,
+    build_collect_result,
+    napalm_collect,
+)
+
+
+def get_facts(task):
+    """Subtask returning the facts of the device."""
+    return Result(host=task.host, result={"hostname": task.host.name})
+
+
+def netmiko_send_command(task, command_string):
+    """Subtask timing out like an unreachable device."""
+    raise NetmikoTimeoutException("Timed out")
+
+
+class NetmikoDriver(NetmikoNetboxNornirDriver):
+    """Netmiko driver implementing `get_facts`."""
+
+    @staticmethod
+    def get_facts(task: Task, logger, obj) -> Result:
+        """Get the facts from a subtask."""
+        return Result(host=task.host, result={"facts": task.run(task=get_facts)[0].result})
+
+
+class FakeDevice:
+    """Napalm device whose `get_environment` getter fails."""
+
+    @staticmethod
+    def get_facts():
+        """Get the facts."""
+        return {"hostname": "router-1"}
+
+    @staticmethod
+    def get_config(retrieve="all"):
+        """Get the configuration."""
+        return {"running": f"{retrieve} config"}
+
+    @staticmethod
+    def get_environment():
+        """Fail to get the environment."""
+        raise RuntimeError("Unsupported")
+
+
+def run_task(task, host, **kwargs):
+    """Run a task on a host outside of a nornir runner."""
+    return Task(task, nornir=mock.Mock(), global_dry_run=False, processors=Processors(), **kwargs).start(host)
+
+
+class CollectTestCase(SimpleTestCase):
+    """A failed getter is reported in `errors` without failing the host."""
+
+    def test_napalm_collect(self):
+        """Test the error of a failed napalm getter is kept, with the results of the other getters."""
+        host = Host("router-1", platform="cisco_ios")
+        with mock.patch.object(Host, "get_connection", return_value=FakeDevice()):
+            result = run_task(
+                napalm_collect,
+                host,
+                getters=["facts", "config", "environment"],
+                getters_options={"config": {"retrieve": "running"}},
+            )
+
+        self.assertFalse(result.failed)
+        self.assertEqual(
+            result[0].result,
+            {
+                "results": {"facts": {"hostname": "router-1"}, "config": {"running": "running config"}},
+                "errors": {"environment": "RuntimeError: Unsupported"},
+            },
+        )
+
+    def test_build_collect_result(self):
+        """Test the result only fails when every getter failed, and failed getters are logged as warnings."""
+        task = mock.Mock(host=Host("router-1"))
+        logger = mock.Mock()
+
+        result = build_collect_result(task, logger, None, {"facts": {}}, {"config": "Timeout"})
+        self.assertFalse(result.failed)
+        self.assertEqual(result.result, {"facts": {}, "errors": {"config": "Timeout"}})
+        logger.log_warning.assert_called_once()
+        logger.log_failure.assert_not_called()
+
+        result = build_collect_result(task, logger, None, {}, {"config": "Timeout"})
+        self.assertTrue(result.failed)
+        logger.log_failure.assert_called_once()
+
+    @mock.patch("netbox_nornir.plugins.tasks.dispatcher.default.netmiko_send_command", new=netmiko_send_command)
+    def test_partial_failure(self):
+        """Test a netmiko getter failing is reported by the dispatcher without failing the host."""
+        host = Host("router-1", platform="test")
+
+        result = run_task(
+            dispatcher,
+            host,
+            method="collect",
+            logger=mock.Mock(),
+            obj=None,
+            default_drivers_mapping={"test": f"{NetmikoDriver.__module__}.{NetmikoDriver.__name__}"},
+        )
+
+        self.assertFalse(result.failed)
+        collect_result = result[0].result[0].result
+        self.assertEqual(collect_result["facts"], {"hostname": "router-1"})
+        self.assertEqual(set(collect_result["errors"]), {"config", "environment", "interfaces"})
+        self.assertIn("Timed out", collect_result["errors"]["config"])
+
+    @mock.patch("netbox_nornir.plugins.tasks.dispatcher.default.netmiko_send_command", new=netmiko_send_command)
+    def test_failure(self):
+        """Test the dispatcher reports a collect failing for every getter from its dict result."""
+        logger = mock.Mock()
+
+        result = run_task(
+            dispatcher,
+            Host("router-1", platform="test"),
+            method="collect",
+            logger=logger,
+            obj=None,
+            getters=["config"],
+            default_drivers_mapping={"test": f"{NetmikoDriver.__module__}.{NetmikoDriver.__name__}"},
+        )
+
+        self.assertTrue(result.failed)
+        self.assertIn("Subtask failed", str(result[0].exception))
+        self.assertIn("Timed out", str(result[0].exception))
@@ -0,0 +1,60 @@
+"""Tests of the config store."""
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.test import SimpleTestCase
+
+from netbox_nornir.plugins.tasks.dispatcher.config_store import ConfigStore
+
+
+class DictStorage(Storage):
+    """Storage keeping files in memory, which keeps existing names like most storages."""
+
+    def __init__(self):
+        """Initialize the storage."""
+        self.files = {}
+
+    def _open(self, name, mode="rb"):
+        return ContentFile(self.files[name], name=name)
+
+    def _save(self, name, content):
+        self.files[name] = content.read()
+        return name
+
+    def exists(self, name):
+        """Whether a file exists."""
+        return name in self.files
+
+    def delete(self, name):
+        """Delete a file."""
+        self.files.pop(name, None)
+
+    def listdir(self, path):
+        """List the files of a directory."""
+        return [], [name.rsplit("/", 1)[1] for name in self.files if name.startswith(f"{path}/")]
+
+
+class ConfigStoreRefsTestCase(SimpleTestCase):
+    """The handle of the last configuration of a host is replaced by the next one."""
+
+    def assert_replaced(self, store):
+        """Check the handle of a host points to its last configuration, and tells whether it changed."""
+        first = store.put("router-1", "hostname router-1\n")
+        second = store.put("router-1", "hostname router-1\ninterface Gi1\n")
+        self.assertTrue(second.changed)
+        self.assertEqual(store.get_ref("router-1"), second)
+        self.assertFalse(store.put("router-1", "hostname router-1\ninterface Gi1\n").changed)
+        self.assertNotEqual(first.digest, second.digest)
+        self.assertEqual(store.storage.listdir("refs")[1], ["router-1.json"])
+
+    def test_file_system_storage(self):
+        """Test the handle is renamed over the previous one, without temporary files left behind."""
+        with tempfile.TemporaryDirectory() as location:
+            self.assert_replaced(ConfigStore(FileSystemStorage(location=location)))
+            self.assertEqual(os.listdir(os.path.join(location, "refs")), ["router-1.json"])
+
+    def test_other_storage(self):
+        """Test the handle is replaced on storages keeping existing names."""
+        self.assert_replaced(ConfigStore(DictStorage()))
@@ -0,0 +1,84 @@
+"""Tests of the NetboxORMInventory query plan."""
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Platform, Site
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from virtualization.models import Cluster, ClusterGroup, ClusterType
+
+from netbox_nornir.plugins.credentials.env_vars import CredentialsEnvVars
+from netbox_nornir.plugins.inventory.netbox_orm import NetboxORMInventory
+
+
+class CredentialsPerCluster(CredentialsEnvVars):
+    """Credentials reading the cluster group of the device, declared with `select_related`."""
+
+    select_related = ["cluster__group"]
+
+    def get_device_creds(self, device=None, **kwargs):
+        """Read the cluster of the device like a real credentials class would."""
+        assert device.cluster.name and device.cluster.group.name
+        return super().get_device_creds(device=device, **kwargs)
+
+
+class NetboxORMInventoryQueriesTestCase(TestCase):
+    """Loading the inventory costs the same number of queries whatever the number of devices."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the objects shared by the devices."""
+        cls.site = Site.objects.create(name="Site 1", slug="site-1")
+        manufacturer = Manufacturer.objects.create(name="Cisco", slug="cisco")
+        cls.device_type = DeviceType.objects.create(manufacturer=manufacturer, model="ISR", slug="isr")
+        cls.device_role = DeviceRole.objects.create(name="Router", slug="router")
+        cls.platform = Platform.objects.create(name="IOS", slug="cisco_ios", napalm_driver="ios")
+        cluster_type = ClusterType.objects.create(name="Type 1", slug="type-1")
+        cluster_group = ClusterGroup.objects.create(name="Group 1", slug="group-1")
+        cls.cluster = Cluster.objects.create(name="Cluster 1", type=cluster_type, group=cluster_group, site=cls.site)
+
+    def create_devices(self, start, count):
+        """Create `count` devices."""
+        Device.objects.bulk_create(
+            Device(
+                name=f"device-{index}",
+                site=self.site,
+                device_type=self.device_type,
+                device_role=self.device_role,
+                platform=self.platform,
+                cluster=self.cluster,
+            )
+            for index in range(start, start + count)
+        )
+
+    def load_inventory(self, **kwargs):
+        """Load the inventory, reading the related objects of every host like tasks do."""
+        inventory = NetboxORMInventory(**kwargs).load()
+        for host in inventory.hosts.values():
+            device = host.data["obj"]
+            assert device.site.name and device.device_type.manufacturer.name and device.platform.name
+        return len(inventory.hosts)
+
+    def assert_constant_queries(self, **kwargs):
+        """Check loading N and 2N devices runs the same number of queries."""
+        self.create_devices(0, 10)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.load_inventory(**kwargs), 10)
+
+        self.create_devices(10, 10)
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(self.load_inventory(**kwargs), 20)
+
+    def test_constant_queries(self):
+        """Test the default query plan."""
+        self.assert_constant_queries()
+
+    def test_constant_queries_credentials_select_related(self):
+        """Test relations declared by the credentials class are loaded whole, without a query per device."""
+        self.assert_constant_queries(
+            credentials_class=f"{CredentialsPerCluster.__module__}.{CredentialsPerCluster.__name__}",
+        )
+
+    def test_nornir_filter_dict(self):
+        """Test a dict nornir filter is applied with `F` semantics, also for the rules left to the inventory."""
+        self.create_devices(0, 12)
+        inventory = NetboxORMInventory(nornir_filter={"role": "router", "name__endswith": "-1"}).load()
+        self.assertEqual(sorted(inventory.hosts), ["device-1"])
@@ -0,0 +1,125 @@
+"""Tests of the invalidation of the inventory cache."""
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Region, Site
+from django.core.cache import cache
+from django.test import TestCase
+from extras.models import ConfigContext, Tag
+
+from netbox_nornir.plugins.inventory import cache as inventory_cache
+from netbox_nornir.signals import connect_signals
+
+
+class InventoryCacheInvalidationTestCase(TestCase):
+    """Cached memberships and config contexts are dropped by changes of the objects devices are matched on."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Connect the signal handlers, only connected with the `inventory_cache` plugin setting."""
+        super().setUpClass()
+        connect_signals()
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a device."""
+        cls.site = Site.objects.create(name="Site 1", slug="site-1")
+        manufacturer = Manufacturer.objects.create(name="Cisco", slug="cisco")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="ISR", slug="isr")
+        device_role = DeviceRole.objects.create(name="Router", slug="router")
+        cls.device = Device.objects.create(
+            name="device-1", site=cls.site, device_type=device_type, device_role=device_role
+        )
+        cls.tag = Tag.objects.create(name="Tag 1", slug="tag-1")
+
+    def setUp(self):
+        """Start from an empty cache."""
+        cache.clear()
+
+    def cache_members(self, queryset):
+        """Cache the members of a queryset, as read under the current generation."""
+        generation = inventory_cache.get_generation()
+        inventory_cache.set_members(queryset, list(queryset.values_list("pk", flat=True)), generation)
+
+    def get_members(self, queryset):
+        """Get the cached members of a queryset under the current generation."""
+        return inventory_cache.get_members(queryset, inventory_cache.get_generation())
+
+    def test_device_tags(self):
+        """Test tagging a device drops the memberships."""
+        queryset = Device.objects.filter(tags__slug="tag-1")
+        self.cache_members(queryset)
+        self.assertEqual(self.get_members(queryset), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device.tags.add(self.tag)
+        self.assertIsNone(self.get_members(queryset))
+
+    def test_region(self):
+        """Test moving a site to a region drops the memberships."""
+        region = Region.objects.create(name="Region 1", slug="region-1")
+        queryset = Device.objects.filter(site__region__slug="region-1")
+        self.cache_members(queryset)
+
+        self.site.region = region
+        with self.captureOnCommitCallbacks(execute=True):
+            self.site.save()
+        self.assertIsNone(self.get_members(queryset))
+
+    def test_on_commit(self):
+        """Test the cache is only dropped once the transaction of the change commits."""
+        queryset = Device.objects.filter(tags__slug="tag-1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device.tags.add(self.tag)
+            self.cache_members(queryset)
+            self.assertEqual(self.get_members(queryset), [self.device.pk])
+        self.assertIsNone(self.get_members(queryset))
+
+    def test_generation_read_before_query(self):
+        """Test a change made while the query runs leaves its result under a generation no longer read."""
+        queryset = Device.objects.filter(tags__slug="tag-1")
+        generation = inventory_cache.get_generation()
+        device_ids = list(queryset.values_list("pk", flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device.tags.add(self.tag)
+        inventory_cache.set_members(queryset, device_ids, generation)
+
+        self.assertIsNone(self.get_members(queryset))
+
+    def cache_host(self):
+        """Cache the config context host spec of the device."""
+        inventory_cache.set_hosts(
+            {self.device.pk: {"data": {"config_context": {}}}},
+            variant="config_context",
+            generation=inventory_cache.get_variant_generation("config_context"),
+        )
+
+    def get_host(self):
+        """Get the cached config context host spec of the device."""
+        generation = inventory_cache.get_variant_generation("config_context")
+        return inventory_cache.get_hosts([self.device.pk], variant="config_context", generation=generation).get(
+            self.device.pk
+        )
+
+    def test_device_tags_config_context(self):
+        """Test tagging a device drops its config context."""
+        self.cache_host()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device.tags.add(self.tag)
+        self.assertIsNone(self.get_host())
+
+    def test_region_config_context(self):
+        """Test saving the parent region of the site of a device drops its config context."""
+        parent = Region.objects.create(name="Region 1", slug="region-1")
+        self.site.region = Region.objects.create(name="Region 2", slug="region-2", parent=parent)
+        self.site.save()
+        self.cache_host()
+
+        parent.description = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            parent.save()
+        self.assertIsNone(self.get_host())
+
+    def test_config_context(self):
+        """Test saving a config context drops every cached config context."""
+        self.cache_host()
+        with self.captureOnCommitCallbacks(execute=True):
+            ConfigContext.objects.create(name="Context 1", data={"ntp": "10.0.0.1"})
+        self.assertIsNone(self.get_host())
@@ -0,0 +1,71 @@
+"""Tests of the configuration change markers."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from nornir.core.inventory import Host
+
+from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.tasks.dispatcher import cisco_ios
+from netbox_nornir.plugins.tasks.dispatcher.config_store import ConfigStore
+from netbox_nornir.plugins.tasks.dispatcher.markers import get_marker, get_unchanged_result, is_conditional, set_marker
+from netbox_nornir.tests.test_config_store import DictStorage
+
+
+class MarkersTestCase(SimpleTestCase):
+    """Markers are kept by platform and host name."""
+
+    def setUp(self):
+        """Start from an empty cache, with a config store."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.store = ConfigStore(DictStorage())
+        get_config_store = mock.patch(
+            "netbox_nornir.plugins.tasks.dispatcher.markers.get_config_store", return_value=self.store
+        )
+        get_config_store.start()
+        self.addCleanup(get_config_store.stop)
+
+    def test_platform(self):
+        """Test the marker of a host isn't compared with the marker of another driver."""
+        set_marker(Host("router-1", platform="cisco_ios"), "Last configuration change at 10:00:00")
+
+        self.assertIsNone(get_marker(Host("router-1", platform="cisco_ios_restconf")))
+        self.assertIsNone(get_unchanged_result(Host("router-1", platform="cisco_ios_restconf"), "abc"))
+
+    def test_unchanged_result(self):
+        """Test an unchanged configuration is skipped, with the handle of the last configuration."""
+        host = Host("router-1", platform="cisco_ios")
+        set_marker(host, "Last configuration change at 10:00:00")
+        self.assertIsNone(get_unchanged_result(host, "Last configuration change at 10:00:00"))
+
+        ref = self.store.put("router-1", "hostname router-1\n")
+        self.assertIsNone(get_unchanged_result(host, "Last configuration change at 11:00:00"))
+        self.assertEqual(
+            get_unchanged_result(host, "Last configuration change at 10:00:00"),
+            {
+                "unchanged": True,
+                "marker": "Last configuration change at 10:00:00",
+                "config_ref": ref._replace(changed=False),
+            },
+        )
+
+    def test_conditional_requires_store(self):
+        """Test conditional config fails without the config store."""
+        self.assertFalse(is_conditional(False))
+        self.assertTrue(is_conditional(True))
+        with mock.patch("netbox_nornir.plugins.tasks.dispatcher.markers.get_config_store", return_value=None):
+            with self.assertRaisesRegex(NornirNetboxException, "config_store"):
+                is_conditional(True)
+
+    def test_cisco_ios_marker_command(self):
+        """Test the IOS marker is off unless a marker command is set."""
+        task = mock.Mock()
+        task.host.get_connection.return_value.cli.return_value = {"show archive": "Archive 3\n"}
+        self.assertIsNone(cisco_ios.NetboxNornirDriver.get_config_marker(task, None, None))
+        task.host.get_connection.assert_not_called()
+
+        with mock.patch.dict(
+            cisco_ios.PLUGIN_CFG, {"conditional_config": {"marker_commands": {"cisco_ios": "show archive"}}}
+        ):
+            self.assertEqual(cisco_ios.NetboxNornirDriver.get_config_marker(task, None, None), "Archive 3")
@@ -0,0 +1,64 @@
+"""Tests of the PAN-OS configuration pretty printing."""
+import io
+import xml.dom.minidom  # nosec
+from unittest import mock
+
+from django.test import SimpleTestCase
+from nornir.core.inventory import Host
+
+from netbox_nornir.plugins.tasks.dispatcher.paloalto_panos import NetboxNornirDriver
+
+# Export of a configuration, indented with whitespace, as sent by the device.
+CONFIG = """<?xml version="1.0"?>
+<!-- Exported configuration -->
+<config version="10.1.0" urldb="paloaltonetworks">
+  <mgt-config>
+    <users>
+      <entry name="admin">
+        <phash>$5$abc&amp;def</phash>
+        <permissions><role-based><superuser>yes</superuser></role-based></permissions>
+      </entry>
+    </users>
+  </mgt-config>
+  <shared>
+    <log-settings><http><entry name="siem" quote="&quot;a&lt;b&quot;"/></http></log-settings>
+    <response-page>
+      <application-block-page><![CDATA[<html><body>Blocked & logged</body></html>]]></application-block-page>
+      <url-block-page>
+        <![CDATA[<html>]]><![CDATA[</html>]]>
+      </url-block-page>
+      <empty><![CDATA[]]></empty>
+      <mixed>before<![CDATA[<cdata>]]>after<!-- comment -->tail</mixed>
+    </response-page>
+  </shared>
+  <?panos keep?>
+</config>
+"""
+
+
+class FormatConfigTestCase(SimpleTestCase):
+    """The configuration is pretty printed exactly like `xml.dom.minidom` `toprettyxml()`."""
+
+    def setUp(self):
+        """Get the output of the minidom pretty printer, used before streaming."""
+        self.expected = xml.dom.minidom.parseString(CONFIG).toprettyxml()  # nosec
+
+    def test_format_config(self):
+        """Test the whole configuration is printed like minidom."""
+        self.assertEqual(NetboxNornirDriver.format_config(CONFIG), self.expected)
+        self.assertIn("<![CDATA[<html><body>Blocked & logged</body></html>]]>", self.expected)
+
+    def test_stream_config(self):
+        """Test the configuration is printed like minidom when received in chunks, split anywhere."""
+        content = CONFIG.encode()
+        for chunk_size in (1, 7, 64 * 1024):
+            response = mock.MagicMock()
+            response.__enter__.return_value = response
+            response.iter_content.return_value = [
+                content[start : start + chunk_size] for start in range(0, len(content), chunk_size)
+            ]
+            writer = io.StringIO()
+            with mock.patch("netbox_nornir.plugins.tasks.dispatcher.paloalto_panos.get_transport") as get_transport:
+                get_transport.return_value.send.return_value = response
+                NetboxNornirDriver.stream_config(Host("firewall-1", hostname="10.0.0.1", data={"key": "key"}), writer)
+            self.assertEqual(writer.getvalue(), self.expected, f"chunk_size={chunk_size}")
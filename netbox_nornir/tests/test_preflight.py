@@ -0,0 +1,57 @@
+"""Tests of the reachability pre-flight."""
+import socket
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from nornir.core.inventory import Groups
+
+from netbox_nornir.plugins.inventory.lazy import HostLoader, LazyHosts
+from netbox_nornir.plugins.tasks.dispatcher.preflight import preflight
+
+
+class PreflightTestCase(SimpleTestCase):
+    """Unreachable hosts are failed, without building the hosts of lazy inventories."""
+
+    def setUp(self):
+        """Listen on a port, and find a port nothing listens on."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.addCleanup(self.server.close)
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            self.closed_port = closed.getsockname()[1]
+
+    def get_nornir(self, ports):
+        """Get a nornir object over a lazy inventory of hosts on 127.0.0.1, by host name and port."""
+        index = {
+            name: {"hostname": "127.0.0.1", "port": port, "platform": "cisco_ios", "groups": [], "data": {}}
+            for name, port in ports.items()
+        }
+        build = mock.Mock(side_effect=AssertionError("Host built"))
+        hosts = LazyHosts(HostLoader(index, build, Groups()), index)
+        return SimpleNamespace(inventory=SimpleNamespace(hosts=hosts), data=SimpleNamespace(failed_hosts=set()))
+
+    def test_unreachable(self):
+        """Test unreachable hosts are marked as failed, and the reachable ones left to run."""
+        nr = self.get_nornir({"router-1": self.server.getsockname()[1], "router-2": self.closed_port})
+        logger = mock.Mock()
+
+        unreachable = preflight(nr, logger, None, timeout=1)
+
+        self.assertEqual(list(unreachable), ["router-2"])
+        self.assertEqual(nr.data.failed_hosts, {"router-2"})
+        logger.log_failure.assert_called_once()
+
+    def test_cached(self):
+        """Test probe results are reused until they expire."""
+        preflight(self.get_nornir({"router-1": self.closed_port}), mock.Mock(), None, timeout=1)
+
+        with mock.patch("netbox_nornir.plugins.tasks.dispatcher.preflight.probe") as probe:
+            unreachable = preflight(self.get_nornir({"router-2": self.closed_port}), mock.Mock(), None, timeout=1)
+        probe.assert_not_called()
+        self.assertEqual(list(unreachable), ["router-2"])
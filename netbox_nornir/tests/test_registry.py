@@ -0,0 +1,54 @@
+"""Tests of the dispatch registry."""
+from django.test import SimpleTestCase
+
+from netbox_nornir.plugins.tasks.dispatcher.registry import DispatchRegistry
+
+
+class Driver:
+    """Driver with tasks, coroutines and helpers."""
+
+    @staticmethod
+    def get_config(task, logger, obj):
+        """Driver task."""
+
+    @classmethod
+    def collect(cls, task, logger, obj, getters=None):
+        """Driver task with extra arguments."""
+
+    @staticmethod
+    async def aget_config(host, client):
+        """Driver coroutine."""
+
+    @staticmethod
+    def get_config_request(host):
+        """Helper building a request."""
+
+    @staticmethod
+    def combine_interfaces(interfaces, interfaces_ip):
+        """Helper combining results."""
+
+    @staticmethod
+    def naplam_get(task, method, logger, obj):
+        """Helper of the other tasks."""
+
+    @staticmethod
+    async def aget_config_marker_response(host):
+        """Helper coroutine."""
+
+
+class DispatchRegistryTestCase(SimpleTestCase):
+    """Only the driver tasks and coroutines are dispatched."""
+
+    def setUp(self):
+        """Build a registry of the driver."""
+        self.registry = DispatchRegistry({"default": f"{Driver.__module__}.Driver"})
+
+    def test_tasks(self):
+        """Test the tasks and coroutines are registered."""
+        for method in ("get_config", "collect", "aget_config"):
+            self.assertIsNotNone(self.registry.get_task("ios", method), method)
+
+    def test_helpers(self):
+        """Test the helpers aren't registered."""
+        for method in ("get_config_request", "combine_interfaces", "naplam_get", "aget_config_marker_response"):
+            self.assertIsNone(self.registry.get_task("ios", method), method)
@@ -0,0 +1,133 @@
+"""Tests of the adaptive runner."""
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from nornir.core.inventory import Group, Host, ParentGroups
+from nornir.core.processor import Processors
+from nornir.core.task import Result, Task
+
+from netbox_nornir.exceptions import NornirNetboxException
+from netbox_nornir.plugins.runners.adaptive import AdaptiveRunner, ConcurrencyPool
+
+
+def failing_task(task):
+    """Task failing every host, so the limits go down to their floor."""
+    return Result(host=task.host, failed=True)
+
+
+def get_site_hosts(site, count):
+    """Get hosts of the `site__<site>` group."""
+    group = Group(f"site__{site}")
+    return [Host(name=f"{site}-{index}", platform="cisco_ios", groups=ParentGroups([group])) for index in range(count)]
+
+
+def get_task(function):
+    """Get a task runnable by a runner, outside of a nornir object."""
+    return Task(function, nornir=None, global_dry_run=False, processors=Processors())
+
+
+class AdaptiveRunnerTestCase(SimpleTestCase):
+    """Every host is run, within limits allowing at least one host."""
+
+    def setUp(self):
+        """Start without learnt limits."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.hosts = [Host(name=f"router-{index}", platform="cisco_ios") for index in range(10)]
+
+    def test_invalid_limits(self):
+        """Test limits not allowing a single host are rejected."""
+        with self.assertRaises(NornirNetboxException):
+            AdaptiveRunner(limits={"cisco_ios": {"floor": 0}})
+        with self.assertRaises(NornirNetboxException):
+            AdaptiveRunner(limits={"default": {"initial": 0}})
+        with self.assertRaises(NornirNetboxException):
+            AdaptiveRunner(limits={"cisco_ios": {"floor": 10, "ceiling": 5}})
+        with self.assertRaises(NornirNetboxException):
+            AdaptiveRunner(num_workers=0)
+        with self.assertRaises(NornirNetboxException):
+            ConcurrencyPool(("cisco_ios", None), initial=2, floor=0, ceiling=10)
+
+    def test_failing_hosts(self):
+        """Test every host is run when every host fails, and the floor is learnt for the next run."""
+        runner = AdaptiveRunner(num_workers=2, limits={"cisco_ios": {"initial": 8, "floor": 1}})
+        result = runner.run(get_task(failing_task), self.hosts)
+        self.assertEqual(len(result), 10)
+        self.assertEqual(int(runner.get_pools(self.hosts)[0].limit), 1)
+
+    def test_unscheduled_hosts(self):
+        """Test hosts the runner couldn't start are failed instead of dropped."""
+        runner = AdaptiveRunner()
+        with mock.patch.object(ConcurrencyPool, "start", return_value=None):
+            result = runner.run(get_task(failing_task), self.hosts)
+        self.assertEqual(sorted(result.failed_hosts), sorted(host.name for host in self.hosts))
+        self.assertIsInstance(result["router-0"][0].exception, NornirNetboxException)
+
+
+class AdaptiveRunnerFairnessTestCase(SimpleTestCase):
+    """Hosts of a pool are started in turn from each site, within the limits of their groups."""
+
+    def setUp(self):
+        """Start without learnt limits."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.started = []
+        self.lock = threading.Lock()
+
+    def record_task(self, task):
+        """Task recording the order the hosts are started in."""
+        with self.lock:
+            self.started.append(task.host.name)
+        return Result(host=task.host)
+
+    def test_large_site(self):
+        """Test the hosts of a large site don't hold back the hosts of the other sites."""
+        hosts = get_site_hosts("large", 20) + get_site_hosts("small", 2)
+        runner = AdaptiveRunner(num_workers=1, limits={"cisco_ios": {"initial": 1, "ceiling": 1}})
+
+        result = runner.run(get_task(self.record_task), hosts)
+
+        self.assertEqual(len(result), 22)
+        self.assertFalse(result.failed)
+        self.assertEqual(self.started[:4], ["large-0", "small-0", "large-1", "small-1"])
+
+    def test_group_limits(self):
+        """Test a site limited to one host runs its hosts one at a time, next to the other sites."""
+        running = {"limited": 0}
+        peak = []
+
+        def limited_task(task):
+            site = task.host.name.split("-")[0]
+            with self.lock:
+                running[site] = running.get(site, 0) + 1
+                peak.append(running["limited"])
+            time.sleep(0.01)
+            with self.lock:
+                running[site] -= 1
+            return Result(host=task.host)
+
+        hosts = get_site_hosts("limited", 5) + get_site_hosts("other", 5)
+        runner = AdaptiveRunner(num_workers=4, group_limits={"site__limited": 1})
+
+        result = runner.run(get_task(limited_task), hosts)
+
+        self.assertEqual(len(result), 10)
+        self.assertFalse(result.failed)
+        self.assertEqual(max(peak), 1)
+
+    def test_unscheduled_site(self):
+        """Test hosts of a site which can never start are failed, while the other sites run."""
+        hosts = get_site_hosts("blocked", 3) + get_site_hosts("open", 3)
+        runner = AdaptiveRunner(num_workers=2)
+
+        with mock.patch.object(
+            runner, "get_group_limit", side_effect=lambda name: 0 if name == "site__blocked" else None
+        ):
+            result = runner.run(get_task(self.record_task), hosts)
+
+        self.assertEqual(sorted(self.started), ["open-0", "open-1", "open-2"])
+        self.assertEqual(sorted(result.failed_hosts), ["blocked-0", "blocked-1", "blocked-2"])
+        self.assertIn("couldn't schedule", str(result["blocked-0"][0].exception))
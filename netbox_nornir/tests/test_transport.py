@@ -0,0 +1,83 @@
+"""Tests of the shared HTTP transport of the API drivers."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase
+from nornir.core.inventory import Host
+
+from netbox_nornir.plugins.tasks.dispatcher.transport import HttpRequest, HttpTransport, get_base_url, get_port
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Handler keeping connections alive, recording the client address of each request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer with the path."""
+        self.server.client_addresses.append(self.client_address)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+
+class HttpTransportTestCase(SimpleTestCase):
+    """Requests to a device reuse its session, sessions over `max_hosts` are closed."""
+
+    def setUp(self):
+        """Start a local HTTP server keeping connections alive."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        self.server.client_addresses = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def test_session_reuse(self):
+        """Test the requests to a device share one session and its open connection."""
+        transport = HttpTransport()
+        self.addCleanup(transport.close)
+
+        for index in range(3):
+            response = transport.send(HttpRequest("GET", self.base_url, f"/config/{index}"))
+            self.assertEqual(response.text, f"/config/{index}")
+
+        self.assertEqual(list(transport.sessions), [self.base_url])
+        self.assertEqual(len(set(self.server.client_addresses)), 1)
+
+    def test_eviction(self):
+        """Test the session of the least recently used device is closed over `max_hosts`."""
+        transport = HttpTransport(max_hosts=2)
+        self.addCleanup(transport.close)
+
+        first = transport.get_session("https://10.0.0.1")
+        transport.get_session("https://10.0.0.2")
+        self.assertIs(transport.get_session("https://10.0.0.1"), first)
+        with mock.patch.object(transport.sessions["https://10.0.0.2"], "close") as close:
+            transport.get_session("https://10.0.0.3")
+        close.assert_called_once()
+        self.assertEqual(list(transport.sessions), ["https://10.0.0.1", "https://10.0.0.3"])
+
+
+class BaseUrlTestCase(SimpleTestCase):
+    """The API port replaces an unset or SSH host port."""
+
+    def test_get_port(self):
+        """Test the default port is used when the host port is unset or 22."""
+        self.assertEqual(get_port(Host("firewall-1"), 443), 443)
+        self.assertEqual(get_port(Host("firewall-1", port=22), 443), 443)
+        self.assertEqual(get_port(Host("firewall-1", port=8443), 443), 8443)
+        self.assertIsNone(get_port(Host("firewall-1")))
+
+    def test_get_base_url(self):
+        """Test the base URL holds the port only when known."""
+        self.assertEqual(get_base_url(Host("firewall-1", hostname="10.0.0.1"), 443), "https://10.0.0.1:443")
+        self.assertEqual(get_base_url(Host("firewall-1", hostname="10.0.0.1", port=8443), 443), "https://10.0.0.1:8443")
+        self.assertEqual(get_base_url(Host("firewall-1", hostname="10.0.0.1")), "https://10.0.0.1")
@@ -0,0 +1,29 @@
+"""Tests of the worker lifetime checks."""
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from netbox_nornir import worker
+
+
+class CheckWorkerTestCase(SimpleTestCase):
+    """State kept across jobs is reported as dropped in forked work-horses."""
+
+    def setUp(self):
+        """Forget the warnings already logged."""
+        worker._WARNED.clear()  # pylint: disable=protected-access
+        self.addCleanup(worker._WARNED.clear)  # pylint: disable=protected-access
+
+    def test_worker_process(self):
+        """Test state is shared across jobs in the process the plugin was loaded in."""
+        with self.assertNoLogs(worker.LOGGER):
+            self.assertTrue(worker.check_worker("connection_pool"))
+
+    def test_forked_work_horse(self):
+        """Test a forked work-horse is warned about once."""
+        with mock.patch.object(worker.os, "getpid", return_value=os.getpid() + 1):
+            with self.assertLogs(worker.LOGGER, "WARNING"):
+                self.assertFalse(worker.check_worker("connection_pool"))
+            with self.assertNoLogs(worker.LOGGER):
+                self.assertFalse(worker.check_worker("connection_pool"))
@@ -1,16 +1,28 @@
 """Utilities for plugin."""
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from netbox_nornir.plugins.tasks.dispatcher import _DEFAULT_DRIVERS_MAPPING
-from netbox_nornir.constraints import PLUGIN_CFG
+from netbox_nornir.plugins.tasks.dispatcher import get_registry
 
 
 def get_dispatcher():
-    """Helper method to load the dispatcher from netbox nornir or config if defined."""
-    if PLUGIN_CFG.get("dispatcher_mapping"):
-        return {**_DEFAULT_DRIVERS_MAPPING, **PLUGIN_CFG["dispatcher_mapping"]}
-    return _DEFAULT_DRIVERS_MAPPING
+    """Helper method to load the dispatcher from netbox nornir or config if defined.
+
+    The mapping is merged once, passing it as `default_drivers_mapping` uses the dispatch registry of the plugin.
+    """
+    return get_registry().mapping
+
+
+def run_coroutine(coroutine):
+    """Run a coroutine to completion from sync code, in a separate thread when an event loop is already running."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
 
 
 class NornirLogger:
@@ -0,0 +1,42 @@
+"""Lifetime of the state kept by the worker across jobs, like the connection pool.
+
+The default rq worker forks a work-horse process for each job, and the work-horse exits with the state set by its
+job. Such state is only shared across jobs by a non-forking worker, like `rq.worker.SimpleWorker`.
+"""
+import logging
+import os
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+# Process the plugin was loaded in, the worker process itself when jobs run in a forked work-horse.
+_LOADED_PID = os.getpid()
+_WARNED = set()
+_WARNED_LOCK = threading.Lock()
+
+
+def is_forked_worker() -> bool:
+    """Whether the process was forked after the plugin was loaded, like the work-horse of a job."""
+    return os.getpid() != _LOADED_PID
+
+
+def check_worker(feature: str) -> bool:
+    """Check the state of a feature outlives the job, logging a warning once per process when it doesn't.
+
+    Args:
+        feature (str): Name of the feature keeping state across jobs, like `connection_pool`
+    Returns:
+        (bool): Whether the state of the feature is shared across jobs
+    """
+    if not is_forked_worker():
+        return True
+    with _WARNED_LOCK:
+        if feature in _WARNED:
+            return False
+        _WARNED.add(feature)
+    LOGGER.warning(
+        "The %s is dropped at the end of each job, as the job runs in a forked work-horse. Run a non-forking worker "
+        "to share it across jobs, like `python manage.py rqworker --worker-class rq.worker.SimpleWorker`.",
+        feature.replace("_", " "),
+    )
+    return False
@@ -307,6 +307,18 @@ def pytest(context):
     run_cmd(context, exec_cmd)
 
 
+@task(help={"label": "Test module, class or method to run. (Default: netbox_nornir)"})
+def unittest(context, label="netbox_nornir"):
+    """Launch the Django unit tests of the plugin.
+
+    Args:
+        context (obj): Used to run specific commands
+        label (str): Test module, class or method to run
+    """
+    exec_cmd = f"python manage.py test --keepdb {label}"
+    run_cmd(context, exec_cmd)
+
+
 @task()
 def black(context):
     """Launch black to check that Python files adherence to black standards.
@@ -421,3 +433,15 @@ def tests(context):
     # pytest(context)
 
     print("All tests have passed!")
+
+
+@task(help={"iterations": "Number of calls per platform. (Default: 100000)"})
+def benchmark_dispatcher(context, iterations=100000):
+    """Measure the per call overhead of the dispatcher resolving driver tasks.
+
+    Args:
+        context (obj): Used to run specific commands
+        iterations (int): Number of calls per platform
+    """
+    exec_cmd = f"python manage.py benchmark_dispatcher --iterations {iterations}"
+    run_cmd(context, exec_cmd)